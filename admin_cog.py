@@ -24,6 +24,8 @@ import utility.images as u_images
 import utility.converters as u_converters
 import utility.files as u_files
 import utility.chess_utils as u_chess
+import utility.solvers as u_solvers
+import utility.stonks as u_stonks
 
 # pip install python-dotenv
 from dotenv import load_dotenv
@@ -133,14 +135,15 @@ class Admin_cog(
     ##### GLOBAL UTILITY FUNCTIONS #######################################################################################################################
     ######################################################################################################################################################
 
-    def reload_database(self: typing.Self):
+    async def reload_database(self: typing.Self):
         """Reloads the database."""
-        self.bot.database.save_database(make_backup=True)
-        self.bot.database = u_files.DatabaseInterface()
+        # This waits for any snapshot that's still being written, so it can't overwrite this one afterwards.
+        await self.bot.database.save_database_async(make_backup=True)
+        self.bot.database = u_files.get_database_interface()
     
-    def cog_unload(self: typing.Self):
+    async def cog_unload(self: typing.Self):
         """This runs when the cog is unloaded."""
-        database.save_database(make_backup=True)
+        await database.save_database_async(make_backup=True)
 
 
 
@@ -432,7 +435,7 @@ class Admin_cog(
             self: typing.Self,
             ctx: commands.Context | u_custom.CustomContext
         ):
-        self.reload_database()
+        await self.reload_database()
 
         await ctx.reply("Done.")
 
@@ -454,9 +457,9 @@ class Admin_cog(
             self: typing.Self,
             ctx: commands.Context | u_custom.CustomContext
         ):
-        database.save_database(make_backup=True)
+        await database.save_database_async(make_backup=True)
 
-        await ctx.reply("Done.")
+        await ctx.reply("Done, saved {} bytes in {}ms.".format(database.save_stats["bytes"], round(database.save_stats["latency"] * 1000, 1)))
 
         
             
@@ -476,7 +479,7 @@ class Admin_cog(
             self: typing.Self,
             ctx: commands.Context | u_custom.CustomContext
         ):
-        database.load_database()
+        await database.load_database_async()
 
         await ctx.reply("Done.")
 
@@ -512,6 +515,63 @@ class Admin_cog(
             
 
         
+    ######################################################################################################################################################
+    ##### ADMIN DATABASE BACKUPS #########################################################################################################################
+    ######################################################################################################################################################
+    
+    @admin_database.command(
+        name="backups",
+        brief = "Lists the most recent backups.",
+        description = "Lists the most recent backups that can be restored."
+    )
+    @commands.is_owner()
+    async def admin_database_backups(
+            self: typing.Self,
+            ctx: commands.Context | u_custom.CustomContext,
+            amount: typing.Optional[int] = 24
+        ):
+        stamps = database.backup_stamps()
+
+        if len(stamps) == 0:
+            await ctx.reply("There are no backups.")
+            return
+        
+        await ctx.reply("There are {} backups, the most recent are:\n{}".format(
+            len(stamps),
+            "\n".join([f"- `{stamp}`" for stamp in reversed(stamps[-amount:])])
+        ))
+
+        
+            
+
+        
+    ######################################################################################################################################################
+    ##### ADMIN DATABASE RESTORE #########################################################################################################################
+    ######################################################################################################################################################
+    
+    @admin_database.command(
+        name="restore",
+        brief = "Restores a backup.",
+        description = "Restores the database from a backup, by default the most recent one.\nThe current database is backed up first.\nUse `%admin database backups` to get a list of backups."
+    )
+    @commands.is_owner()
+    async def admin_database_restore(
+            self: typing.Self,
+            ctx: commands.Context | u_custom.CustomContext,
+            stamp: typing.Optional[str] = None
+        ):
+        try:
+            await database.restore_backup(stamp)
+        except KeyError:
+            await ctx.reply("There's no backup with that name.")
+            return
+        
+        await ctx.reply("Done.")
+
+        
+            
+
+        
     ######################################################################################################################################################
     ##### ADMIN SHUTDOWN #################################################################################################################################
     ######################################################################################################################################################
@@ -777,12 +837,63 @@ class Admin_cog(
             ctx: commands.Context | u_custom.CustomContext
         ):
         start = time.time()
-        u_images.stonk_report(database)
+        report = await u_images.render_service.render(u_images.stonk_report, u_images.stonk_report_data(database))
         end = time.time()
 
         delta = end - start
         
-        await ctx.reply(f"Time to generate: {delta:.5f} seconds.", file=discord.File(f"images/generated/stonk_report.png"))
+        await ctx.reply(f"Time to generate: {delta:.5f} seconds.", file=discord.File(report, filename="stonk_report.png"))
+
+        
+            
+
+        
+    ######################################################################################################################################################
+    ##### ADMIN REBUILD STONK STATISTICS #################################################################################################################
+    ######################################################################################################################################################
+    
+    @admin.command(
+        name="rebuild_stonk_statistics",
+        brief = "Rebuilds the stonk statistics.",
+        description = "Checks the stonk statistics used by %stonk records and %stonk splits against a full scan of the history, and then rebuilds them."
+    )
+    @commands.is_owner()
+    async def admin_rebuild_stonk_statistics(
+            self: typing.Self,
+            ctx: commands.Context | u_custom.CustomContext
+        ):
+        columns = u_stonks.history_columns(database)
+        existing = database.load_view("stonks", "statistics", default=None)
+
+        if existing is None:
+            mismatches = ["There were no statistics saved."]
+        else:
+            mismatches = u_stonks.StonkStatistics(existing).verify(columns)
+
+        start = time.time()
+        rebuilt = u_stonks.rebuild_statistics(database)
+        end = time.time()
+
+        rebuilt_mismatches = rebuilt.verify(columns)
+
+        lines = []
+
+        if mismatches:
+            lines.append("The saved statistics did not match the history:")
+            lines.extend([f"- {line}" for line in mismatches[:10]])
+
+            if len(mismatches) > 10:
+                lines.append(f"- And {len(mismatches) - 10} more.")
+        else:
+            lines.append("The saved statistics matched the history.")
+        
+        if rebuilt_mismatches:
+            lines.append("The rebuilt statistics still do not match, check the log.")
+            print("\n".join(rebuilt_mismatches))
+        else:
+            lines.append(f"Rebuilt the statistics for {u_text.smart_number(len(rebuilt))} ticks in {end - start:.5f} seconds.")
+
+        await ctx.reply("\n".join(lines))
 
         
             
@@ -1463,6 +1574,84 @@ class Admin_cog(
             
 
         
+    ######################################################################################################################################################
+    ##### ADMIN SOLVERS ##################################################################################################################################
+    ######################################################################################################################################################
+        
+    @admin.command(
+        name="solvers",
+        brief = "Shows the solver and evaluation queues, timings and cache.",
+        description = "Shows the solver and evaluation queues, timings and cache."
+    )
+    @commands.is_owner()
+    async def admin_solvers(
+            self: typing.Self,
+            ctx: commands.Context | u_custom.CustomContext
+        ):
+        metrics = u_solvers.solver_service.metrics()
+        evaluation = u_solvers.evaluation_metrics()
+        evaluation_workers = u_solvers.evaluation_service.metrics()
+
+        def format_time(seconds: float | None) -> str:
+            if seconds is None:
+                return "-"
+            
+            return f"{round(seconds * 1000)}ms"
+
+        lines = [
+            f"Queued: {metrics['queued']} from {metrics['queued_users']} user(s)",
+            f"Running: {metrics['running']} of {metrics['workers']} workers",
+            f"Solves: {metrics['solves']}, timeouts: {metrics['timeouts']}, cancelled: {metrics['cancelled']}, restarts: {metrics['restarts']}",
+            f"Solve time: last {format_time(metrics['last_time'])}, average {format_time(metrics['average_time'])}, p50 {format_time(metrics['p50_time'])}, p99 {format_time(metrics['p99_time'])}, max {format_time(metrics['max_time'])}",
+            f"Cache: {len(u_solvers.solver_cache)} results, {u_solvers.solver_cache.hits} hits, {u_solvers.solver_cache.misses} misses",
+            "",
+            f"Evaluations: {evaluation['in_process']} in-process, {evaluation['isolated']} in workers, p50 {format_time(evaluation['p50_time'])}, p99 {format_time(evaluation['p99_time'])}",
+            f"Evaluation workers: {evaluation_workers['running']} running, {evaluation_workers['queued']} queued, {evaluation_workers['timeouts']} timeouts, p50 {format_time(evaluation_workers['p50_time'])}, p99 {format_time(evaluation_workers['p99_time'])}"
+        ]
+
+        await ctx.reply("\n".join(lines))
+
+
+
+
+
+    ######################################################################################################################################################
+    ##### ADMIN RENDERS ##################################################################################################################################
+    ######################################################################################################################################################
+
+    @admin.command(
+        name="renders",
+        brief = "Shows how long each image renderer takes.",
+        description = "Shows how long each image renderer takes, and how many renders were shared between identical requests."
+    )
+    @commands.is_owner()
+    async def admin_renders(
+            self: typing.Self,
+            ctx: commands.Context | u_custom.CustomContext
+        ):
+        metrics = u_images.render_service.metrics()
+
+        if len(metrics) == 0:
+            await ctx.reply("Nothing has been rendered yet.")
+            return
+
+        def format_time(seconds: float | None) -> str:
+            if seconds is None:
+                return "-"
+
+            return f"{round(seconds * 1000)}ms"
+
+        lines = [
+            f"- {name}: {data['renders']} renders, {data['deduplicated']} shared, {data['errors']} errors, average {format_time(data['average'])}, p50 {format_time(data['p50'])}, max {format_time(data['max'])}"
+            for name, data in sorted(metrics.items())
+        ]
+
+        await ctx.reply("\n".join(lines))
+
+
+
+
+
     ######################################################################################################################################################
     ##### ADMIN CHANGE STATUS ############################################################################################################################
     ######################################################################################################################################################
@@ -1890,8 +2079,8 @@ class Admin_cog(
             for name, elo in elos.items()
         }
         
-        u_images.chess_puzzle(puzzles[0], fake_elo_data)
-        send_file = discord.File("images/generated/chess_puzzle.png")
+        puzzle_image = await u_images.render_service.render(u_images.chess_puzzle, puzzles[0], fake_elo_data)
+        send_file = discord.File(puzzle_image, filename="chess_puzzle.png")
         send_file_link = "attachment://chess_puzzle.png"
         
         embed = u_interface.gen_embed(
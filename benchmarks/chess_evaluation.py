@@ -0,0 +1,167 @@
+"""Consistency check and benchmark for the evaluation accumulator used by rawr_v3 and RobertoBot.
+
+The consistency check walks every line of play to a fixed depth from a set of positions, perft style, pushing and popping the moves through the accumulator.
+At every node the accumulated evaluation of both bots is compared with the full evaluation counted from the board, and the node counts are compared with the known perft results.
+The positions cover castling, en passant and promotions.
+
+The benchmark then runs each bot's search with and without the accumulator and prints the nodes per second.
+
+Run from the root of the repository with `python -m benchmarks.chess_evaluation`."""
+
+import math
+import time
+import random
+import typing
+
+# pip install chess
+import chess
+
+import utility.chess_utils as u_chess
+
+# FEN, depth and the perft node count at that depth.
+PERFT_SUITE = [
+    (chess.STARTING_FEN, 3, 8_902),
+    ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", 2, 2_039), # Kiwipete.
+    ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", 3, 2_812),
+    ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1", 3, 9_467),
+    ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8", 2, 1_486),
+]
+
+SEARCH_SUITE = [
+    chess.STARTING_FEN,
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+    "2r3k1/pp3ppp/2n5/3p4/3P4/2P2N2/P4PPP/2R3K1 w - - 0 1",
+]
+
+class FullEvaluationRawr(u_chess.rawr_v3):
+    """rawr_v3 evaluating every leaf from the board, the way it did before the accumulator."""
+    def evaluate(self: typing.Self) -> int:
+        return self.evaluate_from_board()
+
+class FullEvaluationRoberto(u_chess.RobertoBot):
+    """RobertoBot evaluating every leaf from the board, the way it did before the accumulator."""
+    def evaluate_board(self: typing.Self, board: chess.Board):
+        if board.is_checkmate():
+            if board.turn:
+                return -9999
+            else:
+                return 9999
+        elif board.is_stalemate() or board.is_insufficient_material() or board.is_seventyfive_moves():
+            return 0
+
+        return self.base_eval(board, board.turn) + self.base_eval(board, not board.turn)
+
+def check_position(
+        rawr: u_chess.rawr_v3,
+        roberto: u_chess.RobertoBot
+    ) -> int:
+    """Returns how many of the two bots' accumulated evaluations differ from the full evaluation of the board."""
+    mismatches = 0
+
+    if rawr.evaluate() != rawr.evaluate_from_board():
+        mismatches += 1
+
+    board = roberto.accumulator.board
+
+    for color in chess.COLORS:
+        # The evaluations add some randomness in the opening, so both get the same random numbers.
+        random.seed(board.ply())
+        accumulated = roberto.accumulated_base_eval(board, color)
+        random.seed(board.ply())
+        full = roberto.base_eval(board, color)
+
+        if accumulated != full:
+            mismatches += 1
+
+    return mismatches
+
+def perft(
+        rawr: u_chess.rawr_v3,
+        roberto: u_chess.RobertoBot,
+        depth: int
+    ) -> tuple[int, int]:
+    """Walks every line of play to the depth, and returns the number of leaves and the number of evaluation mismatches along the way.
+
+    Each bot has its own copy of the board, and the moves are pushed to both through their accumulators."""
+    mismatches = check_position(rawr, roberto)
+
+    if depth == 0:
+        return 1, mismatches
+
+    leaves = 0
+
+    for move in list(rawr.board.legal_moves):
+        rawr.accumulator.push(move)
+        roberto.accumulator.push(move)
+
+        move_leaves, move_mismatches = perft(rawr, roberto, depth - 1)
+
+        rawr.accumulator.pop()
+        roberto.accumulator.pop()
+
+        leaves += move_leaves
+        mismatches += move_mismatches
+
+    return leaves, mismatches
+
+def check_consistency() -> None:
+    """Runs the perft suite and prints whether the node counts and evaluations matched."""
+    print("Consistency:")
+
+    for fen, depth, expected in PERFT_SUITE:
+        rawr = u_chess.rawr_v3({})
+        rawr.board = chess.Board(fen)
+        rawr.accumulator = u_chess.EvaluationAccumulator(rawr.board, rawr.MATERIAL_VALUES, rawr.PIECE_TABLES)
+
+        roberto = u_chess.RobertoBot({})
+        roberto.accumulator = u_chess.EvaluationAccumulator(chess.Board(fen), roberto.HP_VALUES)
+
+        leaves, mismatches = perft(rawr, roberto, depth)
+
+        print(f"- {fen} at depth {depth}: {leaves} leaves ({'correct' if leaves == expected else f'expected {expected}'}), {mismatches} evaluation mismatches.")
+
+def nodes_per_second(
+        name: str,
+        bot_class: type[u_chess.ChessBot],
+        setup: typing.Callable[[u_chess.ChessBot], None]
+    ) -> None:
+    """Runs the bot's turn on every position in the search suite and prints the nodes per second."""
+    nodes = 0
+    elapsed = 0.0
+
+    for fen in SEARCH_SUITE:
+        bot = bot_class({})
+        setup(bot)
+
+        random.seed(0)
+        start = time.perf_counter()
+        bot.turn(chess.Board(fen))
+        elapsed += time.perf_counter() - start
+
+        nodes += bot.nodes
+
+    print(f"- {name}: {nodes} nodes in {elapsed:.2f}s, {nodes / elapsed:,.0f} nodes per second.")
+
+def compare_speed() -> None:
+    """Prints the nodes per second of both bots with and without the accumulator."""
+    print("\nNodes per second:")
+
+    def rawr_setup(bot: u_chess.rawr_v3) -> None:
+        bot.max_depth = 4
+        bot.search_time = math.inf
+
+    def roberto_setup(bot: u_chess.RobertoBot) -> None:
+        pass
+
+    nodes_per_second("rawr_v3, full evaluation", FullEvaluationRawr, rawr_setup)
+    nodes_per_second("rawr_v3, accumulator", u_chess.rawr_v3, rawr_setup)
+    nodes_per_second("roberto_bot, full evaluation", FullEvaluationRoberto, roberto_setup)
+    nodes_per_second("roberto_bot, accumulator", u_chess.RobertoBot, roberto_setup)
+
+def main() -> None:
+    check_consistency()
+    compare_speed()
+
+if __name__ == "__main__":
+    main()
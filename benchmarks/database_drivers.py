@@ -0,0 +1,67 @@
+"""Benchmark comparing the JSON and SQLite database drivers.
+
+Each driver is loaded in a fresh process so the peak RSS isn't shared, then the reads a message would do are run against it.
+Uses database.json if it exists, otherwise the generated database from benchmarks.database_load.
+The SQLite database is migrated beforehand so the migration isn't part of the load time.
+
+Run from the root of the repository with `python -m benchmarks.database_drivers`."""
+
+import os
+import sys
+import json
+import time
+import shutil
+import resource
+import tempfile
+import subprocess
+
+import utility.files as u_files
+import benchmarks.database_load as database_load
+
+def run_driver(driver: str) -> None:
+    """Loads the database with the given driver and prints the load time and peak RSS. Runs in the child process."""
+    start = time.perf_counter()
+
+    if driver == "sqlite":
+        database = u_files.SQLiteDatabaseInterface()
+    else:
+        database = u_files.DatabaseInterface()
+    
+    loaded = time.perf_counter()
+
+    for keys in database_load.per_message_reads(database.load_view):
+        database.load_view(*keys, default=None)
+
+    end = time.perf_counter()
+
+    # ru_maxrss is in kilobytes on Linux.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    print(f"{driver}: {(loaded - start) * 1000:.1f}ms to load, {(end - loaded) * 1000:.1f}ms for the first reads, {rss / 1024:.1f} MiB peak RSS.")
+
+def main() -> None:
+    root = os.getcwd()
+    
+    with tempfile.TemporaryDirectory() as directory:
+        if os.path.exists("database.json"):
+            shutil.copyfile("database.json", os.path.join(directory, "database.json"))
+        else:
+            with open(os.path.join(directory, "database.json"), "w") as file_write:
+                json.dump(database_load.generated_database(), file_write)
+        
+        os.chdir(directory)
+        u_files.migrate_to_sqlite()
+        os.chdir(root)
+
+        for driver in ["json", "sqlite"]:
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.database_drivers", driver],
+                cwd = directory,
+                env = dict(os.environ, PYTHONPATH=root)
+            )
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        run_driver(sys.argv[1])
+    else:
+        main()
@@ -0,0 +1,104 @@
+"""Benchmark for DatabaseInterface.load and DatabaseInterface.load_view.
+
+Measures the memory allocated and the time taken by the reads that happen while handling a message.
+Uses database.json if it exists, otherwise a generated database of a similar shape.
+
+Run from the root of the repository with `python -m benchmarks.database_load`."""
+
+import os
+import time
+import tracemalloc
+import typing
+
+import utility.files as u_files
+
+ITERATIONS = 200
+
+def generated_database() -> dict:
+    """Generates a database with a similar shape to the real one."""
+    return {
+        "stonks": {
+            "stonk_history": [
+                {f"stonk_{stonk}": tick * stonk for stonk in range(12)}
+                for tick in range(3000)
+            ],
+            "current_values": {"tick_number": 2999, "values": {f"stonk_{stonk}": stonk for stonk in range(12)}}
+        },
+        "bread": {
+            "data_storage": {str(user): {"stats": list(range(50))} for user in range(2000)},
+            "day_stats": {f"stat_{stat}": stat for stat in range(30)},
+            "gamble_messages": {str(channel): list(range(20)) for channel in range(10)}
+        },
+        "ping_lists": {f"list_{index}": list(range(200)) for index in range(20)} | {"727_pinglist": list(range(50)), "37_pinglist": list(range(50))},
+        "counting_data": {str(channel): {"count": channel, "sender": 0} for channel in range(50)},
+        "askouija": {str(channel): {"active": False, "letters": "", "message_id": None, "author_id": None} for channel in range(50)},
+        "reply_pings": {str(user): user % 2 == 0 for user in range(500)},
+        "pk_filter": {"member_ids": list(range(100))},
+        "pk_reply_settings": {str(user): True for user in range(100)},
+        "daily_counters": {f"counter_{index}": index for index in range(30)},
+    }
+
+def per_message_reads(load: typing.Callable) -> list[tuple[str, ...]]:
+    """Returns the keys that are read while handling a message, by `triggers_cog.on_message` and the replies it sends.
+
+    Keys for a channel or user use the first one in the database, which is found with the given load function, so the reads find something like they would for a real message."""
+    def first_key(name: str) -> str:
+        return next(iter(load(name, default={})), "0")
+
+    return [
+        ("bread", "day_stats"), # Daily stats.
+        ("bread", "gamble_messages"), # Gamble detection.
+        ("stonks", "current_values", "values"), # Stonk values, for the detection.
+        ("pk_reply_settings",), # PluralKit replies.
+        ("pk_filter",), # PluralKit filter.
+        ("counting_data", first_key("counting_data")), # Counting.
+        ("askouija", first_key("askouija")), # AskOuija.
+        ("ping_lists", "727_pinglist"), # 727 pings.
+        ("ping_lists", "37_pinglist"), # 37 pings.
+        ("reply_pings", first_key("reply_pings")), # The reply ping setting, for any reply.
+    ]
+
+def measure(
+        name: str,
+        load: typing.Callable,
+        reads: list[tuple[str, ...]]
+    ) -> None:
+    """Runs every read `ITERATIONS` times with the given load function, printing the results for each read as it goes."""
+    print(f"{name}:", flush=True)
+
+    total_time = 0.0
+    total_peak = 0
+
+    for keys in reads:
+        tracemalloc.start()
+        start = time.perf_counter()
+
+        for _ in range(ITERATIONS):
+            load(*keys, default=None)
+
+        elapsed = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        total_time += elapsed
+        total_peak = max(total_peak, peak)
+
+        print(f"- {'/'.join(keys)}: {elapsed / ITERATIONS * 1_000_000:.1f}µs, {peak / 1024:.1f} KiB peak allocation.", flush=True)
+
+    print(f"Total: {total_time / ITERATIONS * 1_000_000:.1f}µs per message, {total_peak / 1024:.1f} KiB largest peak allocation.", flush=True)
+
+def main() -> None:
+    database = u_files.DatabaseInterface.__new__(u_files.DatabaseInterface)
+
+    if os.path.exists("database.json"):
+        database.database = database.load_json_file("database.json", default={}, join_file_path=False)
+    else:
+        database.database = generated_database()
+
+    reads = per_message_reads(database.load_view)
+
+    measure("load", database.load, reads)
+    measure("load_view", database.load_view, reads)
+
+if __name__ == "__main__":
+    main()
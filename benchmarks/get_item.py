@@ -0,0 +1,111 @@
+"""Benchmark comparing `u_values.get_item` against the linear search it replaced, over bread roll messages.
+
+The roll messages are made from the rollable items, laid out the way Machine-Mind sends compound rolls, and are split into emojis the same way `u_bread.parse_roll` does.
+Every identifier is also checked with both lookups to make sure they find the same items.
+
+Run from the root of the repository with `python -m benchmarks.get_item`."""
+
+import time
+import random
+
+import utility.values as u_values
+
+ROLL_MESSAGES = 50
+ROLLS_PER_MESSAGE = 20
+
+def linear_get_item(
+        item_identifier: str,
+        attributes: str | list[str] = None
+    ) -> None | u_values.Item:
+    """`get_item` as it was before the lookup tables, which searches through every item."""
+    if isinstance(item_identifier, u_values.Item):
+        return item_identifier
+    
+    if len(item_identifier) == 0:
+        return None
+
+    item_identifier = item_identifier.lower()
+    
+    if item_identifier[-1] == "s":
+        plural_identifier = item_identifier[:-1]
+    else:
+        plural_identifier = f"{item_identifier}s"
+
+    for identifier in [item_identifier, plural_identifier]:
+        for item in u_values.attribute_item_list(attributes):
+            if identifier == item.internal_name.lower() \
+                or identifier == item.internal_emoji.lower()\
+                or identifier == item.name.lower() \
+                or identifier == item.emoji.lower() \
+                or identifier in [i.lower() for i in item.aliases]:
+
+                return item
+    
+    return None
+
+def roll_messages() -> list[str]:
+    """Returns compound roll messages, with 10 emojis per line and each roll separated by `---`."""
+    generator = random.Random(0)
+    messages = []
+
+    for _ in range(ROLL_MESSAGES):
+        rolls = []
+
+        for _ in range(ROLLS_PER_MESSAGE):
+            emojis = [generator.choice(u_values.rollable_items).internal_emoji for _ in range(generator.randint(5, 30))]
+            lines = [" ".join(emojis[index:index + 10]) for index in range(0, len(emojis), 10)]
+            rolls.append("\n".join(lines))
+        
+        messages.append("\n---\n".join(rolls))
+    
+    return messages
+
+def measure(
+        name: str,
+        get_item: callable,
+        messages: list[str]
+    ) -> None:
+    """Runs `get_item` on every emoji in the messages, split like `u_bread.parse_roll` does, and prints the time per lookup."""
+    lookups = 0
+    start = time.perf_counter()
+
+    for message in messages:
+        for roll in message.replace("\n", "").split("---"):
+            for emoji in roll.split(" "):
+                if len(emoji) == 0:
+                    continue
+
+                get_item(emoji)
+                lookups += 1
+    
+    elapsed = time.perf_counter() - start
+
+    print(f"{name}: {elapsed / lookups * 1_000_000:.2f}µs per lookup, {elapsed * 1000:.1f}ms for {lookups} lookups.")
+
+def check_matches() -> None:
+    """Checks both lookups give the same item for every identifier of every item, with and without attributes."""
+    identifiers = ["", "not an item", "s"]
+    for item in u_values.all_items:
+        for identifier in [item.internal_name, item.internal_emoji, item.name, item.emoji] + list(item.aliases):
+            identifiers.extend([identifier, identifier.upper(), f"{identifier}s", identifier[:-1]])
+    
+    attribute_options = [None, [], "rollable", "gamble_item", "stonk", ["special_bread", "rare_bread", "chess_piece", "shiny", "anarchy_chess_piece"]]
+
+    mismatches = 0
+    for identifier in identifiers:
+        for attributes in attribute_options:
+            if linear_get_item(identifier, attributes) is not u_values.get_item(identifier, attributes):
+                mismatches += 1
+    
+    print(f"{mismatches} of {len(identifiers) * len(attribute_options)} lookups gave a different item.")
+
+def main() -> None:
+    messages = roll_messages()
+
+    measure("linear", linear_get_item, messages)
+    measure("index", u_values.get_item, messages)
+
+    check_matches()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Benchmark comparing rawr_v3's search against the fixed depth search it used before the transposition table, iterative deepening and killer and history move ordering.
+
+Each position in the suite is searched to the same depth by both, and the number of nodes, the time taken and the score of the position are printed. The scores should always match.
+Then rawr_v3 is given its normal minimum depth and time budget on each position, and the depth it reached is printed.
+
+Run from the root of the repository with `python -m benchmarks.rawr_search`."""
+
+import math
+import time
+import typing
+
+# pip install chess
+import chess
+
+import utility.chess_utils as u_chess
+
+DEPTH = 4
+
+FEN_SUITE = [
+    chess.STARTING_FEN,
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3", # Italian / Ruy Lopez start.
+    "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR b KQkq - 4 4", # Defending the scholar's mate.
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", # Kiwipete.
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+    "2r3k1/pp3ppp/2n5/3p4/3P4/2P2N2/P4PPP/2R3K1 w - - 0 1", # Rook endgame.
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", # Pawn and rook endgame.
+    "6k1/5ppp/8/8/8/8/5PPP/3R2K1 b - - 0 1", # Back rank weakness.
+]
+
+class FixedDepthRawr(u_chess.rawr_v3):
+    """rawr_v3's search as it was before, a fixed depth negamax that sorts every node's moves with `score_move`.
+    
+    Moves go through the evaluation accumulator like they do in rawr_v3's search, so both evaluate positions the same way."""
+    def fixed_depth_search(
+            self: typing.Self,
+            board: chess.Board,
+            depth: int
+        ) -> int:
+        self.board = board
+        self.accumulator = u_chess.EvaluationAccumulator(board, self.MATERIAL_VALUES, self.PIECE_TABLES)
+        self.nodes = 0
+
+        return self.old_search(
+            ply_from_root = 0,
+            depth = depth,
+            alpha = -math.inf,
+            beta = math.inf
+        )
+
+    def old_search(
+            self: typing.Self,
+            ply_from_root: int,
+            depth: int,
+            alpha: int,
+            beta: int
+        ) -> int:
+        self.nodes += 1
+
+        if depth == 0:
+            return self.evaluate()
+
+        moves = sorted(
+            self.board.legal_moves,
+            key = self.score_move,
+            reverse = True
+        )
+
+        if not moves:
+            if self.board.is_checkmate():
+                return -self.CHECKMATE_VALUE + ply_from_root
+
+            return 0
+
+        for move in moves:
+            self.accumulator.push(move)
+
+            result = -self.old_search(
+                ply_from_root = ply_from_root + 1,
+                depth = depth - 1,
+                alpha = -beta,
+                beta= -alpha
+            )
+
+            self.accumulator.pop()
+
+            if result >= beta:
+                return beta
+
+            if result > alpha:
+                alpha = result
+
+        return alpha
+
+def deepening_search(
+        board: chess.Board,
+        max_depth: int,
+        search_time: float
+    ) -> u_chess.rawr_v3:
+    """Runs rawr_v3's search on the board and returns the bot, so the nodes, score and depth can be read from it."""
+    bot = u_chess.rawr_v3({})
+    bot.max_depth = max_depth
+    bot.search_time = search_time
+    bot.nodes = 0
+
+    bot.turn(board)
+
+    return bot
+
+def compare_fixed_depth() -> None:
+    """Searches every position to `DEPTH` with both searches."""
+    print(f"Fixed depth {DEPTH}:")
+
+    total_old_nodes = 0
+    total_new_nodes = 0
+    total_old_time = 0.0
+    total_new_time = 0.0
+    mismatches = 0
+
+    for fen in FEN_SUITE:
+        start = time.perf_counter()
+        old_bot = FixedDepthRawr({})
+        old_score = old_bot.fixed_depth_search(chess.Board(fen), DEPTH)
+        old_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        new_bot = deepening_search(chess.Board(fen), max_depth=DEPTH, search_time=math.inf)
+        new_time = time.perf_counter() - start
+
+        # The turn can return early for forced moves and mates in one, without searching.
+        if new_bot.depth_reached == 0:
+            print(f"- {fen}: skipped, the move is forced or a mate in one.")
+            continue
+
+        if new_bot.best_eval_overall != old_score:
+            mismatches += 1
+
+        total_old_nodes += old_bot.nodes
+        total_new_nodes += new_bot.nodes
+        total_old_time += old_time
+        total_new_time += new_time
+
+        print(f"- {fen}: {old_bot.nodes} nodes in {old_time:.2f}s -> {new_bot.nodes} nodes in {new_time:.2f}s, score {old_score} -> {new_bot.best_eval_overall}")
+
+    print(f"Total: {total_old_nodes} nodes in {total_old_time:.2f}s -> {total_new_nodes} nodes in {total_new_time:.2f}s ({total_new_nodes / total_old_nodes:.1%} of the nodes).")
+    print(f"{mismatches} of {len(FEN_SUITE)} positions gave a different score.")
+
+def depth_within_budget() -> None:
+    """Gives rawr_v3 its normal minimum depth and time budget on every position and prints how deep it got."""
+    print(f"\nMinimum depth of {u_chess.rawr_v3.min_depth}, time budget of {u_chess.rawr_v3.search_time}s:")
+
+    for fen in FEN_SUITE:
+        start = time.perf_counter()
+        bot = deepening_search(chess.Board(fen), max_depth=u_chess.rawr_v3.max_depth, search_time=u_chess.rawr_v3.search_time)
+        elapsed = time.perf_counter() - start
+
+        print(f"- {fen}: depth {bot.depth_reached}, {bot.nodes} nodes in {elapsed:.2f}s, best move {bot.best_move_overall}")
+
+def main() -> None:
+    compare_fixed_depth()
+    depth_within_budget()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Equivalence check and benchmark for `u_bread.simulate_rolling_odds`, which draws the daily rolling odds for many days at once.
+
+The simulation can't reproduce the odds for a specific day seed, so instead the mean and standard deviation of each category are compared with `u_bread.calculate_rolling_odds` over the same number of random day seeds.
+The parameter sets include raw planet deviations above 1, which give a negative effective deviation.
+
+Run from the root of the repository with `python -m benchmarks.rolling_odds`."""
+
+import time
+import random
+
+# pip install numpy
+import numpy as np
+
+import utility.bread as u_bread
+
+DAYS = 20_000
+
+# Priority, tile seed and the keyword arguments for the deviation.
+PARAMETER_SUITE = [
+    ("gem_gold", "tile_seed_1", {"planet_deviation": 0.9}),
+    ("special_bread", "tile_seed_2", {"planet_deviation": 0.75, "in_nebula": True}),
+    ("chess_piece", "tile_seed_3", {"planet_deviation": 0.95, "black_hole": True}),
+    ("anarchy_piece", "tile_seed_4", {"planet_deviation": 1.05}), # Negative effective deviation.
+    ("gem_red", "tile_seed_5", {"planet_deviation": 1.2, "black_hole": True}),
+    ("rare_bread", "tile_seed_6", {"effective_deviation": -0.02}),
+]
+
+# How far apart the means and standard deviations can be, relative to the standard deviation.
+TOLERANCE = 0.05
+
+def exact_odds(
+        priority: str,
+        tile_seed: str,
+        deviation_arguments: dict
+    ) -> dict[str, np.ndarray]:
+    """Runs `calculate_rolling_odds` for `DAYS` random day seeds."""
+    generator = random.Random(0)
+    odds = {key: [] for key in u_bread.ROLLING_ODDS_KEYS}
+
+    for _ in range(DAYS):
+        day = u_bread.calculate_rolling_odds(
+            priority = priority,
+            tile_seed = tile_seed,
+            day_seed = str(generator.getrandbits(64)),
+            **deviation_arguments
+        )
+
+        for key, value in day["odds"].items():
+            odds[key].append(value)
+    
+    return {key: np.array(values) for key, values in odds.items()}
+
+def check_equivalence() -> None:
+    """Compares the simulated odds with the exact odds for every parameter set, and prints the time taken by both."""
+    for priority, tile_seed, deviation_arguments in PARAMETER_SUITE:
+        start = time.perf_counter()
+        exact = exact_odds(priority, tile_seed, deviation_arguments)
+        exact_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        simulated = u_bread.simulate_rolling_odds(
+            priority = priority,
+            tile_seed = tile_seed,
+            days = DAYS,
+            seed = 0,
+            **deviation_arguments
+        )["odds"]
+        simulated_time = time.perf_counter() - start
+
+        mismatches = []
+
+        for key in u_bread.ROLLING_ODDS_KEYS:
+            scale = max(exact[key].std(), 1e-9)
+
+            if abs(exact[key].mean() - simulated[key].mean()) > TOLERANCE * scale or abs(exact[key].std() - simulated[key].std()) > TOLERANCE * scale:
+                mismatches.append(key)
+        
+        print(f"- {priority}, {deviation_arguments}: {exact_time:.2f}s -> {simulated_time:.4f}s, {'matches' if not mismatches else 'differs for ' + ', '.join(mismatches)}.")
+
+def main() -> None:
+    check_equivalence()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Benchmark comparing solving with the prebuilt solver template against building the whole model for every solve.
+
+The corpus is every bread account in database.json, solved for gold gems, chessatrons and omega chessatrons.
+If there's no database.json, random inventories are generated instead.
+
+Run from the root of the repository with `python -m benchmarks.solver_template`."""
+
+import os
+import time
+import random
+import statistics
+import traceback
+
+# pip install z3-solver
+import z3
+
+import utility.files as u_files
+import utility.values as u_values
+import utility.solvers as u_solvers
+
+CORPUS_SIZE = 30
+GOALS = [u_values.gem_gold, u_values.chessatron, u_values.omega_chessatron]
+
+def rebuilt_solve(
+        items: dict[u_values.Item, int],
+        maximize: u_values.Item,
+        disabled_recipes: list[str] = None,
+        disabled_items: list[u_values.Item] = None,
+        minimum_items: dict[u_values.Item, int] = None,
+        equal_items: dict[u_values.Item, int] = None
+    ) -> dict[str, int]:
+    """The solver as it was before the template, which builds the whole model for every solve."""
+    try:
+        if disabled_recipes is None:
+            disabled_recipes = []
+        if disabled_items is None:
+            disabled_items = []
+        if minimum_items is None:
+            minimum_items = {}
+        if equal_items is None:
+            equal_items = {}
+
+        items[maximize] = 0
+
+        s = z3.Optimize()
+
+        item_amounts = {}
+        item_modifiers = {}
+        item_totals = {}
+        item_recipes = {}
+        item_recipe_booleans = {}
+
+        modifier_data = {item: [] for item in items}
+
+        recipes = u_values.alchemy_recipes.copy()
+
+        recipes.update(u_values.misc_conversions)
+
+        for item, amount in items.items():
+            item_amounts[item] = z3.Int(f"{item.internal_name}_amounts")
+            item_modifiers[item] = z3.Int(f"{item.internal_name}_modifier")
+            item_totals[item] = z3.Int(f"{item.internal_name}_total")
+
+            s.add(item_totals[item] == (amount + item_modifiers[item]))
+            s.add(item_totals[item] >= 0, item_amounts[item] >= 0)
+
+            if item.internal_name not in recipes:
+                continue
+
+            if item in disabled_items:
+                s.add(item_modifiers[item] == 0)
+
+            for recipe_id, recipe in enumerate(recipes[item.internal_name]):
+                recipe_name = f"{item.internal_name}_recipe_{recipe_id + 1}"
+                if recipe_name in disabled_recipes:
+                    continue
+
+                if any(filter(lambda i: i[0] in disabled_items, recipe["cost"])):
+                    continue
+
+                for cost_item, cost_amount in recipe["cost"]:
+                    if cost_item not in modifier_data:
+                        break
+
+                    if cost_item in disabled_items:
+                        break
+                    
+                    modifier_data[cost_item].append((recipe_name, cost_amount * -1))
+                else:
+                    item_recipes[recipe_name] = z3.Int(recipe_name)
+                    item_recipe_booleans["bool_" + recipe_name] = z3.Int("bool_" + recipe_name)
+
+                    s.add(item_recipes[recipe_name] >= 0)
+                    s.add(item_recipe_booleans["bool_" + recipe_name] == z3.If(item_recipes[recipe_name] > 0, 1, 0))
+
+                    modifier_data[item].append((recipe_name, recipe.get("result", 1)))
+
+        for item, data in modifier_data.items():
+            constraints = []
+            for recipe, multiplier in data:
+                constraints.append((item_recipes[recipe] * multiplier))
+
+            s.add(item_modifiers[item] == z3.Sum(constraints))
+        
+        for item, minimum in minimum_items.items():
+            s.add(item_totals[item] >= minimum)
+
+        for item, goal in equal_items.items():
+            s.add(item_totals[item] == goal)
+
+        s.maximize(item_totals[maximize])
+
+        s.minimize(z3.Sum(list(item_recipe_booleans.values())))
+
+        for minimize in item_recipes.values():
+            s.minimize(minimize)
+
+        if s.check() != z3.sat:
+            return {"state": "unsat"}
+        
+        model = s.model()
+
+        result_json = {"state":"valid"}
+
+        items_send = []
+
+        for item in model:
+            items_send.append(item)
+
+        for item in items_send:
+            try:
+                result_json[str(item)] = model[item].as_long()
+            except AttributeError: # If something doesn't have .as_long() we probably don't need it.
+                pass
+
+        return result_json
+    except Exception as error:
+        print(traceback.format_exc())
+        return {"state": "error", "exception": error}
+
+def inventories() -> list[dict[u_values.Item, int]]:
+    """Returns the inventories to solve with, from database.json if there is one."""
+    if os.path.exists("database.json"):
+        database = u_files.DatabaseInterface.__new__(u_files.DatabaseInterface)
+        data = database.load_json_file("database.json", default={}, join_file_path=False)
+
+        accounts = list(data.get("bread", {}).get("data_storage", {}).values())
+
+        if accounts:
+            random.Random(0).shuffle(accounts)
+
+            return [
+                {item: account.get(item.internal_emoji, 0) for item in u_values.all_items}
+                for account in accounts[:CORPUS_SIZE]
+            ]
+    
+    generator = random.Random(0)
+
+    return [
+        {item: generator.choice([0, 0, generator.randint(0, 1_000_000)]) for item in u_values.all_items}
+        for _ in range(CORPUS_SIZE)
+    ]
+
+def measure(
+        name: str,
+        solve: callable,
+        corpus: list[dict[u_values.Item, int]]
+    ) -> list[dict[str, int]]:
+    """Solves every inventory in the corpus for every goal and prints the latencies."""
+    latencies = []
+    results = []
+
+    for inventory in corpus:
+        for goal in GOALS:
+            start = time.perf_counter()
+            results.append(solve(items=inventory.copy(), maximize=goal))
+            latencies.append(time.perf_counter() - start)
+    
+    latencies.sort()
+
+    print("{}: {:.1f}ms median, {:.1f}ms p95, {:.1f}ms max over {} solves.".format(
+        name,
+        statistics.median(latencies) * 1000,
+        latencies[int(len(latencies) * 0.95)] * 1000,
+        latencies[-1] * 1000,
+        len(latencies)
+    ))
+
+    return results
+
+def main() -> None:
+    corpus = inventories()
+
+    start = time.perf_counter()
+    u_solvers.get_solver_template()
+    print(f"Building the template took {(time.perf_counter() - start) * 1000:.1f}ms.")
+
+    rebuilt = measure("rebuilt", rebuilt_solve, corpus)
+    template = measure("template", u_solvers._universal_solver, corpus)
+
+    # The recipes used can differ between equally good solutions, but the amount made shouldn't.
+    mismatches = 0
+    for index, (old, new) in enumerate(zip(rebuilt, template)):
+        goal = GOALS[index % len(GOALS)]
+        key = f"{goal.internal_name}_total"
+
+        if old.get("state") != new.get("state") or old.get(key) != new.get(key):
+            mismatches += 1
+    
+    print(f"{mismatches} solves gave a different result.")
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,6 @@ import discord
 import typing
 import math
 import asyncio
-from os.path import sep as SLASH
 
 # pip install fuzzywuzzy
 # pip install python-Levenshtein
@@ -578,13 +577,14 @@ class Bingo_cog(
         
         live_data = u_bingo.live(database=database)
 
-        u_images.render_board_5x5(
-            database = database,
+        board = await u_images.render_service.render(
+            u_images.render_board_5x5,
+            tile_list = u_bingo.tile_list_5x5(database=database),
             tile_string = live_data["daily_tile_string"],
             enabled = live_data["daily_enabled"]
         )
 
-        await ctx.reply(content="This is bingo board #{}!".format(live_data["daily_board_id"]), file=discord.File(r'images/generated/bingo_board.png'))
+        await ctx.reply(content="This is bingo board #{}!".format(live_data["daily_board_id"]), file=discord.File(board, filename="bingo_board.png"))
 
     
     
@@ -770,8 +770,8 @@ class Bingo_cog(
             self: typing.Self,
             ctx: commands.Context | u_custom.CustomContext
         ):
-        u_images.render_board(
-            database = database,
+        board = await u_images.render_service.render(
+            u_images.render_board,
             tile_string = "".join([f"{i:03}" for i in range(25)]),
             enabled = 0,
             board_size = 5,
@@ -779,7 +779,7 @@ class Bingo_cog(
             force = True
         )
 
-        await ctx.reply(content="Here you go!", file=discord.File(r'images/generated/bingo_board.png'))
+        await ctx.reply(content="Here you go!", file=discord.File(board, filename="bingo_board.png"))
 
 
 
@@ -853,8 +853,9 @@ class Bingo_cog(
 
         enabled_number = min(max(enabled_number, 0), 33554431)
 
-        u_images.render_board_5x5(
-            database = database,
+        board = await u_images.render_service.render(
+            u_images.render_board_5x5,
+            tile_list = objective_list,
             tile_string = tile_string,
             enabled = enabled_number
         )
@@ -864,7 +865,7 @@ class Bingo_cog(
             description = f"Using a tile string of \"{tile_string}\" and an enabled number of {u_text.smart_number(enabled_number)}:",
             image_link = "attachment://bingo_board.png"
         )
-        await ctx.reply(embed=embed, file=discord.File(f'images{SLASH}generated{SLASH}bingo_board.png'))
+        await ctx.reply(embed=embed, file=discord.File(board, filename="bingo_board.png"))
 
     
     
@@ -892,15 +893,16 @@ class Bingo_cog(
         
         live_data = u_bingo.live(database=database)
 
-        u_images.render_board_9x9(
-            database = database,
+        board = await u_images.render_service.render(
+            u_images.render_board_9x9,
+            tile_list = u_bingo.tile_list_9x9(database=database),
             tile_string = live_data["weekly_tile_string"],
             enabled = live_data["weekly_enabled"]
         )
 
         await ctx.reply(
             content = "This is weekly board #{}!".format(live_data["weekly_board_id"]),
-            file = discord.File(r'images/generated/bingo_board.png')
+            file = discord.File(board, filename="bingo_board.png")
         )
 
     
@@ -1087,8 +1089,8 @@ class Bingo_cog(
             self: typing.Self,
             ctx: commands.Context | u_custom.CustomContext
         ):        
-        u_images.render_board(
-            database = database,
+        board = await u_images.render_service.render(
+            u_images.render_board,
             tile_string = "".join([f"{i:03}" for i in range(81)]),
             enabled = 0,
             board_size = 9,
@@ -1096,7 +1098,7 @@ class Bingo_cog(
             force = True
         )
 
-        await ctx.reply(content="Here you go!", file=discord.File(r'images/generated/bingo_board.png'))
+        await ctx.reply(content="Here you go!", file=discord.File(board, filename="bingo_board.png"))
 
 
     
@@ -1169,8 +1171,9 @@ class Bingo_cog(
 
         enabled_number = min(max(enabled_number, 0), 2417851639229258349412351)
 
-        u_images.render_board_9x9(
-            database = database,
+        board = await u_images.render_service.render(
+            u_images.render_board_9x9,
+            tile_list = objective_list,
             tile_string = tile_string,
             enabled = enabled_number
         )
@@ -1180,7 +1183,7 @@ class Bingo_cog(
             description = f"Using a tile string of \"{tile_string}\" and an enabled number of {u_text.smart_number(enabled_number)}:",
             image_link = "attachment://bingo_board.png"
         )
-        await ctx.reply(embed=embed, file=discord.File(f'images{SLASH}generated{SLASH}bingo_board.png'))
+        await ctx.reply(embed=embed, file=discord.File(board, filename="bingo_board.png"))
 
 
 
@@ -9,6 +9,7 @@ import math
 import re
 import random
 import time
+import asyncio
 
 # pip install pytz
 import pytz
@@ -1309,13 +1310,14 @@ class Bread_cog(
         except AttributeError:
             disabled_recipes = None
 
-        full_result = u_solvers.solver_wrapper(
+        full_result = await u_solvers.solver_wrapper_async(
             items = gems,
             maximize = u_values.gem_gold,
             disabled_recipes = disabled_recipes,
             disabled_items = disabled_items,
             minimum_items = minimum_items,
-            equal_items = equal_items
+            equal_items = equal_items,
+            user_id = ctx.author.id
         )
 
         if not full_result:
@@ -2300,13 +2302,14 @@ class Bread_cog(
         except:
             pass
         
-        full_result = u_solvers.solver_wrapper(
+        full_result = await u_solvers.solver_wrapper_async(
             items = items,
             maximize = u_values.chessatron,
             disabled_recipes = stored_data.disallowed_recipes,
             disabled_items = disabled_items,
             minimum_items = minimum_items,
-            equal_items = equal_items
+            equal_items = equal_items,
+            user_id = ctx.author.id
         )
 
         if not full_result:
@@ -3365,14 +3368,15 @@ class Bread_cog(
                 )
             )
 
-        graph = u_images.generate_graph(
+        graph = await u_images.render_service.render(
+            u_images.generate_graph,
             lines = [{"values": data}],
             x_label = "Day number",
             y_label = stat_name.replace("_", " ").title(),
             log_scale = log
         )
 
-        await ctx.reply(file=discord.File(graph))
+        await ctx.reply(file=discord.File(graph, filename="generated_graph.png"))
 
     
 
@@ -3787,54 +3791,32 @@ If any of these are missing it'll generate them randomly, except for the priorit
             await ctx.reply(embed=embed)
             return
         
-        data = []
-
-        message = await ctx.reply("Generating data...\n0/100,000")
+        message = await ctx.reply("Generating data...")
 
         amount = 100_000
 
-        tenth = amount // 10
-
-        start = time.time()
-        for i in range(1, amount + 1):
-            if i % tenth == 0:
-                current = time.time()
-
-                await message.edit(content=f"Generating data...\n{u_text.smart_number(i)}/100,000\nElapsed time: {u_text.smart_text(round(current - start, 3), 'second')}. Estimated time remaining: {u_text.smart_text(round(((current - start) / i) * (amount - i), 3), 'second')}.")
-
-            day_seed = "{:064x}".format(random.randrange(16 ** 64))
-
-            output = u_bread.calculate_rolling_odds(
+        def simulate() -> tuple[float, dict[str, list[tuple[float, int]]]]:
+            output = u_bread.simulate_rolling_odds(
                 priority = priority,
                 tile_seed = tile_seed,
-                day_seed = day_seed,
+                days = amount,
                 planet_deviation = raw_deviation,
                 in_nebula = nebula,
                 black_hole = black_hole,
                 effective_deviation = deviation
             )
 
-            if deviation is None:
-                deviation = output.get("deviation")
-
-            data.append(output.get("odds"))
-        
-        item_types = ["special_bread", "rare_bread", "chess_piece", "gem_red", "gem_blue", "gem_purple", "gem_green", "gem_gold", "anarchy_chess", "anarchy_piece"]
-
-        first = {item: {} for item in item_types}
+            return output["deviation"], u_bread.rolling_odds_histogram(output["odds"])
 
-        for tick in data:
-            for key, value in tick.items():
-                mod = round(value, 4)
-                if mod in first[key]:
-                    first[key][mod] += 1
-                else:
-                    first[key][mod] = 1
+        start = time.time()
+        deviation, first = await asyncio.to_thread(simulate)
+        current = time.time()
 
-        graph = u_images.generate_graph(
+        graph = await u_images.render_service.render(
+            u_images.generate_graph,
             lines = [{
                 "label": key.replace("_", " ").title(),
-                "values": list(dict(sorted(key_data.items())).items())
+                "values": key_data
             } for key, key_data in first.items()],
             x_label = "Item odds",
             y_label = "Occurrence count"
@@ -3847,7 +3829,7 @@ If any of these are missing it'll generate them randomly, except for the priorit
             footer_text = f"Time to generate: {u_text.smart_text(round(current - start, 3), 'second')}"
         )
 
-        await ctx.reply(embed=embed, file=discord.File(graph))
+        await ctx.reply(embed=embed, file=discord.File(graph, filename="generated_graph.png"))
         await message.delete()
 
 
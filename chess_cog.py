@@ -5,7 +5,6 @@ import discord
 import typing
 import time
 import random
-import copy
 import traceback
 import io
 import asyncio
@@ -28,6 +27,9 @@ import utility.text as u_text
 
 database = None # type: u_files.DatabaseInterface
 
+# A lock for the game in each channel, so only one move is handled at a time in a game while the bot is thinking.
+game_locks = {} # type: dict[int, asyncio.Lock]
+
 PING_LISTS_CHANNEL = 1060344552818483230
 
 class Chess_cog(
@@ -96,19 +98,22 @@ class Chess_cog(
         
         # Now actaully run the games.
         
+        print(f"Running {len(games)} chess matches.")
+        results = u_chess.run_tournament(
+            jobs = [
+                {
+                    "kind": "match",
+                    "time_limit": u_chess.MATCH_TIME_LIMIT,
+                    **data
+                }
+                for data in games
+            ]
+        )
+        
         game_outcomes = []
         
-        print("Running chess matches.")
-        for index, data in enumerate(games):
-            game_white = u_chess.get_bot(data["white"])
-            game_black = u_chess.get_bot(data["black"])
-
-            print(f"{index+1}/{len(games)}: {game_white.name} vs {game_black.name}")
-            game_data = u_chess.run_match(
-                white = game_white,
-                black = game_black
-            )
-            print("Done.")
+        for data, result in zip(games, results):
+            game_data = result["result"]
             
             game_data["white"] = data["white"]
             game_data["black"] = data["black"]
@@ -121,6 +126,10 @@ class Chess_cog(
         }
             
         database.save("chess", "daily", "matches", data=save_data)
+
+        bot_stats = u_chess.summarize_bot_stats(results)
+        database.save("chess", "daily", "match_stats", data=bot_stats)
+        self.print_bot_stats(bot_stats)
         
         print("-- Finished computing matches. --")
         
@@ -159,21 +168,14 @@ class Chess_cog(
             },
             "bots": {}
         }
-        print("Daily puzzle:")
-        for bot_name, bot in u_chess.get_bot_list().items():
-            print(f"Running {bot_name}...")
-            daily_data["bots"][bot_name] = u_chess.run_puzzle(
-                bot = bot,
-                pgn = daily["game"]["pgn"],
-                solution = daily["puzzle"]["solution"]
-            )
-            print("Done.")
+        print("Daily puzzle.")
         output_puzzles.append(daily_data)
+        puzzles = [daily]
             
         ####################
         # Bulk puzzles.
         
-        for index, puzzle in enumerate(bulk["puzzles"]):
+        for puzzle in bulk["puzzles"]:
             puzzle_board = u_chess.get_board_from_pgn(puzzle["game"]["pgn"])
             puzzle_results = {
                 "puzzle": {
@@ -185,21 +187,73 @@ class Chess_cog(
                 },
                 "bots": {}
             }
-            print(f"{index+1}/{len(bulk['puzzles'])} | Puzzle {puzzle['puzzle']['id']}:")
-            for bot_name, bot in u_chess.get_bot_list().items():
-                print(f"Running {bot_name}...")
-                puzzle_results["bots"][bot_name] = u_chess.run_puzzle(
-                    bot = bot,
-                    pgn = puzzle["game"]["pgn"],
-                    solution = puzzle["puzzle"]["solution"]
-                )
-                print("Done.")
+            print(f"Puzzle {puzzle['puzzle']['id']}.")
             output_puzzles.append(puzzle_results)
+            puzzles.append(puzzle)
+        
+        ####################
+        # Run every bot on every puzzle.
+
+        bot_names = list(u_chess.get_bot_list())
+        
+        print(f"Running {len(bot_names)} bots on {len(puzzles)} puzzles.")
+        results = u_chess.run_tournament(
+            jobs = [
+                {
+                    "kind": "puzzle",
+                    "time_limit": u_chess.PUZZLE_TIME_LIMIT,
+                    "bot": bot_name,
+                    "pgn": puzzle["game"]["pgn"],
+                    "solution": puzzle["puzzle"]["solution"]
+                }
+                for puzzle in puzzles
+                for bot_name in bot_names
+            ]
+        )
+
+        for index, result in enumerate(results):
+            puzzle_index, bot_index = divmod(index, len(bot_names))
+            output_puzzles[puzzle_index]["bots"][bot_names[bot_index]] = result["result"]
             
         database.save("chess", "daily", "puzzles", data=output_puzzles)
+
+        bot_stats = u_chess.summarize_bot_stats(results)
+        database.save("chess", "daily", "puzzle_stats", data=bot_stats)
+        self.print_bot_stats(bot_stats)
         
         print("-- Finished computing puzzles. --")
     
+    def print_bot_stats(
+            self: typing.Self,
+            bot_stats: dict[str, dict[str, int | float | None]]
+        ) -> None:
+        """Prints the average move time and nodes searched for each bot, from `u_chess.summarize_bot_stats`."""
+        for bot_name, stats in bot_stats.items():
+            print(self.format_bot_stats(bot_name, stats))
+    
+    def format_bot_stats(
+            self: typing.Self,
+            bot_name: str,
+            stats: dict[str, int | float | None]
+        ) -> str:
+        """Formats one bot's stats from `u_chess.summarize_bot_stats` as a single line."""
+        if stats["average_move_time"] is None:
+            move_time = "no moves"
+        else:
+            move_time = f"{round(stats['average_move_time'] * 1000, 1)} ms per move over {u_text.smart_number(stats['moves'])} moves"
+        
+        if stats["average_nodes"] is None:
+            nodes = "no search reported"
+        else:
+            nodes = f"{u_text.smart_number(round(stats['average_nodes']))} nodes per search"
+        
+        line = f"{bot_name}: {move_time}, {nodes}"
+
+        if stats["timeouts"]:
+            line += f", {stats['timeouts']} timed out"
+        
+        return line
+    
     ##########################################################
     
     async def announce_matches(self: typing.Self) -> None:
@@ -300,12 +354,13 @@ class Chess_cog(
             elo_delta[game_black.name] = round(black_elo_difference)
 
             try:
-                u_images.chess_match(
+                match_image = await u_images.render_service.render(
+                    u_images.chess_match,
                     bot_white = game_white.name,
                     bot_black = game_black.name,
                     game_data = game_data
                 )
-                send_file = discord.File("images/generated/chess_match.png")
+                send_file = discord.File(match_image, filename="chess_match.png")
                 send_file_link = "attachment://chess_match.png"
             except:
                 # Oh no! :(
@@ -390,12 +445,13 @@ class Chess_cog(
                 "values": values
             })
         
-        file_name = u_images.generate_graph(
+        graph = await u_images.render_service.render(
+            u_images.generate_graph,
             lines = lines,
             x_label = "Match number",
             y_label = "Bot elo"
         )
-        send_file = discord.File(file_name, filename="graph.png")
+        send_file = discord.File(graph, filename="graph.png")
         send_file_link = "attachment://graph.png"
         
         ### Generating the embed. ###
@@ -509,8 +565,8 @@ class Chess_cog(
                     
                 by_bot_results[bot].append(bool_to_emoji[data["correct"]])
             
-            u_images.chess_puzzle(puzzle, puzzle_elo_data)
-            send_file = discord.File("images/generated/chess_puzzle.png")
+            puzzle_image = await u_images.render_service.render(u_images.chess_puzzle, puzzle, puzzle_elo_data)
+            send_file = discord.File(puzzle_image, filename="chess_puzzle.png")
             send_file_link = "attachment://chess_puzzle.png"
             
             embed = u_interface.gen_embed(
@@ -547,12 +603,13 @@ class Chess_cog(
             for bot, elo in data.items():
                 graph_data[bot]["values"].append((day_number, elo))
         
-        file_name = u_images.generate_graph(
+        graph = await u_images.render_service.render(
+            u_images.generate_graph,
             lines = list(graph_data.values()),
             x_label = "Day number",
             y_label = "Bot puzzle elo"
         )
-        send_file = discord.File(file_name, filename="graph.png")
+        send_file = discord.File(graph, filename="graph.png")
         send_file_link = "attachment://graph.png"
         
         def make_bot_line(bot: type[u_chess.ChessBot]) -> str:
@@ -587,12 +644,18 @@ class Chess_cog(
             do_reply: bool = False,
             custom_content: str | None = None
         ) -> discord.Message:
-        render_path = u_chess.render_data(data)
+        board = u_chess.get_board_from_dict(data)
+
+        position_image = await u_images.render_service.render(
+            u_chess.render_board,
+            board,
+            flipped = data["player_side"] == "black",
+            output_argument = "path"
+        )
 
         image = "attachment://chess_position.png"
-        image_file = discord.File(render_path, filename="chess_position.png")
+        image_file = discord.File(position_image, filename="chess_position.png")
 
-        board = u_chess.get_board_from_dict(data)
         outcome_text = ""
         if board.is_checkmate():
             outcome_text = "# Checkmate!"
@@ -616,37 +679,35 @@ class Chess_cog(
         else:
             return await ctx.send(custom_content, embed=embed, file=image_file)
     
-    def make_bot_move(
+    def game_lock(
             self: typing.Self,
-            data: dict
-        ) -> dict:
-        board = u_chess.get_board_from_dict(data)
-
-        if board.outcome() is not None:
-            return data
+            channel: discord.abc.Messageable
+        ) -> asyncio.Lock:
+        """Returns the lock for the game in the given channel."""
+        if channel.id not in game_locks:
+            game_locks[channel.id] = asyncio.Lock()
         
-        player = data["player_side"] == "white"
+        return game_locks[channel.id]
+    
+    async def make_bot_move(
+            self: typing.Self,
+            ctx: commands.Context | u_custom.CustomContext,
+            data: dict
+        ) -> tuple[dict, str | None]:
+        """Plays the bot's move if it's the bot's turn. The bot is run by `u_chess.engine_move`, so other events are still handled while it thinks.
+
+        Returns:
+            tuple[dict, str | None]: The game data, and a message to send with the board if the bot didn't pick a move in time.
+        """
+        data, used_fallback = await u_chess.engine_move(
+            data = data,
+            queue_key = ctx.channel.id
+        )
 
-        # If it's currently the player's turn, just skip it.
-        if player == board.turn:
-            return data
+        if used_fallback:
+            return data, f"{u_chess.get_bot(data['bot_name']).formatted_name()} didn't pick a move in time, so it played a random move."
         
-        bot_class = u_chess.get_bot(data["bot_name"])
-
-        bot_data = data.get("bot_data", {})
-        bot = bot_class(bot_data)
-
-        save_data = bot.save()
-
-        if isinstance(save_data, dict):
-            data["bot_data"] = save_data
-
-        move = bot.turn(board=copy.deepcopy(board))
-        san = board.san_and_push(move)
-
-        data["moves"].append(san)
-
-        return data
+        return data, None
 
         
 
@@ -768,19 +829,21 @@ class Chess_cog(
             starting_fen = fen
         )
 
-        new_data = self.make_bot_move(new_data)
+        async with self.game_lock(ctx.channel):
+            new_data, content = await self.make_bot_move(ctx, new_data)
 
-        # Setup the new game.
-        u_chess.update_game(
-            database=database,
-            channel=ctx.channel,
-            data = new_data
-        )  
+            # Setup the new game.
+            u_chess.update_game(
+                database=database,
+                channel=ctx.channel,
+                data = new_data
+            )  
         
         await self.send_board(
             ctx = ctx,
             data = new_data,
-            do_reply = True
+            do_reply = True,
+            custom_content = content
         )
 
         
@@ -805,54 +868,56 @@ class Chess_cog(
             ctx: commands.Context | u_custom.CustomContext,
             move: typing.Optional[str] = commands.parameter(description = "The move you want to make in algebraic Chess notation.")
         ):
-        current_data = u_chess.get_game(database, ctx.channel)
+        async with self.game_lock(ctx.channel):
+            current_data = u_chess.get_game(database, ctx.channel)
 
-        if current_data is None:
-            await ctx.reply("There's no game here!\nUse `%chess setup` to make a new game!")
-            return
+            if current_data is None:
+                await ctx.reply("There's no game here!\nUse `%chess setup` to make a new game!")
+                return
         
-        board = u_chess.get_board_from_dict(current_data)
+            board = u_chess.get_board_from_dict(current_data)
 
-        if board.outcome() is not None:
-            await ctx.reply("This game has already ended. Use `%chess setup` to make a new game.")
-            return
+            if board.outcome() is not None:
+                await ctx.reply("This game has already ended. Use `%chess setup` to make a new game.")
+                return
         
-        try:
-            move = board.parse_san(move)
-            move = board.san_and_push(move)
-        except chess.InvalidMoveError:
-            await ctx.reply("I am sorry, but that is an invalid move.")
-            return
-        except chess.IllegalMoveError:
-            await ctx.reply("I am sorry, but that is an illegal move.")
-            return
-        except chess.AmbiguousMoveError:
-            await ctx.reply("Multiple pieces can go there, please specify which one.")
-            return
+            try:
+                move = board.parse_san(move)
+                move = board.san_and_push(move)
+            except chess.InvalidMoveError:
+                await ctx.reply("I am sorry, but that is an invalid move.")
+                return
+            except chess.IllegalMoveError:
+                await ctx.reply("I am sorry, but that is an illegal move.")
+                return
+            except chess.AmbiguousMoveError:
+                await ctx.reply("Multiple pieces can go there, please specify which one.")
+                return
         
-        current_data["moves"].append(move)
-        current_data["last_move"] = int(time.time())
+            current_data["moves"].append(move)
+            current_data["last_move"] = int(time.time())
 
-        if ctx.author.id not in current_data["players"]:
-            current_data["players"].append(ctx.author.id)
+            if ctx.author.id not in current_data["players"]:
+                current_data["players"].append(ctx.author.id)
         
-        try:
-            await ctx.message.add_reaction("✅")
-        except:
-            pass
+            try:
+                await ctx.message.add_reaction("✅")
+            except:
+                pass
 
-        current_data = self.make_bot_move(current_data)
+            current_data, content = await self.make_bot_move(ctx, current_data)
         
-        u_chess.update_game(
-            database = database,
-            channel = ctx.channel,
-            data = current_data
-        )
+            u_chess.update_game(
+                database = database,
+                channel = ctx.channel,
+                data = current_data
+            )
         
         await self.send_board(
             ctx = ctx,
             data = current_data,
-            do_reply = False
+            do_reply = False,
+            custom_content = content
         )
 
 
@@ -1203,14 +1268,15 @@ Parameters:
             await ctx.reply("The given constraints result in no bots on the graph.")
             return
         
-        file_name = u_images.generate_graph(
+        graph = await u_images.render_service.render(
+            u_images.generate_graph,
             lines = lines,
             x_label = "Day number" if use_puzzles else "Match number",
             y_label = "Bot puzzle elo" if use_puzzles else "Bot elo",
             log_scale = log_scale
         )
 
-        await ctx.reply(file=discord.File(file_name))
+        await ctx.reply(file=discord.File(graph, filename="generated_graph.png"))
 
 
         
@@ -1402,7 +1468,7 @@ Parameters:
             self: typing.Self,
             ctx: commands.Context | u_custom.CustomContext
         ):
-        self.compute_matches()
+        await asyncio.to_thread(self.compute_matches)
         await ctx.reply("Done.")
 
 
@@ -1428,8 +1494,50 @@ Parameters:
             self: typing.Self,
             ctx: commands.Context | u_custom.CustomContext
         ):
-        self.compute_puzzles()
-        await ctx.reply("Computing...")
+        await asyncio.to_thread(self.compute_puzzles)
+        await ctx.reply("Done.")
+
+
+        
+
+
+        
+        
+            
+
+        
+    ######################################################################################################################################################
+    ##### CHESS TIMINGS ##################################################################################################################################
+    ######################################################################################################################################################
+        
+    @chess.command(
+        name = "timings",
+        brief = "Shows how long each bot took in the last daily run.",
+        description = "Shows each bot's average move time and nodes searched from the last daily matches and puzzles.\nUse `%chess compute_all` to compute the data."
+    )
+    @commands.is_owner()
+    async def chess_timings(
+            self: typing.Self,
+            ctx: commands.Context | u_custom.CustomContext
+        ):
+        sections = []
+
+        for title, key in (("Matches", "match_stats"), ("Puzzles", "puzzle_stats")):
+            bot_stats = database.load("chess", "daily", key, default=None)
+
+            if not bot_stats:
+                lines = "*Nothing has been computed.*"
+            else:
+                lines = "\n".join(f"- {self.format_bot_stats(bot_name, stats)}" for bot_name, stats in bot_stats.items())
+            
+            sections.append(f"**{title}:**\n{lines}")
+        
+        embed = u_interface.gen_embed(
+            title = "Chess bot timings",
+            description = "\n\n".join(sections)[:4000]
+        )
+
+        await ctx.reply(embed=embed)
 
 
         
@@ -877,7 +877,7 @@ class Games_cog(
 
         roll_distribution = [(i, rolled.count(i)) for i in range(1, int(dice_sides) + 1)]
 
-        image_path = u_images.generate_bar_graph(roll_distribution, x_label="Roll result", y_label="Number of rolls")
+        graph = await u_images.render_service.render(u_images.generate_bar_graph, roll_distribution, x_label="Roll result", y_label="Number of rolls")
         
         embed = u_interface.gen_embed(
             title = "{}d{}".format(dice_amount, dice_sides),
@@ -887,7 +887,7 @@ class Games_cog(
             ),
             image_link = "attachment://graph.png"
         )
-        await ctx.reply(embed=embed, file=discord.File(image_path, filename="graph.png"))
+        await ctx.reply(embed=embed, file=discord.File(graph, filename="graph.png"))
         
 
 
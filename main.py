@@ -34,11 +34,11 @@ def run_bot():
 
         # Save the database, this is assuming on_ready() was called twice.
         try:
-            bot.database.save_database(make_backup=True)
+            await bot.database.save_database_async(make_backup=True)
             print("Database saved.")
         except AttributeError:
             print("Setting up database.")
-            bot.database = u_files.DatabaseInterface()
+            bot.database = u_files.get_database_interface()
             print("Database setup complete.")
 
 
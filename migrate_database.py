@@ -0,0 +1,26 @@
+"""Migrates database.json to database.sqlite, so the bot can be switched to the SQLite driver by setting DATABASE_DRIVER to "sqlite" in the .env file.
+
+The bot should be stopped while this runs.
+Run from the root of the repository with `python migrate_database.py`, add `--replace` to replace an existing database.sqlite."""
+
+import sys
+
+import utility.files as u_files
+
+def main() -> None:
+    try:
+        migrated = u_files.migrate_to_sqlite(replace="--replace" in sys.argv[1:])
+    except FileExistsError as error:
+        print(f"{error} Run with --replace to replace it.")
+        sys.exit(1)
+    except ValueError as error:
+        print(error)
+        sys.exit(1)
+    
+    for name, count in migrated.items():
+        print(f"- {name}: {count} {'key' if count == 1 else 'keys'}")
+    
+    print(f"Migrated {len(migrated)} top-level keys to {u_files.SQLiteDatabaseInterface.sqlite_path}.")
+
+if __name__ == "__main__":
+    main()
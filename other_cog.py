@@ -1356,7 +1356,8 @@ class Other_cog(
             await ctx.reply("I can't find anyone ever having that role.")
             return
         
-        file_path = u_images.generate_graph(
+        graph = await u_images.render_service.render(
+            u_images.generate_graph,
             lines = [{
                     "values": tracked_data
             }],
@@ -1370,7 +1371,7 @@ class Other_cog(
             image_link = "attachment://graph.png"
         )
         
-        await ctx.reply(embed=embed, file=discord.File(file_path, filename="graph.png"))
+        await ctx.reply(embed=embed, file=discord.File(graph, filename="graph.png"))
         
             
 
@@ -1876,7 +1877,7 @@ class Other_cog(
 
             board = chess.Board(board_fen)
 
-            u_chess.render_board(board, path='images/generated/chess_position.png', last_move=last_move)
+            position_image = await u_images.render_service.render(u_chess.render_board, board, last_move=last_move, output_argument="path")
 
             fields.append(
                 ("Highlighted game:", f"White: {ret_json['featured']['white']['name']} (*{u_text.smart_number(ret_json['featured']['white']['rating'])}*)\nBlack: {ret_json['featured']['black']['name']} (*{u_text.smart_number(ret_json['featured']['black']['rating'])}*)", False)
@@ -1884,7 +1885,7 @@ class Other_cog(
 
             image = "attachment://chess_position.png"
             
-            image_file = discord.File("images/generated/chess_position.png", filename="chess_position.png")
+            image_file = discord.File(position_image, filename="chess_position.png")
 
         
         embed = u_interface.gen_embed(
@@ -2374,7 +2375,7 @@ class Other_cog(
 
         # Run the actual solver.
         try:
-            result = u_solvers.evaluate_wrapper(equation=equation)
+            result = await u_solvers.evaluate_async(equation=equation, user_id=ctx.author.id)
             description = f"The result from the equation `{equation}`:\n## {u_text.format_decimal(result)}"
 
             if len(description) >= 4000:
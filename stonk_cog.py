@@ -9,6 +9,9 @@ import random
 import copy
 import os
 
+# pip install numpy
+import numpy as np
+
 import sys
 
 import utility.bread as u_bread
@@ -66,16 +69,16 @@ class Stonk_cog(
             ctx: commands.Context | u_custom.CustomContext,
             tick_id: typing.Optional[u_converters.parse_int] = commands.parameter(description = "An optional specific tick to look at.")
         ):
-        stonk_history = u_stonks.stonk_history(database)
+        columns = u_stonks.history_columns(database)
 
         if tick_id is None:
-            tick_id = len(stonk_history) - 1
+            tick_id = len(columns) - 1
         
-        if not(0 <= tick_id <= len(stonk_history) - 1):
-            await ctx.reply(f"The stonk tick number must be between 0 and {u_text.smart_number(len(stonk_history) - 1)}.")
+        if not(0 <= tick_id <= len(columns) - 1):
+            await ctx.reply(f"The stonk tick number must be between 0 and {u_text.smart_number(len(columns) - 1)}.")
             return
         
-        tick_data = stonk_history[tick_id]
+        tick_data = columns.tick(tick_id)
         
         description_lines = []
 
@@ -220,12 +223,12 @@ class Stonk_cog(
         
         found_data = {stonk: [] for stonk in stonks_use}
         
-        stonk_history = u_stonks.stonk_history(database)
+        columns = u_stonks.history_columns(database)
 
         previous_tick = {}
         
         for tick_back in range(ticks + 1):
-            tick_data = stonk_history[ticks * -1 - 1 + tick_back]
+            tick_data = columns.tick(ticks * -1 - 1 + tick_back)
 
             if tick_back == 0:
                 previous_tick = tick_data.copy()
@@ -378,8 +381,9 @@ class Stonk_cog(
         
         parsed = parsed["stats"]
         
-        tick_data = u_stonks.stonk_history(database)[tick_id]
-        previous_tick_data = u_stonks.stonk_history(database)[max(tick_id - 1, 0)]
+        columns = u_stonks.history_columns(database)
+        tick_data = columns.tick(tick_id)
+        previous_tick_data = columns.tick(max(tick_id - 1, 0))
 
         dough_value = []
         previous_dough_value = []
@@ -444,7 +448,7 @@ class Stonk_cog(
     
     @stonk.command(
         name = "search",
-        description = "Searches for stonk values in the stonk history.\n\nTo provide the values for your search, format each one as '<stonk> <value>', with a space in the middle. Multiple stonks can be provided, as well.\n\nFor example, '%stonk search cookie 25' would search for ticks where cookies are worth 25 dough.\n\nIf multiple stonks are provided, they all must be true, so if you provide 'cookie 30 pretzel 107' then it will search for every tick where cookies are worth 30 and pretzels are worth 107.",
+        description = "Searches for stonk values in the stonk history.\n\nTo provide the values for your search, format each one as '<stonk> <value>', with a space in the middle. Multiple stonks can be provided, as well.\n\nFor example, '%stonk search cookie 25' would search for ticks where cookies are worth 25 dough.\n\nA range of values can be given as '<low>-<high>', so '%stonk search cookie 20-30' would search for ticks where cookies are worth between 20 and 30 dough, inclusive.\n\nIf multiple stonks are provided, they all must be true, so if you provide 'cookie 30 pretzel 107' then it will search for every tick where cookies are worth 30 and pretzels are worth 107.",
         brief = "Searches for stonk values in the stonk history."
     )
     async def stonk_search(
@@ -466,28 +470,33 @@ class Stonk_cog(
             if not stonk:
                 continue
 
-            if index == len(parameters) - 1 or not u_converters.is_digit(parameters[index + 1]):
+            if index == len(parameters) - 1:
+                await ctx.reply("You specified the {} stonk but didn't provide a value.".format(stonk))
+                return
+            
+            value = parameters[index + 1].split("-")
+
+            if len(value) > 2 or not all(u_converters.is_digit(part) for part in value):
                 await ctx.reply("You specified the {} stonk but didn't provide a value.".format(stonk))
                 return
             
-            stonk_values[stonk] = u_converters.parse_int(parameters[index + 1])
+            low = u_converters.parse_int(value[0])
+            high = u_converters.parse_int(value[-1])
+
+            if high < low:
+                await ctx.reply("The range for the {} stonk must have the lower value first.".format(stonk))
+                return
+
+            stonk_values[stonk] = (low, high)
 
         if len(stonk_values) == 0:
             await ctx.reply("Unfortunately, you must provide at least 1 stonk value.")
             return
         
-        stonk_history = u_stonks.stonk_history(database)
-
-        matched_ticks = []
-
-        items = stonk_values.items()
-
-        for tick_id, tick_data in enumerate(stonk_history):
-            for stonk, value in items:
-                if tick_data[stonk.internal_name] != value:
-                    break
-            else:
-                matched_ticks.append(tick_id)
+        matched_ticks = u_stonks.value_index(database).search({
+            stonk.internal_name: value_range
+            for stonk, value_range in stonk_values.items()
+        })
         
         embed = u_interface.gen_embed(
             title = "Stonk search",
@@ -518,48 +527,33 @@ class Stonk_cog(
             self: typing.Self,
             ctx: commands.Context | u_custom.CustomContext
         ):
-        history = u_stonks.stonk_history(database)
-
-        stonks = {
-            stonk: {
-                "highest": stonk.base_value,
-                "lowest": stonk.base_value,
-                "highest_tick": [],
-                "lowest_tick": []
-            }
-            for stonk in u_values.stonks
-        }
-
-        for tick_number, tick in enumerate(history):
-            for stonk in u_values.stonks:
-                if stonk.internal_name not in tick:
-                    continue
+        statistics = u_stonks.stonk_statistics(database)
 
-                value = tick[stonk.internal_name]
+        stonks = {}
 
-                if value > stonks[stonk]["highest"]:
-                    stonks[stonk]["highest"] = value
-                    stonks[stonk]["highest_tick"] = [str(tick_number)]
+        for stonk in u_values.stonks:
+            records = statistics.records(stonk.internal_name)
 
-                elif value == stonks[stonk]["highest"]:
-                    stonks[stonk]["highest_tick"].append(str(tick_number))
+            for record in ["highest", "lowest"]:
+                ticks = [str(tick_number) for tick_number in records[f"{record}_tick"]]
 
-                elif value < stonks[stonk]["lowest"]:
-                    stonks[stonk]["lowest"] = value
-                    stonks[stonk]["lowest_tick"] = [str(tick_number)]
+                # Only the first few ticks are kept, so just say how many others there were.
+                if records[f"{record}_count"] > len(ticks):
+                    ticks.append("and {} more".format(u_text.smart_number(records[f"{record}_count"] - len(ticks))))
+                
+                records[f"{record}_tick"] = ticks
 
-                elif value == stonks[stonk]["lowest"]:
-                    stonks[stonk]["lowest_tick"].append(str(tick_number))
+            stonks[stonk] = records
         
         fields = [
             (
                 stonk.emoji,
                 "Highest value: **{highest} dough** ({high_text} {highest_ticks})\nLowest value: **{lowest} dough** ({low_text} {lowest_ticks})".format(
                     highest = u_text.smart_number(stonks[stonk]["highest"]),
-                    high_text = u_text.word_plural("tick", len(stonks[stonk]["highest_tick"])),
+                    high_text = u_text.word_plural("tick", stonks[stonk]["highest_count"]),
                     highest_ticks = ", ".join(stonks[stonk]["highest_tick"]),
                     lowest = u_text.smart_number(stonks[stonk]["lowest"]),
-                    low_text = u_text.word_plural("tick", len(stonks[stonk]["lowest_tick"])),
+                    low_text = u_text.word_plural("tick", stonks[stonk]["lowest_count"]),
                     lowest_ticks = ", ".join(stonks[stonk]["lowest_tick"])
                 ),
                 False
@@ -606,23 +600,12 @@ class Stonk_cog(
             await ctx.reply("The end must be after the start.")
             return
 
-        split_counts = {stonk: 0 for stonk in u_values.stonks}
-
-        stonk_history = u_stonks.stonk_history(database)
+        statistics = u_stonks.stonk_statistics(database)
 
-        for stonk in u_values.stonks:
-            name = stonk.internal_name
-            previous_value = stonk_history[start].get(name, None)
-
-            for tick in stonk_history[start + 1: end + 1]:
-                if previous_value is not None and tick[name] / previous_value <= 0.85:
-                    for i in range(50):
-                        previous_value /= 2
-                        split_counts[stonk] += 1
-                        if not(tick[name] / previous_value <= 0.85):
-                            break
-
-                previous_value = tick.get(name, None)
+        split_counts = {
+            stonk: statistics.split_count(stonk.internal_name, start, end)
+            for stonk in u_values.stonks
+        }
         
         embed = u_interface.gen_embed(
             title = "Splits",
@@ -720,18 +703,15 @@ class Stonk_cog(
         start_tick = max(start_tick, 0)
         end_tick = min(end_tick, current_tick)
         
-        stonk_history = u_stonks.stonk_history(database)
+        columns = u_stonks.history_columns(database)
 
         lines = []
 
         for stonk in stonks:
-            values = []
+            column = columns.column(stonk.internal_name)[start_tick:end_tick + 1]
+            present = np.flatnonzero(column != u_stonks.MISSING)
 
-            for tick_number, tick in enumerate(stonk_history[start_tick:end_tick + 1]):
-                if stonk.internal_name not in tick:
-                    continue
-
-                values.append((tick_number + start_tick, tick[stonk.internal_name]))
+            values = list(zip((present + start_tick).tolist(), column[present].tolist()))
             
             if len(values) == 0:
                 continue
@@ -742,14 +722,15 @@ class Stonk_cog(
                 "values": values
             })
         
-        file_name = u_images.generate_graph(
+        graph = await u_images.render_service.render(
+            u_images.generate_graph,
             lines = lines,
             x_label = "Tick number",
             y_label = "Stonk value",
             log_scale = log_scale
         )
 
-        await ctx.reply(file=discord.File(file_name))
+        await ctx.reply(file=discord.File(graph, filename="generated_graph.png"))
     
 
 
@@ -856,31 +837,31 @@ class Stonk_cog(
         start = max(start, 0)
         end = min(end, u_stonks.current_tick_number(database=database))
 
-        stonk_history = u_stonks.stonk_history(database)
-
-        def sum_portfolio(portfolio: dict, tick: dict) -> int:
-            return sum([portfolio[stonk] * tick.get(stonk.internal_name, 0) for stonk in portfolio])
+        columns = u_stonks.history_columns(database)
 
         portfolio = {stonk: parsed["stats"].get(stonk, 0) for stonk in u_values.stonks}
 
-        values = []
+        # The values are converted to Python ints so the sums can't overflow.
+        stonk_values = {}
+        splits = {}
+        for stonk in portfolio:
+            column = columns.column(stonk.internal_name)[start:end]
+            stonk_values[stonk] = np.where(column == u_stonks.MISSING, 0, column).tolist()
+            splits[stonk] = columns.split_ticks(stonk.internal_name, start, end - 1)
 
-        previous_tick = None
-        for tick_id, tick_data in enumerate(stonk_history[start:end]):
-            if previous_tick is not None:
-                split_filter = u_stonks.filter_splits(u_stonks.convert_tick(previous_tick), u_stonks.convert_tick(tick_data))
-                previous_tick = split_filter["new"]
+        values = []
 
-                for stonk in split_filter["split_amounts"]:
-                    if split_filter["split_amounts"][stonk] == 0:
-                        continue
+        for offset in range(min(end, len(columns)) - start):
+            tick_id = offset + start
 
-                    portfolio[stonk] *= 2 ** split_filter["split_amounts"][stonk]
+            for stonk in portfolio:
+                if tick_id in splits[stonk]:
+                    portfolio[stonk] *= 2 ** splits[stonk][tick_id]
 
-            values.append((tick_id + start, sum_portfolio(portfolio, tick_data)))
-            previous_tick = tick_data
+            values.append((tick_id, sum([portfolio[stonk] * stonk_values[stonk][offset] for stonk in portfolio])))
 
-        file_name = u_images.generate_graph(
+        graph = await u_images.render_service.render(
+            u_images.generate_graph,
             lines = [{
                 "label": "Portfolio",
                 "color": "#1f77b4",
@@ -890,7 +871,7 @@ class Stonk_cog(
             y_label = "Portfolio value",
         )
 
-        await ctx.reply(file=discord.File(file_name))
+        await ctx.reply(file=discord.File(graph, filename="generated_graph.png"))
     
 
 
@@ -924,9 +905,9 @@ class Stonk_cog(
 
         portfolio = {stonk: parsed["stats"].get(stonk, 0) for stonk in u_values.stonks}
 
-        history = u_stonks.stonk_history(database)
-        current_values = u_stonks.convert_tick(history[-1])
-        previous_values = u_stonks.convert_tick(history[-2])
+        columns = u_stonks.history_columns(database)
+        current_values = u_stonks.convert_tick(columns.tick(-1))
+        previous_values = u_stonks.convert_tick(columns.tick(-2))
         
         stonk_values = {
             stonk: current_values.get(stonk) * portfolio.get(stonk)
@@ -1272,7 +1253,7 @@ class Stonk_cog(
             await ctx.reply("It would be pointless to render a blank graph.")
             return
 
-        stonk_history = u_stonks.stonk_history(database)
+        columns = u_stonks.history_columns(database)
 
         lines = []
 
@@ -1300,7 +1281,7 @@ class Stonk_cog(
 
             values = []
             for tick, portfolio in enumerate(portfolio_history[start_tick - 2000 + 1: end_tick - 2000 + 1]):
-                values.append((tick + start_tick + 1, u_algorithms.dough_sum(portfolio, stonk_history[tick + start_tick + 1])))
+                values.append((tick + start_tick + 1, u_algorithms.dough_sum(portfolio, columns.tick(tick + start_tick + 1))))
             
             data = {
                 "label": algorithm.replace("_", " ").title(),
@@ -1309,7 +1290,8 @@ class Stonk_cog(
             }
             lines.append(data)
         
-        file_name = u_images.generate_graph(
+        graph = await u_images.render_service.render(
+            u_images.generate_graph,
             lines = lines,
             x_label = "Tick number",
             y_label = "Algorithm net worth",
@@ -1321,7 +1303,7 @@ class Stonk_cog(
         if show_max != -1:
             content = f"Using max shown of {show_max}. Add `-max <number>` to the command to configure."
 
-        await ctx.reply(content, file=discord.File(file_name))
+        await ctx.reply(content, file=discord.File(graph, filename="generated_graph.png"))
 
 
 
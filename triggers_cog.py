@@ -88,6 +88,7 @@ class Triggers_cog(
 
     bingo_cache = {}
     parsed_bingo_cache = {}
+    detection_plan = None # type: u_detection.DispatchPlan
 
     # chains_data = u_files.load("data/chains_data.json")
 
@@ -125,6 +126,8 @@ class Triggers_cog(
             "weekly_enabled": u_bingo.decompile_enabled(self.bingo_cache["weekly_enabled"], 9),
             "weekly_board_id": self.bingo_cache["weekly_board_id"]
         }
+
+        self.detection_plan = u_detection.DispatchPlan(self.parsed_bingo_cache)
     
     def _get_channel_chain(self, channel_id: int) -> dict:
         """Returns the chains data for a specific channel."""
@@ -604,7 +607,7 @@ Settings list for configuring when you are the one replying:
                 print(traceback.format_exc())
             
             # Save and backup database.
-            database.save_database(make_backup=True)
+            await database.save_database_async(make_backup=True)
         except Exception as error:
             print(traceback.format_exc())
             if OUTPUT_ERRORS:
@@ -737,8 +740,9 @@ Settings list for configuring when you are the one replying:
             # Send the daily board.
             try:
                 daily_channel = await self.bot.fetch_channel(DAILY_BOARD_CHANNEL)
-                u_images.render_full_5x5(
-                    database = database,
+                board = await u_images.render_service.render(
+                    u_images.render_full_5x5,
+                    tile_list = u_bingo.tile_list_5x5(database=database),
                     tile_string = new_daily,
                     enabled = 0
                 )
@@ -748,19 +752,20 @@ Settings list for configuring when you are the one replying:
                         board_id = live_data["daily_board_id"],
                         stats_text = f"The previous day's stats have been archived! You can check the stats with `%bread day {live_data['daily_board_id'] - 1}`!" if handled_stats else "*Something went wrong with the daily stats.*"
                     ),
-                    file=discord.File(r'images/generated/bingo_board.png')
+                    file=discord.File(board, filename="bingo_board.png")
                 )
                 
                 # If it's the day for it, send the weekly board.
                 if weekly_board:
                     weekly_channel = await self.bot.fetch_channel(WEEKLY_BOARD_CHANNEL)
-                    u_images.render_board_9x9(
-                        database = database,
+                    board = await u_images.render_service.render(
+                        u_images.render_board_9x9,
+                        tile_list = u_bingo.tile_list_9x9(database=database),
                         tile_string = new_weekly,
                         enabled = 0
                     )
 
-                    await weekly_channel.send("Weekly Bingo Board #{}!".format(live_data["weekly_board_id"]), file=discord.File(r'images/generated/bingo_board.png'))
+                    await weekly_channel.send("Weekly Bingo Board #{}!".format(live_data["weekly_board_id"]), file=discord.File(board, filename="bingo_board.png"))
             except Exception as error:
                 print(traceback.format_exc())
                 if OUTPUT_ERRORS:
@@ -825,21 +830,17 @@ Settings list for configuring when you are the one replying:
         stonk_values = u_stonks.parse_stonk_tick(message)
 
         ### Updating stonk history. ###
-        stonk_history = u_stonks.stonk_history(database)
-
         append = {
             stonk.internal_name: values[-1]
             for stonk, values in stonk_values.items()
         }
 
-        stonk_history.append(append)
-        
-        database.save("stonks", "stonk_history", data=stonk_history)
+        tick_number = u_stonks.append_tick(database, append)
 
         ### Updating current values. ###
         new = {
             "message_link": message.jump_url,
-            "tick_number": len(stonk_history) - 1,
+            "tick_number": tick_number,
             "values": append
         }
 
@@ -853,8 +854,13 @@ Settings list for configuring when you are the one replying:
 
         send_file = None
         try:
-            u_images.stonk_report(database)
-            send_file = discord.File("images/generated/stonk_report.png")
+            report = await u_images.render_service.render(u_images.stonk_report, u_images.stonk_report_data(database))
+
+            # Keep a copy for %stonk report.
+            with open("images/generated/stonk_report.png", "wb") as file_write:
+                file_write.write(report.getvalue())
+
+            send_file = discord.File(report, filename="stonk_report.png")
         except:
             # Something went wrong :(
             print(traceback.format_exc())
@@ -892,7 +898,10 @@ Settings list for configuring when you are the one replying:
             await message.reply("Something went wrong with the auto detection.\nPlease ping Duck Duck.")    
         
         # Save the database to file.
-        database.save_database(make_backup=True)
+        await database.save_database_async(make_backup=True)
+
+        # Save the columnar copy of the stonk history.
+        await u_stonks.save_history_columns(database)
 
         # Update public/stonk_history.json.
         database.save_json_file("public", "stonk_history.json", data=u_stonks.stonk_history(database), join_file_path=True)
@@ -1013,12 +1022,13 @@ Settings list for configuring when you are the one replying:
         
     async def on_gamble(
             self: typing.Self,
-            message: discord.Message
+            message: discord.Message,
+            analysis: u_interface.MessageAnalysis
         ):
         # Gamble messages.
 
         command = None
-        if u_interface.is_reply(message, allow_ping=False):
+        if analysis.is_reply_no_ping:
             command = message.reference.message_id
 
         gamble_messages = database.load("bread", "gamble_messages", default={})
@@ -1109,7 +1119,7 @@ Settings list for configuring when you are the one replying:
             sent_number = u_converters.parse_int(content)
         else:
             try:
-                sent_number = round(u_solvers.evaluate_wrapper(content), 5)
+                sent_number = round(await u_solvers.evaluate_async(content, user_id=message.author.id), 5)
             except u_custom.BingoError:
                 return
 
@@ -1271,7 +1281,7 @@ Settings list for configuring when you are the one replying:
             return
         
         ### Check the PluralKit reply ping settings. ###
-        pk_reply_data = database.load("pk_reply_settings", default={})
+        pk_reply_data = database.load_view("pk_reply_settings", default={})
 
         # Check the author's ping reply data.
         author_data = pk_reply_data.get(str(message.author.id), {})
@@ -1415,23 +1425,27 @@ Settings list for configuring when you are the one replying:
     
     async def auto_detection(
             self: typing.Self,
-            message: discord.Message
+            message: discord.Message,
+            analysis: u_interface.MessageAnalysis
         ):
         # Filter out all messages sent by the bot, unless it's an objective completion message.
         if message.author.id == self.bot.user.id:
-            if not(u_interface.is_reply(message) and "completed!" in message.content):
+            if not(analysis.is_reply and "completed!" in message.content):
                 return
             
         await u_detection.on_message_detection(
             bot = self.bot,
             message = message,
             database = database,
-            bingo_data = self.parsed_bingo_cache
+            bingo_data = self.parsed_bingo_cache,
+            plan = self.detection_plan,
+            analysis = analysis
         )
     
     async def daily_stats(
             self: typing.Self,
-            message: discord.Message
+            message: discord.Message,
+            analysis: u_interface.MessageAnalysis
         ):
         if message.guild is None:
             return
@@ -1471,11 +1485,11 @@ Settings list for configuring when you are the one replying:
             increment("new_members")
         
         # The number of messages sent that are just "skill issue"
-        if message.content.lower() == "skill issue":
+        if analysis.content_lower == "skill issue":
             increment("skill_issues")
         
         # The number of messages that contain "owo"
-        if "owo" in message.content.lower():
+        if "owo" in analysis.content_lower:
             increment("owo_messages")
         
         # The number of times @gets pinged too much was pinged.
@@ -1483,18 +1497,18 @@ Settings list for configuring when you are the one replying:
             increment("gptm_pings")
         
         # The number of messages that contain "ah yes" after commas are removed.
-        if "ah yes" in message.content.lower().replace(",", ""):
+        if "ah yes" in analysis.content_lower.replace(",", ""):
             increment("ah_yes")
 
         # The following ones all require the message being sent by Machine-Mind.
-        if u_interface.is_mm(message):
+        if analysis.is_mm:
             # The number of messages sent by Machine-Mind.
             increment("mm_messages")
 
-            replied = u_interface.is_reply(message)
+            replied = analysis.is_reply
 
             # The number of gambles done.
-            if u_interface.is_gamble(message):
+            if analysis.is_gamble:
                 increment("gambles_done")
             
             # The amount of times alchemy was completed.
@@ -1602,7 +1616,7 @@ Settings list for configuring when you are the one replying:
                 
                 return_json = await resp.json()
 
-        filter_data = database.load("pk_filter", default={})
+        filter_data = database.load_view("pk_filter", default={})
         
         filter_ids = filter_data.get("member_ids", [])
 
@@ -1625,11 +1639,14 @@ Settings list for configuring when you are the one replying:
             self: typing.Self,
             message: discord.Message
         ):
+        # Everything here shares this, so each check and parser only runs once for the message.
+        analysis = u_interface.MessageAnalysis(message)
+
         # Run the auto detection. It will automatically filter out messages sent by the bot if needed.
-        await self.auto_detection(message)
+        await self.auto_detection(message, analysis)
 
         # Increment the daily stats.
-        await self.daily_stats(message)
+        await self.daily_stats(message, analysis)
 
         # Chains.
         await self.chains(message)
@@ -1641,11 +1658,11 @@ Settings list for configuring when you are the one replying:
         # Just a note, while there's u_custom.CustomContext for context objects, there is no CustomMessage, so u_interface.smart_reply still needs to be used.
 
         # Stonk ticks.
-        if u_interface.is_mm(message) and message.content.startswith("Current stonk values are as follows"):
+        if analysis.is_mm and message.content.startswith("Current stonk values are as follows"):
             await self.on_stonk_tick(message)
 
         # PluralKit replies.
-        if u_interface.is_reply(message, allow_ping=False):
+        if analysis.is_reply_no_ping:
             await self.pk_reply(message)
         
         # PluralKit filter.
@@ -1668,11 +1685,11 @@ Settings list for configuring when you are the one replying:
         # Profit
 
         # On gamble.
-        if u_interface.is_gamble(message):
-            await self.on_gamble(message)
+        if analysis.is_gamble:
+            await self.on_gamble(message, analysis)
         
         # Gold brick reacting.
-        if message.content == "<:brick_gold:971239215968944168>" and u_interface.is_mm(message) and not u_checks.sensitive_check(message.channel):
+        if message.content == "<:brick_gold:971239215968944168>" and analysis.is_mm and not u_checks.sensitive_check(message.channel):
             await message.add_reaction("<:brilliant_move:958751616939474995>")
         
         # Brick stats correcting.
@@ -0,0 +1,292 @@
+"""Differential backup storage for the database.
+
+Backups are stored as one gzipped base snapshot followed by a gzipped diff for every backup after it.
+Any backup can be rebuilt by applying the diffs up to it on top of the base.
+Once there are enough backups the oldest diffs are folded into a new base, so the base is only rewritten every `fold` backups."""
+
+import os
+import gzip
+import json
+import typing
+import tempfile
+
+def make_diff(
+        old: typing.Any,
+        new: typing.Any,
+        path: tuple[str] = ()
+    ) -> list[list]:
+    """Returns the list of operations that turns `old` into `new`.
+
+    Each operation is one of:
+    - `["set", keys, value]`
+    - `["delete", keys]`
+    - `["extend", keys, items, start]`, for lists that have only been added to. `start` is the length of the list before the items were added.
+
+    Args:
+        old (typing.Any): The previous data.
+        new (typing.Any): The new data.
+        path (tuple[str], optional): The keys leading to `old` and `new`. Defaults to ().
+
+    Returns:
+        list[list]: The operations, which can be given to `apply_diff`.
+    """
+    if old is new:
+        return []
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        operations = []
+
+        for key, value in new.items():
+            if key in old:
+                # Comparing first means unchanged parts don't have to be walked through here.
+                if old[key] != value:
+                    operations.extend(make_diff(old[key], value, (*path, key)))
+            else:
+                operations.append(["set", [*path, key], value])
+
+        for key in old:
+            if key not in new:
+                operations.append(["delete", [*path, key]])
+
+        return operations
+
+    if isinstance(old, list) and isinstance(new, list) and len(new) > len(old) and new[:len(old)] == old:
+        return [["extend", list(path), new[len(old):], len(old)]]
+
+    if old == new:
+        return []
+
+    return [["set", list(path), new]]
+
+def apply_diff(
+        data: typing.Any,
+        operations: list[list]
+    ) -> typing.Any:
+    """Applies a list of operations from `make_diff`. This modifies the given data.
+
+    Args:
+        data (typing.Any): The data to modify.
+        operations (list[list]): The operations to apply.
+
+    Returns:
+        typing.Any: The modified data. This is only a different object if the entire thing was replaced.
+    """
+    for operation in operations:
+        kind, keys = operation[0], operation[1]
+
+        if len(keys) == 0:
+            if kind == "set":
+                data = operation[2]
+            elif kind == "extend":
+                data.extend(operation[2])
+            continue
+
+        parent = data
+        for key in keys[:-1]:
+            parent = parent[key]
+
+        if kind == "set":
+            parent[keys[-1]] = operation[2]
+        elif kind == "delete":
+            del parent[keys[-1]]
+        elif kind == "extend":
+            parent[keys[-1]].extend(operation[2])
+
+    return data
+
+class BackupStore:
+    """A folder of backups stored as a base snapshot and a diff for every backup after it.
+
+    The folder contains an index.json with the base and the list of diffs in order, so nothing has to be listed or sorted to find them."""
+
+    def __init__(
+            self: typing.Self,
+            folder: str = "backups",
+            keep: int = 196,
+            fold: int = 24
+        ) -> None:
+        """A folder of backups stored as a base snapshot and a diff for every backup after it.
+
+        Args:
+            folder (str, optional): The folder to store the backups in. Defaults to "backups".
+            keep (int, optional): The minimum number of backups to keep. Defaults to 196.
+            fold (int, optional): How many diffs to fold into the base at once when there are more than `keep` backups. Defaults to 24.
+        """
+        self.folder = folder
+        self.keep = keep
+        self.fold = fold
+
+        # The data in the most recent backup, so the next diff doesn't need to rebuild it.
+        self._latest = None # type: dict
+
+    @property
+    def index_path(self: typing.Self) -> str:
+        return os.path.join(self.folder, "index.json")
+
+    def exists(self: typing.Self) -> bool:
+        """Returns whether there are any backups in the store."""
+        return self._read_index()["base"] is not None
+
+    def stamps(self: typing.Self) -> list[str]:
+        """Returns the stamps of every backup that can be restored, oldest first."""
+        index = self._read_index()
+
+        if index["base"] is None:
+            return []
+
+        return [index["base"]] + index["diffs"]
+
+    def add(
+            self: typing.Self,
+            data: dict,
+            stamp: str
+        ) -> int:
+        """Adds a backup to the store. `data` is kept to make the next diff, so it should not be modified afterwards.
+
+        Args:
+            data (dict): The database to back up.
+            stamp (str): The name of the backup. These should be unique and sort in the order the backups were made.
+
+        Raises:
+            ValueError: If there is already a backup with the given stamp.
+
+        Returns:
+            int: The number of bytes written.
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        index = self._read_index()
+
+        if stamp == index["base"] or stamp in index["diffs"]:
+            raise ValueError(f"There is already a backup called {stamp}.")
+
+        if index["base"] is None:
+            written = self._write(self._base_path(stamp), data)
+            index["base"] = stamp
+        else:
+            previous = self._latest
+            if previous is None:
+                previous = self.restore()
+
+            written = self._write(self._diff_path(stamp), make_diff(previous, data))
+            index["diffs"].append(stamp)
+
+        self._latest = data
+
+        if len(index["diffs"]) + 1 > self.keep + self.fold:
+            written += self._fold_oldest(index)
+
+        self._write_index(index)
+
+        return written
+
+    def restore(
+            self: typing.Self,
+            stamp: str = None
+        ) -> dict:
+        """Rebuilds the database as it was in a backup.
+
+        Args:
+            stamp (str, optional): The stamp of the backup to rebuild. Defaults to the most recent backup.
+
+        Raises:
+            KeyError: If there is no backup with the given stamp.
+
+        Returns:
+            dict: The rebuilt database.
+        """
+        index = self._read_index()
+
+        if index["base"] is None:
+            raise KeyError("There are no backups.")
+
+        if stamp is None:
+            stamp = ([index["base"]] + index["diffs"])[-1]
+
+        if stamp != index["base"] and stamp not in index["diffs"]:
+            raise KeyError(f"There is no backup called {stamp}.")
+
+        data = self._read(self._base_path(index["base"]))
+
+        if stamp == index["base"]:
+            return data
+
+        for diff_stamp in index["diffs"]:
+            data = apply_diff(data, self._read(self._diff_path(diff_stamp)))
+
+            if diff_stamp == stamp:
+                break
+
+        return data
+
+    def _fold_oldest(
+            self: typing.Self,
+            index: dict
+        ) -> int:
+        """Folds the oldest diffs into a new base, and removes the old base and folded diffs."""
+        folded = index["diffs"][:self.fold]
+        new_base = folded[-1]
+
+        written = self._write(self._base_path(new_base), self.restore(new_base))
+
+        os.remove(self._base_path(index["base"]))
+        for stamp in folded:
+            os.remove(self._diff_path(stamp))
+
+        index["base"] = new_base
+        index["diffs"] = index["diffs"][self.fold:]
+
+        print(f"Folded {len(folded)} backups into a new base, {new_base}.")
+
+        return written
+
+    ######################################################################################################################################################
+    ##### Files ##########################################################################################################################################
+    ######################################################################################################################################################
+
+    def _base_path(
+            self: typing.Self,
+            stamp: str
+        ) -> str:
+        return os.path.join(self.folder, f"base_{stamp}.json.gz")
+
+    def _diff_path(
+            self: typing.Self,
+            stamp: str
+        ) -> str:
+        return os.path.join(self.folder, f"diff_{stamp}.json.gz")
+
+    def _read_index(self: typing.Self) -> dict:
+        try:
+            with open(self.index_path, "r", encoding="utf8") as file_load:
+                return json.load(file_load)
+        except FileNotFoundError:
+            return {"base": None, "diffs": []}
+
+    def _write_index(
+            self: typing.Self,
+            index: dict
+        ) -> None:
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.folder, prefix="index", suffix=".tmp")
+
+        with os.fdopen(file_descriptor, "w", encoding="utf8") as file_write:
+            json.dump(index, file_write)
+
+        os.replace(temp_path, self.index_path)
+
+    def _read(
+            self: typing.Self,
+            path: str
+        ) -> typing.Any:
+        with gzip.open(path, "rt", encoding="utf8") as file_load:
+            return json.load(file_load)
+
+    def _write(
+            self: typing.Self,
+            path: str,
+            data: typing.Any
+        ) -> int:
+        """Writes gzipped json to a file and returns the size of the file."""
+        with gzip.open(path, "wt", encoding="utf8", compresslevel=6) as file_write:
+            json.dump(data, file_write, separators=(",", ":"))
+
+        return os.path.getsize(path)
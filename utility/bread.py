@@ -11,6 +11,9 @@ import random
 # pip install pytz
 import pytz
 
+# pip install numpy
+import numpy as np
+
 import utility.text as u_text
 import utility.values as u_values
 import utility.interface as u_interface
@@ -1508,16 +1511,20 @@ def get_stored_data(
     """
     return BreadDataAccount(user_id, database)
 
-def parse_gamble(message: discord.Message | str) -> list[typing.Type[u_values.Item]] | None:
+def parse_gamble(
+        message: discord.Message | str,
+        verified: bool = False
+    ) -> list[typing.Type[u_values.Item]] | None:
     """Parses a gamble message to determine the items it contains. This will check if the message is a gamble via `utility.interface.is_gamble()`.
 
     Args:
         message (discord.Message): The gamble message to parse.
+        verified (bool, optional): Whether the message is already known to be a gamble, which skips the check. Defaults to False.
 
     Returns:
         list[typing.Type[u_values.Item]] | None: The items in the gamble, in order from left to right, top to bottom. None will be returned if the message is not a gamble.
     """
-    if not u_interface.is_gamble(message):
+    if not verified and not u_interface.is_gamble(message):
         return None
     
     try:
@@ -1529,16 +1536,20 @@ def parse_gamble(message: discord.Message | str) -> list[typing.Type[u_values.It
 
     return [u_values.get_item(item, "gamble_item") for item in raw]
 
-def parse_roll(message: discord.Message) -> list[dict[str, str | int | list[typing.Type[u_values.Item]]]] | None:
+def parse_roll(
+        message: discord.Message,
+        verified: bool = False
+    ) -> list[dict[str, str | int | list[typing.Type[u_values.Item]]]] | None:
     """Parses a message to determine the items it contains.
 
     Args:
         message (discord.Message): The message to parse.
+        verified (bool, optional): Whether the message is already known to be a bread roll, which skips the check. Defaults to False.
 
     Returns:
         list[dict[str, str | int | list[typing.Type[u_values.Item]]]] | None: A list of dictionaries. Each inner dictionary contains the roll type under the key `type`, and the roll contents under `items`. `items` is a single roll in a compound roller message. This will return None if the message is not a bread roll. 
     """
-    if not u_interface.is_bread_roll(message):
+    if not verified and not u_interface.is_bread_roll(message):
         return None
     
     by_roll = u_interface.remove_starting_ping(message.content).replace("\n", "").split("---")
@@ -1578,6 +1589,58 @@ def parse_roll(message: discord.Message) -> list[dict[str, str | int | list[typi
     return output
 
     
+ROLLING_ODDS_KEYS = ("special_bread", "rare_bread", "chess_piece", "gem_red", "gem_blue", "gem_purple", "gem_green", "gem_gold", "anarchy_chess", "anarchy_piece")
+
+def rolling_odds_deviation(
+        planet_deviation: float = None,
+        in_nebula: bool = False,
+        black_hole: bool = False,
+        effective_deviation: float = None
+    ) -> float:
+    """Returns the deviation used for a planet's rolling odds, which is `effective_deviation` if it's provided."""
+    if effective_deviation is not None:
+        return effective_deviation
+    
+    if in_nebula:
+        denominator = 1
+    else:
+        denominator = math.tau
+
+    if black_hole:
+        # If it's a black hole, make it a little crazier by dividing the denominator by 5.
+        denominator /= 5
+
+    return (1 - planet_deviation) / denominator
+
+def planet_base_odds(
+        priority: str,
+        tile_seed: str,
+        deviation: float
+    ) -> dict[str, float]:
+    """Returns the planet seed for each category, which the daily odds are centered on. These do not change per day."""
+    sqrt_phi = math.sqrt((1 + math.sqrt(5)) / 2)
+
+    odds = {}
+
+    for key in ROLLING_ODDS_KEYS:
+        odds[key] = random.Random(f"{tile_seed}{key}").gauss(mu=1, sigma=deviation)
+
+        if key == priority:
+            odds[key] = (abs(odds[key] - 1) + 1) * sqrt_phi
+    
+    return odds
+
+def _daily_sigma(
+        key: str,
+        priority: str,
+        deviation: float
+    ) -> float:
+    """Returns the standard deviation of a category's daily odds around its planet seed."""
+    if key == priority:
+        return deviation / 1.5
+    
+    return deviation / 2.5
+
 def calculate_rolling_odds(
         priority: str,
         tile_seed: str,
@@ -1587,55 +1650,22 @@ def calculate_rolling_odds(
         black_hole: bool = False,
         effective_deviation: float = None
     ) -> dict[str, dict[str, float] | float]:
-    odds = {
-        "special_bread": 1,
-        "rare_bread": 1,
-        "chess_piece": 1,
-        "gem_red": 1,
-        "gem_blue": 1,
-        "gem_purple": 1,
-        "gem_green": 1,
-        "gem_gold": 1,
-        "anarchy_chess": 1,
-        "anarchy_piece": 1
-    }
-
-    if effective_deviation is None:
-        if in_nebula:
-            denominator = 1
-        else:
-            denominator = math.tau
-
-        if black_hole:
-            # If it's a black hole, make it a little crazier by dividing the denominator by 5.
-            denominator /= 5
-
-        deviation = (1 - planet_deviation) / denominator
-    else:
-        deviation = effective_deviation
+    deviation = rolling_odds_deviation(
+        planet_deviation = planet_deviation,
+        in_nebula = in_nebula,
+        black_hole = black_hole,
+        effective_deviation = effective_deviation
+    )
 
     raw_seed = tile_seed
     tile_seed = tile_seed + day_seed
 
-    sqrt_phi = math.sqrt((1 + math.sqrt(5)) / 2)
-
-    # Get the planet seed for each category.
-    # These do not change per day.
-    for key in odds.copy():
-        odds[key] = random.Random(f"{raw_seed}{key}").gauss(mu=1, sigma=deviation)
-
-        if key == priority:
-            odds[key] = (abs(odds[key] - 1) + 1) * sqrt_phi
+    odds = planet_base_odds(priority, raw_seed, deviation)
 
     # Now to get the actual modifiers.
     # These do change per day, but tend to be around the default seeds calculated above.
     for key, value in odds.copy().items():
-        sigma = deviation / 2.5
-
-        if key == priority:
-            sigma = deviation / 1.5
-
-        odds[key] = random.Random(f"{tile_seed}{key}").gauss(mu=value, sigma=sigma)
+        odds[key] = random.Random(f"{tile_seed}{key}").gauss(mu=value, sigma=_daily_sigma(key, priority, deviation))
 
         # Incredibly unlikely to be an issue, but this forces the priority item to be greater than 1.
         # This prevents the priority item from being less common than normal.
@@ -1645,4 +1675,78 @@ def calculate_rolling_odds(
     return {
         "odds": odds,
         "deviation": deviation
-    }
\ No newline at end of file
+    }
+
+def simulate_rolling_odds(
+        priority: str,
+        tile_seed: str,
+        days: int,
+        planet_deviation: float = None,
+        in_nebula: bool = False,
+        black_hole: bool = False,
+        effective_deviation: float = None,
+        seed: int = None
+    ) -> dict[str, dict[str, np.ndarray] | float]:
+    """Simulates the rolling odds of a planet over a number of random days at once.
+
+    The planet seeds are the same as `calculate_rolling_odds`, but the daily draws come from NumPy rather than a `random.Random` per day seed.
+    They have the same distribution, but a specific day seed should still go through `calculate_rolling_odds` to get its exact odds.
+
+    Args:
+        priority (str): The priority category.
+        tile_seed (str): The tile seed.
+        days (int): The number of days to simulate.
+        planet_deviation (float, optional): The raw planet deviation. Defaults to None.
+        in_nebula (bool, optional): Whether the planet is in a nebula. Defaults to False.
+        black_hole (bool, optional): Whether the planet is in a black hole system. Defaults to False.
+        effective_deviation (float, optional): The effective deviation, if this is provided the previous three are not used. Defaults to None.
+        seed (int, optional): Seed for the NumPy generator. Defaults to None.
+
+    Returns:
+        dict[str, dict[str, np.ndarray] | float]: The odds for each category on every day, and the deviation used.
+    """
+    deviation = rolling_odds_deviation(
+        planet_deviation = planet_deviation,
+        in_nebula = in_nebula,
+        black_hole = black_hole,
+        effective_deviation = effective_deviation
+    )
+
+    generator = np.random.default_rng(seed)
+
+    odds = {}
+
+    for key, value in planet_base_odds(priority, tile_seed, deviation).items():
+        # The deviation is negative whenever the raw planet deviation is above 1. `random.gauss` accepts that and NumPy doesn't, but the distribution is symmetric so only the size matters.
+        draws = generator.normal(loc=value, scale=abs(_daily_sigma(key, priority, deviation)), size=days)
+
+        if key == priority:
+            draws = np.where(draws < 1, np.abs(draws - 1) + 1, draws)
+        
+        odds[key] = draws
+    
+    return {
+        "odds": odds,
+        "deviation": deviation
+    }
+
+def rolling_odds_histogram(
+        odds: dict[str, np.ndarray],
+        decimals: int = 4
+    ) -> dict[str, list[tuple[float, int]]]:
+    """Counts how often each category's odds occur, after rounding them.
+
+    Args:
+        odds (dict[str, np.ndarray]): The odds from `simulate_rolling_odds`.
+        decimals (int, optional): The number of decimal places to round to. Defaults to 4.
+
+    Returns:
+        dict[str, list[tuple[float, int]]]: The rounded odds and the number of times they occurred, sorted by the odds.
+    """
+    counted = {}
+
+    for key, values in odds.items():
+        rounded, counts = np.unique(np.round(values, decimals), return_counts=True)
+        counted[key] = list(zip(rounded.tolist(), counts.tolist()))
+    
+    return counted
\ No newline at end of file
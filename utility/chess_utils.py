@@ -13,11 +13,16 @@ import pytz
 import copy
 import math
 import os
+import asyncio
+import traceback
+import tempfile
+import collections
 import numpy as np
 
 # pip install chess
 import chess
 import chess.pgn
+import chess.polyglot
 
 # pip install pillow
 import PIL.Image as PIL_Image
@@ -26,9 +31,13 @@ import PIL.ImageDraw as PIL_ImageDraw
 import utility.files as u_files
 import utility.interface as u_interface
 import utility.text as u_text
+import utility.solvers as u_solvers
 
-all_games = open(os.path.join("data", "chess_games.txt"), "r") # Sourced from https://github.com/SebLague/Chess-Coding-Adventure/blob/Chess-V1-Unity/Assets/Book/Games.txt
-game_lines = all_games.readlines()
+GAMES_PATH = os.path.join("data", "chess_games.txt") # Sourced from https://github.com/SebLague/Chess-Coding-Adventure/blob/Chess-V1-Unity/Assets/Book/Games.txt
+
+# The opening book compiled from the games, and the number of plies from each game that are in it.
+BOOK_PATH = os.path.join("data", "chess_book.bin")
+BOOK_DEPTH = 20
 
 ##### Image utilities. #####
 PIECE_PATH_BLACK = {
@@ -84,6 +93,10 @@ class ChessBot:
     creator = "Duck"
     color = 0x000000
 
+    # Optional for subclasses. Bots that search can set this to the number of positions they looked at for the move they just picked.
+    # It's reset to None before every turn, and is used in the daily tournament's timing stats.
+    nodes: int | None = None
+
     def __init__(
             self: typing.Self,
             database_data: dict
@@ -168,6 +181,199 @@ class ChessBot:
         # Return the first listed legal move.
         return list(board.legal_moves)[0]
 
+##### Search utilities. #####
+
+class TranspositionTable:
+    """A fixed size table of search results, keyed by the Zobrist hash of the position.
+
+    Each hash maps to a single slot. A slot keeps the deeper of the two results, unless the result in it is from an older search, in which case it's always replaced."""
+    EXACT = 0
+    LOWER_BOUND = 1
+    UPPER_BOUND = 2
+
+    def __init__(
+            self: typing.Self,
+            size: int = 2 ** 17
+        ) -> None:
+        """A fixed size table of search results.
+
+        Args:
+            size (int, optional): The number of slots in the table. Defaults to 2 ** 17.
+        """
+        self.size = size
+        self.generation = 0
+
+        # Each entry is (key, depth, flag, score, move, generation).
+        self.entries = [None] * size # type: list[tuple[int, int, int, int, chess.Move | None, int] | None]
+    
+    def new_search(self: typing.Self) -> None:
+        """Marks everything currently in the table as being from an older search, so it can be replaced."""
+        self.generation += 1
+    
+    def get(
+            self: typing.Self,
+            key: int
+        ) -> tuple[int, int, int, int, chess.Move | None, int] | None:
+        """Returns the entry for the given key, or None if it isn't in the table."""
+        entry = self.entries[key % self.size]
+
+        if entry is not None and entry[0] == key:
+            return entry
+        
+        return None
+    
+    def store(
+            self: typing.Self,
+            key: int,
+            depth: int,
+            flag: int,
+            score: int,
+            move: chess.Move | None
+        ) -> None:
+        """Stores a search result, if the replacement policy allows it."""
+        index = key % self.size
+        entry = self.entries[index]
+
+        if entry is None \
+                or entry[0] == key \
+                or entry[5] != self.generation \
+                or depth >= entry[1]:
+            self.entries[index] = (key, depth, flag, score, move, self.generation)
+
+class EvaluationAccumulator:
+    """Keeps the piece counts, material and piece-square table sums for both sides of a board up to date as moves are pushed and popped.
+
+    This means a bot's evaluation doesn't have to count them from the board at every leaf. The board has to be pushed and popped through the accumulator."""
+    def __init__(
+            self: typing.Self,
+            board: chess.Board,
+            piece_values: dict[chess.PieceType, int | float],
+            piece_tables: dict[chess.PieceType, list[list[int]]] | None = None
+        ) -> None:
+        """Keeps the piece counts, material and piece-square table sums for both sides of a board up to date.
+
+        Args:
+            board (chess.Board): The board to follow.
+            piece_values (dict[chess.PieceType, int | float]): The material value of each piece type. Missing piece types are worth nothing.
+            piece_tables (dict[chess.PieceType, list[list[int]]] | None, optional): The piece-square tables for each piece type, from white's perspective. They're read for black with `63 - square`, like `rawr_v3.read_piece_table`. Defaults to None.
+        """
+        self.board = board
+
+        if piece_tables is None:
+            piece_tables = {}
+        
+        self.piece_values = [piece_values.get(piece_type, 0) for piece_type in range(7)]
+
+        # Where each piece type's table sums start in `values`, and the tables for each color, already flipped for black.
+        self.table_offsets = [0] * 7
+        self.tables = [[[] for _ in range(7)], [[] for _ in range(7)]] # type: list[list[list[list[int]]]]
+
+        table_count = 0
+
+        for piece_type, tables in piece_tables.items():
+            self.table_offsets[piece_type] = table_count
+            table_count += len(tables)
+
+            self.tables[chess.WHITE][piece_type] = [list(table) for table in tables]
+            self.tables[chess.BLACK][piece_type] = [[table[63 - square] for square in chess.SQUARES] for table in tables]
+        
+        self.table_count = table_count
+
+        # The piece counts for each color, then the material for each color, then the table sums for each color.
+        self.values = [0] * (14 + 2 + 2 * table_count)
+        self.stack = [] # type: list[list[int | float]]
+
+        for square, piece in board.piece_map().items():
+            self._add(piece.color, piece.piece_type, square)
+    
+    def count(
+            self: typing.Self,
+            color: chess.Color,
+            piece_type: chess.PieceType
+        ) -> int:
+        """Returns how many of the piece type the color has."""
+        return self.values[color * 7 + piece_type]
+    
+    def material(
+            self: typing.Self,
+            color: chess.Color
+        ) -> int | float:
+        """Returns the total value of the color's pieces."""
+        return self.values[14 + color]
+    
+    def table_score(
+            self: typing.Self,
+            color: chess.Color,
+            piece_type: chess.PieceType,
+            table: int = 0
+        ) -> int:
+        """Returns the sum of one of the piece type's tables over the color's pieces of that type."""
+        return self.values[16 + color * self.table_count + self.table_offsets[piece_type] + table]
+    
+    def _add(
+            self: typing.Self,
+            color: chess.Color,
+            piece_type: chess.PieceType,
+            square: chess.Square,
+            sign: int = 1
+        ) -> None:
+        values = self.values
+
+        values[color * 7 + piece_type] += sign
+        values[14 + color] += sign * self.piece_values[piece_type]
+
+        start = 16 + color * self.table_count + self.table_offsets[piece_type]
+
+        for index, table in enumerate(self.tables[color][piece_type]):
+            values[start + index] += sign * table[square]
+    
+    def push(
+            self: typing.Self,
+            move: chess.Move
+        ) -> None:
+        """Updates the sums for the move and then pushes it to the board."""
+        board = self.board
+        self.stack.append(self.values[:])
+
+        color = board.turn
+        piece_type = board.piece_type_at(move.from_square)
+
+        if board.is_castling(move):
+            back_rank = chess.square_rank(move.from_square)
+            kingside = board.is_kingside_castling(move)
+
+            rook_from = chess.square(7 if kingside else 0, back_rank)
+            king_to = chess.square(6 if kingside else 2, back_rank)
+            rook_to = chess.square(5 if kingside else 3, back_rank)
+
+            self._add(color, chess.KING, move.from_square, -1)
+            self._add(color, chess.ROOK, rook_from, -1)
+            self._add(color, chess.KING, king_to)
+            self._add(color, chess.ROOK, rook_to)
+        else:
+            if board.is_en_passant(move):
+                self._add(not color, chess.PAWN, move.to_square - 8 if color else move.to_square + 8, -1)
+            else:
+                captured = board.piece_type_at(move.to_square)
+
+                if captured is not None:
+                    self._add(not color, captured, move.to_square, -1)
+            
+            self._add(color, piece_type, move.from_square, -1)
+            self._add(color, piece_type if move.promotion is None else move.promotion, move.to_square)
+        
+        board.push(move)
+    
+    def pop(self: typing.Self) -> chess.Move:
+        """Pops the last move from the board and puts the sums back to what they were before it."""
+        self.values = self.stack.pop()
+        return self.board.pop()
+
+class _SearchTimeout(Exception):
+    """Raised inside a search when the time for the move has run out."""
+
+############################
+
 #######################################################################################################################
 ##### THE BOTS ########################################################################################################
 #######################################################################################################################
@@ -1300,19 +1506,33 @@ class RobertoBot(ChessBot):
 	SPD = 0.4
 	DEX = 0.3
 
+	# The piece values used for hp, which the evaluation accumulator keeps up to date during the search.
+	HP_VALUES = {
+		chess.PAWN: 1,
+		chess.KNIGHT: 3,
+		chess.BISHOP: 3,
+		chess.ROOK: 5,
+		chess.QUEEN: 9
+	}
+
+	accumulator: EvaluationAccumulator = None
+
 	def turn(
 			self: typing.Self,
 			board: chess.Board,
 			depth = 2
 		) -> chess.Move:
 		
+		self.nodes = 0
+		self.accumulator = EvaluationAccumulator(board, self.HP_VALUES)
+
 		best_move = None
 		best_value = -float('inf') if board.turn else float('inf')
 
 		for move in board.legal_moves:
-			board.push(move)
+			self.accumulator.push(move)
 			board_value = self.search(board, depth, -float('inf'), float('inf'), not board.turn)
-			board.pop()
+			self.accumulator.pop()
 
 			if board.turn and board_value > best_value:
 				best_value = board_value
@@ -1333,6 +1553,9 @@ class RobertoBot(ChessBot):
 		elif board.is_stalemate() or board.is_insufficient_material() or board.is_seventyfive_moves():
 			return 0
 
+		if self.accumulator is not None:
+			return self.accumulated_base_eval(board, board.turn) + self.accumulated_base_eval(board, not board.turn)
+
 		return self.base_eval(board, board.turn) + self.base_eval(board, not board.turn) # one would be negative from being black so we do want to add them here
 		#material = sum([self.piece_value(piece) for piece in board.piece_map().values()])
 		#return material
@@ -1350,6 +1573,7 @@ class RobertoBot(ChessBot):
 
 	def search(self, board, depth, alpha, beta, maximizing_player):
 		if depth == 0 or board.is_game_over():
+			self.nodes += 1
 			return self.evaluate_board(board)
 
 		legal_moves = list(board.legal_moves)
@@ -1357,9 +1581,9 @@ class RobertoBot(ChessBot):
 		if maximizing_player:
 			max_eval = -float('inf')
 			for move in legal_moves:
-				board.push(move)
+				self.accumulator.push(move)
 				eval = self.search(board, depth - 1, alpha, beta, False)
-				board.pop()
+				self.accumulator.pop()
 				max_eval = max(max_eval, eval)
 				alpha = max(alpha, eval)
 				if beta <= alpha:
@@ -1368,15 +1592,49 @@ class RobertoBot(ChessBot):
 		else:
 			min_eval = float('inf')
 			for move in legal_moves:
-				board.push(move)
+				self.accumulator.push(move)
 				eval = self.search(board, depth - 1, alpha, beta, True)
-				board.pop()
+				self.accumulator.pop()
 				min_eval = min(min_eval, eval)
 				beta = min(beta, eval)
 				if beta <= alpha:
 					break
 		return min_eval
 	
+	def accumulated_base_eval(self, board, white):
+		"""
+		 * The same as base_eval, but hp comes from the evaluation accumulator instead of being counted from the board, and the
+		 * attack stats are counted straight from the attack bitboards. Dexterity is every square a piece attacks, so it's just
+		 * attack + defense + speed.
+		"""
+		friendly_squares = board.occupied_co[white]
+		enemy_squares = board.occupied_co[not white]
+		empty_squares = ~board.occupied & chess.BB_ALL
+
+		hp = self.accumulator.material(white)
+		attack = 0
+		defense = 0
+		speed = 0
+
+		for square in chess.scan_forward(friendly_squares):
+			attacks = board.attacks_mask(square)
+			attack += (attacks & enemy_squares).bit_count()
+			defense += (attacks & friendly_squares).bit_count()
+			speed += (attacks & empty_squares).bit_count()
+
+		dexterity = attack + defense + speed
+
+		eval_score = (hp * RobertoBot.HP +
+					  attack * RobertoBot.ATK +
+					  defense * RobertoBot.DEF +
+					  speed * RobertoBot.SPD +
+					  dexterity * RobertoBot.DEX)
+
+		if board.fullmove_number < 5:
+			eval_score *= random.uniform(0.95, 1.05)  # for opening spice
+
+		return eval_score * (1.0 if white else -1.0)
+
 	def base_eval(self, board, white):
 		"""
 		 * Eval Explained
@@ -3322,6 +3580,26 @@ class rawr_v3(ChessBot):
     board: chess.Board = None
     best_move_overall: chess.Move = None
     best_eval_overall: int = -math.inf
+    depth_reached: int = 0
+    
+    # The depth every move is searched to regardless of time, how long to spend on deeper searches, in seconds, and the deepest the search can go.
+    min_depth: int = 6
+    search_time: float = 10.0
+    max_depth: int = 20
+    
+    TRANSPOSITION_TABLE_SIZE = 2 ** 17
+    transposition_table: TranspositionTable = None
+    
+    # Two quiet moves for each ply that caused a beta cutoff, and scores for quiet moves by their squares.
+    killer_moves: list[list[chess.Move | None]] = None
+    history_scores: list[int] = None
+    
+    # Keeps the material and piece-square table sums up to date as the search pushes and pops moves.
+    accumulator: EvaluationAccumulator = None
+    
+    HASH_MOVE_SCORE = 1_000_000
+    KILLER_MOVE_SCORE = 4_000
+    HISTORY_SCORE_LIMIT = 3_000
     
     PIECE_VALUES = {
         chess.PAWN: 100,
@@ -3425,6 +3703,17 @@ class rawr_v3(ChessBot):
         -50,-30,-30,-30,-30,-30,-30,-50
     ]))
     
+    # The tables for each piece type, for the evaluation accumulator. Pawns and kings have a start and an end table.
+    PIECE_TABLES: dict[chess.PieceType, list[list[int]]] = {
+        chess.PAWN: [PIECE_TABLE_PAWN_START, PIECE_TABLE_PAWN_END],
+        chess.KNIGHT: [PIECE_TABLE_KNIGHT],
+        chess.BISHOP: [PIECE_TABLE_BISHOP],
+        chess.ROOK: [PIECE_TABLE_ROOK],
+        chess.QUEEN: [PIECE_TABLE_QUEEN],
+        chess.KING: [PIECE_TABLE_KING_START, PIECE_TABLE_KING_END]
+    }
+    MATERIAL_VALUES: dict[chess.PieceType, int] = {piece_type: value for piece_type, value in PIECE_VALUE_ITEMS if piece_type != chess.KING}
+    
     ######################################
     
     def read_piece_table(
@@ -3457,15 +3746,79 @@ class rawr_v3(ChessBot):
                 board.pop()
         
         self.board = board
+        self.accumulator = EvaluationAccumulator(board, self.MATERIAL_VALUES, self.PIECE_TABLES)
         
         self.nodes = 0
         
-        self.search(
-            ply_from_root = 0,
-            depth = 6,
-            alpha = -math.inf,
-            beta = math.inf
-        )
+        if self.transposition_table is None:
+            self.transposition_table = TranspositionTable(self.TRANSPOSITION_TABLE_SIZE)
+        
+        self.transposition_table.new_search()
+        
+        self.killer_moves = [[None, None] for _ in range(self.max_depth + 1)]
+        
+        # Halve the history scores so the ones from earlier moves count for less.
+        if self.history_scores is None:
+            self.history_scores = [0] * (2 * 64 * 64)
+        else:
+            self.history_scores = [score // 2 for score in self.history_scores]
+        
+        self.best_move_overall = None
+        self.best_eval_overall = -math.inf
+        self.depth_reached = 0
+        
+        start_time = time.perf_counter()
+        
+        # Iterations up to the minimum depth always run to completion, the time limit only applies to the ones after it.
+        self.search_deadline = math.inf
+        
+        previous_iteration_time = None
+        
+        for depth in range(1, self.max_depth + 1):
+            iteration_start = time.perf_counter()
+            
+            self.best_move_iteration = None
+            self.best_eval_iteration = -math.inf
+            
+            try:
+                self.search(
+                    ply_from_root = 0,
+                    depth = depth,
+                    alpha = -math.inf,
+                    beta = math.inf
+                )
+            except _SearchTimeout:
+                # The search stopped partway down a line, so put the board back to how it was given.
+                while self.accumulator.stack:
+                    self.accumulator.pop()
+
+                break
+            
+            self.best_move_overall = self.best_move_iteration
+            self.best_eval_overall = self.best_eval_iteration
+            self.depth_reached = depth
+            
+            # Searching deeper won't change a forced mate.
+            if abs(self.best_eval_overall) >= self.CHECKMATE_VALUE - self.max_depth:
+                break
+            
+            now = time.perf_counter()
+            iteration_time = now - iteration_start
+            
+            if depth >= self.min_depth:
+                self.search_deadline = start_time + self.search_time
+                
+                # Don't start an iteration that won't finish in time, since all of its work would be thrown away.
+                # Each iteration is assumed to take as much longer than this one as this one did than the one before it.
+                if previous_iteration_time:
+                    growth = max(iteration_time / previous_iteration_time, 2.0)
+                else:
+                    growth = 4.0
+                
+                if now + iteration_time * growth >= self.search_deadline:
+                    break
+            
+            previous_iteration_time = iteration_time
         
         return self.best_move_overall
     
@@ -3476,11 +3829,36 @@ class rawr_v3(ChessBot):
             alpha: int,
             beta: int
         ) -> int:
+        self.nodes += 1
+        
+        if self.nodes & 1023 == 0 and time.perf_counter() >= self.search_deadline:
+            raise _SearchTimeout()
+        
         if depth == 0:
-            self.nodes += 1
             return self.evaluate()
         
-        moves = self.move_ordering()
+        key = chess.polyglot.zobrist_hash(self.board)
+        entry = self.transposition_table.get(key)
+        
+        if entry is None:
+            hash_move = None
+        else:
+            hash_move = entry[4]
+            
+            # The root always has to be searched so there's a move to play.
+            if entry[1] >= depth and ply_from_root > 0:
+                score = self.score_from_table(entry[3], ply_from_root)
+                
+                if entry[2] == TranspositionTable.EXACT:
+                    return min(max(score, alpha), beta)
+                
+                if entry[2] == TranspositionTable.LOWER_BOUND and score >= beta:
+                    return beta
+                
+                if entry[2] == TranspositionTable.UPPER_BOUND and score <= alpha:
+                    return alpha
+        
+        moves = self.move_ordering(ply_from_root, hash_move)
         
         if not moves:
             if self.board.is_checkmate():
@@ -3488,8 +3866,10 @@ class rawr_v3(ChessBot):
 
             return 0
         
-        for index, move in enumerate(moves):
-            self.board.push(move)
+        best_move = None
+        
+        for move in moves:
+            self.accumulator.push(move)
             
             result = -self.search(
                 ply_from_root = ply_from_root + 1,
@@ -3498,29 +3878,110 @@ class rawr_v3(ChessBot):
                 beta= -alpha
             )
             
-            self.board.pop()
+            self.accumulator.pop()
             
             if result >= beta:
+                if not self.board.is_capture(move) and move.promotion is None:
+                    self.store_killer_move(ply_from_root, move)
+                    self.history_scores[self.history_index(move)] += depth * depth
+                
+                self.transposition_table.store(key, depth, TranspositionTable.LOWER_BOUND, self.score_to_table(beta, ply_from_root), move)
                 return beta
             
             if result > alpha:
                 alpha = result
+                best_move = move
                 
                 if ply_from_root == 0:
-                    self.best_eval_overall = result,
-                    self.best_move_overall = move
+                    self.best_eval_iteration = result
+                    self.best_move_iteration = move
+        
+        if best_move is None:
+            self.transposition_table.store(key, depth, TranspositionTable.UPPER_BOUND, self.score_to_table(alpha, ply_from_root), hash_move)
+        else:
+            self.transposition_table.store(key, depth, TranspositionTable.EXACT, self.score_to_table(alpha, ply_from_root), best_move)
         
         return alpha
     
+    def score_to_table(
+            self: typing.Self,
+            score: int,
+            ply_from_root: int
+        ) -> int:
+        """Converts a score to be stored in the transposition table. Mate scores are stored relative to the position rather than the root."""
+        if score >= self.CHECKMATE_VALUE - self.max_depth:
+            return score + ply_from_root
+        
+        if score <= -self.CHECKMATE_VALUE + self.max_depth:
+            return score - ply_from_root
+        
+        return score
+    
+    def score_from_table(
+            self: typing.Self,
+            score: int,
+            ply_from_root: int
+        ) -> int:
+        """Converts a score from the transposition table back to be relative to the root."""
+        if score >= self.CHECKMATE_VALUE - self.max_depth:
+            return score - ply_from_root
+        
+        if score <= -self.CHECKMATE_VALUE + self.max_depth:
+            return score + ply_from_root
+        
+        return score
+    
     ###################################################################################################################
     
-    def move_ordering(self: typing.Self) -> list[chess.Move]:
+    def move_ordering(
+            self: typing.Self,
+            ply_from_root: int = 0,
+            hash_move: chess.Move | None = None
+        ) -> list[chess.Move]:
+        if self.killer_moves is not None and ply_from_root < len(self.killer_moves):
+            killers = self.killer_moves[ply_from_root]
+        else:
+            killers = ()
+        
+        def sort_key(move: chess.Move) -> int:
+            if move == hash_move:
+                return self.HASH_MOVE_SCORE
+            
+            score = self.score_move(move)
+            
+            if self.history_scores is not None and not self.board.is_capture(move) and move.promotion is None:
+                if move in killers:
+                    score += self.KILLER_MOVE_SCORE
+                
+                score += min(self.history_scores[self.history_index(move)], self.HISTORY_SCORE_LIMIT)
+            
+            return score
+        
         return sorted(
             self.board.legal_moves,
-            key = self.score_move,
+            key = sort_key,
             reverse = True
         )
     
+    def store_killer_move(
+            self: typing.Self,
+            ply_from_root: int,
+            move: chess.Move
+        ) -> None:
+        """Remembers a quiet move that caused a beta cutoff, so it can be tried early in other positions at the same ply."""
+        killers = self.killer_moves[ply_from_root]
+        
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+    
+    def history_index(
+            self: typing.Self,
+            move: chess.Move
+        ) -> int:
+        """Returns the index of the move in the history scores, based on the side to move and the move's squares."""
+        return self.board.turn * 4096 + move.from_square * 64 + move.to_square
+    
     def score_move(
             self: typing.Self,
             move: chess.Move
@@ -3559,6 +4020,64 @@ class rawr_v3(ChessBot):
     ###################################################################################################################
     
     def evaluate(self: typing.Self) -> int:
+        """Evaluates the board from the sums kept by the accumulator. This gives the same score as `evaluate_from_board`."""
+        accumulator = self.accumulator
+        
+        score = accumulator.material(chess.WHITE) - accumulator.material(chess.BLACK)
+        
+        # Endgame weights use the other side so its evaluating it based on the opponent's pieces.
+        score += self.evaluate_accumulated_tables(chess.WHITE, self.get_accumulated_endgame_weight(chess.BLACK))
+        score += self.evaluate_accumulated_tables(chess.BLACK, self.get_accumulated_endgame_weight(chess.WHITE))
+        
+        if not self.board.turn:
+            score = -score
+        
+        return score
+    
+    def get_accumulated_endgame_weight(
+            self: typing.Self,
+            color: chess.Color
+        ) -> int:
+        """`get_endgame_weight`, but with the piece counts from the accumulator."""
+        accumulator = self.accumulator
+        
+        start_weight = 2 * (
+              20 # Rooks
+            + 10 # Bishops
+            + 10 # Knights
+            + 45 # Queens
+        )
+        weight_sum = (
+              20 * accumulator.count(color, chess.ROOK)
+            + 10 * accumulator.count(color, chess.BISHOP)
+            + 10 * accumulator.count(color, chess.KNIGHT)
+            + 45 * accumulator.count(color, chess.QUEEN)
+        )
+        
+        return 1 - min(1, weight_sum / start_weight)
+    
+    def evaluate_accumulated_tables(
+            self: typing.Self,
+            color: chess.Color,
+            endgame_weight: float
+        ) -> int:
+        """`evaluate_piece_square_tables`, but with the table sums from the accumulator."""
+        accumulator = self.accumulator
+        
+        score = accumulator.table_score(color, chess.KNIGHT) \
+            + accumulator.table_score(color, chess.BISHOP) \
+            + accumulator.table_score(color, chess.ROOK) \
+            + accumulator.table_score(color, chess.QUEEN)
+        
+        score += int(accumulator.table_score(color, chess.PAWN, 0) * (1 - endgame_weight))
+        score += int(accumulator.table_score(color, chess.PAWN, 1) * endgame_weight)
+        score += int(accumulator.table_score(color, chess.KING, 0) * (1 - endgame_weight))
+        score += int(accumulator.table_score(color, chess.KING, 1) * endgame_weight)
+        
+        return score
+    
+    def evaluate_from_board(self: typing.Self) -> int:
+        """Evaluates the board by counting everything from its bitboards."""
         pawn_white = (self.board.pawns & self.board.occupied_co[chess.WHITE]).bit_count()
         pawn_black = self.board.pawns.bit_count() - pawn_white
         
@@ -3701,17 +4220,372 @@ def get_bot_list() -> dict[str, typing.Type[ChessBot]]:
     
     return out
 
+##### Opening book. #####
+
+class OpeningBook:
+    """The opening moves from the games in `GAMES_PATH`, as a trie of moves with the number of games that went through each one.
+
+    The nodes are numbered breadth first, so the children of a node are next to each other. Node 0 is the starting position.
+    Each node is also indexed by the Zobrist hash of its position, so moves from transpositions are found too.
+    The arrays are saved to `BOOK_PATH` and memory-mapped when loaded, so nothing is copied when the book is read."""
+    MAGIC = b"CHESSBK1"
+
+    def __init__(
+            self: typing.Self,
+            child_offsets: np.ndarray,
+            moves: np.ndarray,
+            counts: np.ndarray,
+            hash_keys: np.ndarray,
+            hash_nodes: np.ndarray,
+            depth: int
+        ) -> None:
+        """The opening moves from a set of games.
+
+        Args:
+            child_offsets (np.ndarray): The children of node `i` are the nodes from `child_offsets[i]` up to `child_offsets[i + 1]`.
+            moves (np.ndarray): The move that leads to each node, from `encode_move`.
+            counts (np.ndarray): The number of games that went through each node.
+            hash_keys (np.ndarray): The sorted Zobrist hashes of the nodes' positions.
+            hash_nodes (np.ndarray): The node for each hash in `hash_keys`.
+            depth (int): The number of plies from each game that are in the book.
+        """
+        self.child_offsets = child_offsets
+        self.moves = moves
+        self.counts = counts
+        self.hash_keys = hash_keys
+        self.hash_nodes = hash_nodes
+        self.depth = depth
+    
+    def __len__(self: typing.Self) -> int:
+        return len(self.moves)
+    
+    @staticmethod
+    def encode_move(move: chess.Move) -> int:
+        """Packs a move into 16 bits."""
+        return move.from_square | move.to_square << 6 | (move.promotion or 0) << 12
+    
+    @staticmethod
+    def decode_move(code: int) -> chess.Move:
+        """Unpacks a move packed by `encode_move`."""
+        return chess.Move(code & 63, code >> 6 & 63, (code >> 12) or None)
+    
+    @classmethod
+    def compile(
+            cls: type[typing.Self],
+            lines: typing.Iterable[str],
+            depth: int = BOOK_DEPTH
+        ) -> typing.Self:
+        """Builds the book from games written as space separated SAN moves, one game per line.
+
+        Args:
+            lines (typing.Iterable[str]): The games.
+            depth (int, optional): The number of plies from each game to put in the book. Defaults to BOOK_DEPTH.
+
+        Returns:
+            OpeningBook: The book.
+        """
+        # Each trie node is [children, count, hash], with the children keyed by the encoded move.
+        root = [{}, 0, chess.polyglot.zobrist_hash(chess.Board())]
+
+        for line in lines:
+            board = chess.Board()
+            node = root
+            node[1] += 1
+
+            for san in line.split()[:depth]:
+                try:
+                    move = board.parse_san(san)
+                except ValueError:
+                    # Either the result of the game or a move that can't be read, so this game is done.
+                    break
+                
+                board.push(move)
+                code = cls.encode_move(move)
+
+                if code not in node[0]:
+                    node[0][code] = [{}, 0, chess.polyglot.zobrist_hash(board)]
+                
+                node = node[0][code]
+                node[1] += 1
+        
+        child_offsets = [0]
+        moves = [0]
+        counts = [root[1]]
+        hashes = [root[2]]
+
+        queue = collections.deque([root])
+
+        while queue:
+            children = queue.popleft()[0]
+
+            child_offsets.append(child_offsets[-1] + len(children))
+
+            # Put the most played moves first.
+            for code, child in sorted(children.items(), key=lambda item: item[1][1], reverse=True):
+                moves.append(code)
+                counts.append(child[1])
+                hashes.append(child[2])
+                queue.append(child)
+        
+        # The offsets were counted from the start of the children, which come after the root.
+        child_offsets = np.array(child_offsets, dtype=np.int32) + 1
+
+        hash_keys = np.array(hashes, dtype=np.uint64)
+        order = np.argsort(hash_keys, kind="stable")
+
+        return cls(
+            child_offsets = child_offsets,
+            moves = np.array(moves, dtype=np.uint16),
+            counts = np.array(counts, dtype=np.uint32),
+            hash_keys = hash_keys[order],
+            hash_nodes = order.astype(np.int32),
+            depth = depth
+        )
+    
+    @classmethod
+    def _layout(
+            cls: type[typing.Self],
+            node_count: int
+        ) -> list[tuple[str, np.dtype, int]]:
+        """Returns the name, type and length of each array in the saved file, in order."""
+        return [
+            ("child_offsets", np.dtype(np.int32), node_count + 1),
+            ("moves", np.dtype(np.uint16), node_count),
+            ("counts", np.dtype(np.uint32), node_count),
+            ("hash_keys", np.dtype(np.uint64), node_count),
+            ("hash_nodes", np.dtype(np.int32), node_count)
+        ]
+    
+    @classmethod
+    def load(
+            cls: type[typing.Self],
+            path: str = BOOK_PATH
+        ) -> typing.Self | None:
+        """Memory-maps the book saved by `save`, or returns None if it couldn't be loaded."""
+        try:
+            header = np.fromfile(path, dtype=np.uint8, count=len(cls.MAGIC) + 16)
+
+            if header[:len(cls.MAGIC)].tobytes() != cls.MAGIC:
+                return None
+            
+            node_count, depth = header[len(cls.MAGIC):].view(np.int64)
+
+            arrays = {}
+            offset = len(header)
+
+            for name, dtype, length in cls._layout(int(node_count)):
+                arrays[name] = np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=(length,))
+                offset += dtype.itemsize * length
+
+                # Keep every array aligned to 8 bytes.
+                offset += -offset % 8
+            
+            return cls(depth=int(depth), **arrays)
+        except FileNotFoundError:
+            return None
+        except:
+            print(traceback.format_exc())
+            return None
+    
+    def save(
+            self: typing.Self,
+            path: str = BOOK_PATH
+        ) -> None:
+        """Saves the book, via a temporary file so a failed save doesn't leave it half-written."""
+        try:
+            file_descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix="chess_book", suffix=".tmp")
+
+            with os.fdopen(file_descriptor, "wb") as file_write:
+                file_write.write(self.MAGIC)
+                file_write.write(np.array([len(self), self.depth], dtype=np.int64).tobytes())
+
+                for name, dtype, _ in self._layout(len(self)):
+                    data = np.ascontiguousarray(getattr(self, name), dtype=dtype).tobytes()
+                    file_write.write(data)
+                    file_write.write(bytes(-file_write.tell() % 8))
+            
+            os.replace(temp_path, path)
+        except:
+            print(traceback.format_exc())
+    
+    def random_line(
+            self: typing.Self,
+            plies: int
+        ) -> list[chess.Move]:
+        """Picks a random game from the book, weighted the same as picking a random line from the games file, and returns its first moves.
+
+        This only walks down the trie, so it takes time proportional to the number of plies.
+
+        Args:
+            plies (int): The number of moves to return. Games that are shorter than this, or longer than the book's depth, will be cut off.
+
+        Returns:
+            list[chess.Move]: The moves.
+        """
+        node = 0
+        line = []
+
+        for _ in range(plies):
+            start = int(self.child_offsets[node])
+            end = int(self.child_offsets[node + 1])
+
+            if start == end:
+                break
+            
+            # Games that finish at this node are counted too, and stop the line here.
+            choice = random.randrange(int(self.counts[node]))
+
+            for child in range(start, end):
+                choice -= int(self.counts[child])
+
+                if choice < 0:
+                    break
+            else:
+                break
+            
+            node = child
+            line.append(self.decode_move(int(self.moves[node])))
+        
+        return line
+    
+    def book_moves(
+            self: typing.Self,
+            board: chess.Board
+        ) -> dict[chess.Move, int]:
+        """Returns the moves played from the board's position in the book, and how many games played each one.
+
+        Args:
+            board (chess.Board): The position to look up. It's found no matter which moves led to it.
+
+        Returns:
+            dict[chess.Move, int]: The moves, with the most played first. This is empty if the position isn't in the book.
+        """
+        key = np.uint64(chess.polyglot.zobrist_hash(board))
+
+        low = int(np.searchsorted(self.hash_keys, key, side="left"))
+        high = int(np.searchsorted(self.hash_keys, key, side="right"))
+
+        moves = {}
+
+        for node in self.hash_nodes[low:high]:
+            for child in range(int(self.child_offsets[node]), int(self.child_offsets[node + 1])):
+                move = self.decode_move(int(self.moves[child]))
+                moves[move] = moves.get(move, 0) + int(self.counts[child])
+        
+        return dict(sorted(moves.items(), key=lambda item: item[1], reverse=True))
+
+_opening_book = None # type: OpeningBook | None
+
+def opening_book() -> OpeningBook:
+    """Returns the opening book.
+
+    It's memory-mapped from `BOOK_PATH`, and compiled from `GAMES_PATH` and saved first if that's missing or older than the games.
+    It's kept in memory after that."""
+    global _opening_book
+
+    if _opening_book is not None:
+        return _opening_book
+    
+    book = None
+
+    try:
+        if os.path.getmtime(BOOK_PATH) >= os.path.getmtime(GAMES_PATH):
+            book = OpeningBook.load()
+    except FileNotFoundError:
+        pass
+
+    if book is None:
+        with open(GAMES_PATH, "r") as file_read:
+            book = OpeningBook.compile(file_read)
+        
+        book.save()
+    
+    _opening_book = book
+    return book
+
+def get_book_moves(board: chess.Board) -> dict[chess.Move, int]:
+    """Returns the moves played from the board's position in the opening book, and how many games played each one, with the most played first.
+
+    Bots can use this to play book moves in the opening. It's empty once the position is out of the book."""
+    return opening_book().book_moves(board)
+
 def get_random_moves(amount: int) -> list[str]:
-    """Gets a list of random moves from `data/Games.txt` and returns a random list of opening moves from it.
+    """Picks a random game from `data/chess_games.txt` and returns its first `amount + 1` moves as SAN, via the opening book.
     
     If you want to force a set of opening moves have this return the output from `parse_san`."""
-    return random.choice(copy.deepcopy(game_lines)).split(" ")[:amount + 1]
+    board = chess.Board()
+    moves = []
+
+    for move in opening_book().random_line(amount + 1):
+        moves.append(board.san(move))
+        board.push(move)
+    
+    return moves
+
+MATCH_TIME_LIMIT = 30 * 60
+PUZZLE_TIME_LIMIT = 5 * 60
+
+# How long past its time limit a tournament game can run before its worker process is stopped.
+TOURNAMENT_GRACE_TIME = 60
+
+def new_bot_stats() -> dict[str, int | float]:
+    """Returns an empty set of timing stats for a bot, as filled in by `timed_turn`."""
+    return {
+        "moves": 0,
+        "time": 0.0,
+        "searches": 0,
+        "nodes": 0,
+        "timeouts": 0
+    }
+
+def timed_turn(
+        bot_object: ChessBot,
+        board: chess.Board,
+        stats: dict[str, int | float] | None = None
+    ) -> chess.Move:
+    """Runs a bot's turn, and adds how long it took and how many positions it searched to the given stats.
+
+    Args:
+        bot_object (ChessBot): The bot to run.
+        board (chess.Board): The board to give the bot.
+        stats (dict[str, int | float] | None, optional): Stats from `new_bot_stats` to add to. Defaults to None.
+
+    Returns:
+        chess.Move: The move the bot picked.
+    """
+    bot_object.nodes = None
+
+    start_time = time.perf_counter()
+    move = bot_object.turn(board)
+    end_time = time.perf_counter()
+
+    if stats is not None:
+        stats["moves"] += 1
+        stats["time"] += end_time - start_time
+
+        if bot_object.nodes is not None:
+            stats["searches"] += 1
+            stats["nodes"] += bot_object.nodes
+    
+    return move
 
 def run_match(
         white: ChessBot,
-        black: ChessBot
+        black: ChessBot,
+        time_limit: int | float | None = None,
+        stats: dict[str, dict[str, int | float]] | None = None
     ) -> dict:
-    """Runs a Chess match between the given bots, and returns the data."""
+    """Runs a Chess match between the given bots, and returns the data.
+
+    Args:
+        white (ChessBot): The bot playing white.
+        black (ChessBot): The bot playing black.
+        time_limit (int | float | None, optional): How long the game can go on for, in seconds. If it's still going after this it's called a draw. Defaults to None.
+        stats (dict[str, dict[str, int | float]] | None, optional): A dict that timing stats for each bot will be added to, keyed by the bot's name. Defaults to None.
+
+    Returns:
+        dict: The winner, the PGN, and the ending FEN.
+    """
     board = chess.Board()
 
     white_data = {}
@@ -3720,6 +4594,13 @@ def run_match(
     white_obj = white(white_data) # type: ChessBot
     black_obj = black(black_data) # type: ChessBot
 
+    if stats is not None:
+        white_stats = stats.setdefault(white.name, new_bot_stats())
+        black_stats = stats.setdefault(black.name, new_bot_stats())
+    else:
+        white_stats = None
+        black_stats = None
+
     moves = []
     
     # Get 6 random moves from the list of Chess games, 3 for each side.
@@ -3730,19 +4611,23 @@ def run_match(
         board.push_san(move)
         moves.append(move)
     
+    start_time = time.perf_counter()
+    
     move_number = 1
     while board.outcome() is None:
+        if time_limit is not None and time.perf_counter() - start_time > time_limit:
+            break
 
         if board.turn == chess.WHITE:
             white_obj.load(white_data)
             
-            move = white_obj.turn(board)
+            move = timed_turn(white_obj, board, white_stats)
 
             white_data = white_obj.save()
         else:
             black_obj.load(black_data)
             
-            move = black_obj.turn(board)
+            move = timed_turn(black_obj, board, black_stats)
 
             black_data = black_obj.save()
         
@@ -3750,19 +4635,53 @@ def run_match(
         board.push(move)
         move_number += 1
     
+    outcome = board.outcome()
+
+    if outcome is None:
+        # The time limit was reached, so the game is called a draw.
+        if stats is not None:
+            white_stats["timeouts"] += 1
+            black_stats["timeouts"] += 1
+        
+        return _adjudicated_match(
+            white = white.name,
+            black = black.name,
+            moves = moves,
+            board = board
+        )
+    
+    return {
+        "winner": outcome.winner,
+        "pgn": f"""[White "[Bot] {white_obj.name}"]\n[Black "[Bot] {black_obj.name}"]\n[Result "{outcome.result()}"]\n\n{convert_move_stack(moves)}{outcome.result()}""",
+        "fen": board.fen()
+    }
+
+def _adjudicated_match(
+        white: str,
+        black: str,
+        moves: list[str],
+        board: chess.Board
+    ) -> dict:
+    """Returns the data for a match that ran out of time, which is called a draw."""
     return {
-        "winner": board.outcome().winner,
-        "pgn": f"""[White "[Bot] {white_obj.name}"]\n[Black "[Bot] {black_obj.name}"]\n[Result "{board.outcome().result()}"]\n\n{convert_move_stack(moves)}{board.outcome().result()}""",
+        "winner": None,
+        "pgn": f"""[White "[Bot] {white}"]\n[Black "[Bot] {black}"]\n[Result "1/2-1/2"]\n[Termination "adjudication"]\n\n{convert_move_stack(moves)}1/2-1/2""",
         "fen": board.fen()
     }
 
 def run_puzzle(
         bot: ChessBot,
         pgn: str,
-        solution: str
+        solution: str,
+        stats: dict[str, dict[str, int | float]] | None = None
     ) -> dict:
     board = get_board_from_pgn(pgn)
     correct = True
+
+    if stats is not None:
+        bot_stats = stats.setdefault(bot.name, new_bot_stats())
+    else:
+        bot_stats = None
     
     bot_data = {}
     bot_object = bot(bot_data)
@@ -3770,7 +4689,7 @@ def run_puzzle(
     for move in solution:
         if board.turn == bot_turn:
             bot_object.load(bot_data)
-            bot_move = bot_object.turn(board.copy())
+            bot_move = timed_turn(bot_object, board.copy(), bot_stats)
             bot_data = bot_object.save()
             
             board.push(bot_move)
@@ -3792,6 +4711,253 @@ def run_puzzle(
         "correct": correct
     }
 
+##### Daily tournament. #####
+
+def _tournament_job(
+        kind: str,
+        time_limit: int | float,
+        **kwargs
+    ) -> dict:
+    """Runs a single tournament game in a worker process. The bots are passed by name, since that's what can be sent to the process."""
+    stats = {}
+
+    try:
+        if kind == "match":
+            result = run_match(
+                white = get_bot(kwargs["white"]),
+                black = get_bot(kwargs["black"]),
+                time_limit = time_limit,
+                stats = stats
+            )
+        else:
+            result = run_puzzle(
+                bot = get_bot(kwargs["bot"]),
+                pgn = kwargs["pgn"],
+                solution = kwargs["solution"],
+                stats = stats
+            )
+    except:
+        return {"error": traceback.format_exc()}
+    
+    return {
+        "result": result,
+        "stats": stats
+    }
+
+def _timed_out_job(job: dict) -> dict:
+    """Returns the result for a tournament game whose worker had to be stopped. Matches are called a draw, and puzzles are marked as failed."""
+    if job["kind"] == "match":
+        result = _adjudicated_match(
+            white = job["white"],
+            black = job["black"],
+            moves = [],
+            board = chess.Board()
+        )
+        names = [job["white"], job["black"]]
+    else:
+        board = get_board_from_pgn(job["pgn"])
+        result = {
+            "ending_fen": board.fen(),
+            "last_move": board.move_stack[-1].uci(),
+            "correct": False
+        }
+        names = [job["bot"]]
+    
+    stats = {}
+
+    for name in names:
+        stats.setdefault(name, new_bot_stats())["timeouts"] += 1
+    
+    return {
+        "result": result,
+        "stats": stats
+    }
+
+async def _run_tournament_jobs(
+        jobs: list[dict],
+        workers: int
+    ) -> list[dict]:
+    service = u_solvers.SolverService(
+        workers = workers,
+        task = _tournament_job,
+        warm_up = random.seed # Forked workers would otherwise all pick the same openings.
+    )
+
+    try:
+        return await asyncio.gather(*[
+            service.solve(
+                kwargs = job,
+                timeout_time = job["time_limit"] + TOURNAMENT_GRACE_TIME
+            )
+            for job in jobs
+        ])
+    finally:
+        service.shutdown()
+        await service.join()
+
+def run_tournament(
+        jobs: list[dict],
+        workers: int | None = None
+    ) -> list[dict]:
+    """Runs tournament games in parallel in a pool of worker processes. This blocks, so it should be run in a thread.
+
+    Each job is a dict with the `kind` of game, either "match" or "puzzle", the `time_limit` in seconds, and the arguments for `run_match` or `run_puzzle` with the bots given by name.
+    A game that goes past its time limit is called a draw if it's a match, and failed if it's a puzzle.
+
+    Args:
+        jobs (list[dict]): The games to run.
+        workers (int | None, optional): The number of worker processes. Defaults to None, which is one less than the number of CPUs.
+
+    Raises:
+        RuntimeError: If one of the games raised an error.
+
+    Returns:
+        list[dict]: For each job, in the same order, the `result` from `run_match` or `run_puzzle` and the timing `stats` for each bot that played.
+    """
+    if workers is None:
+        workers = max(1, (os.cpu_count() or 2) - 1)
+    
+    # Load the opening book before the workers are started, so they don't each have to.
+    opening_book()
+    
+    outputs = asyncio.run(_run_tournament_jobs(jobs, min(workers, max(1, len(jobs)))))
+
+    results = []
+
+    for job, output in zip(jobs, outputs):
+        if output is None:
+            print(f"Tournament game timed out: {job}")
+            output = _timed_out_job(job)
+        elif "result" not in output:
+            raise RuntimeError(f"Tournament game failed: {job}\n{output.get('error', output.get('exception'))}")
+        
+        results.append(output)
+    
+    return results
+
+def summarize_bot_stats(results: list[dict]) -> dict[str, dict[str, int | float | None]]:
+    """Combines the timing stats from `run_tournament` results into totals and averages for each bot.
+
+    Args:
+        results (list[dict]): The results from `run_tournament`.
+
+    Returns:
+        dict[str, dict[str, int | float | None]]: The number of moves, timeouts, and moves that reported a search, along with the average move time in seconds and the average nodes searched per searching move for each bot. The averages are None if there's nothing to average.
+    """
+    totals = {}
+
+    for result in results:
+        for name, stats in result["stats"].items():
+            bot_totals = totals.setdefault(name, new_bot_stats())
+
+            for key, value in stats.items():
+                bot_totals[key] += value
+    
+    return {
+        name: {
+            "moves": stats["moves"],
+            "searches": stats["searches"],
+            "timeouts": stats["timeouts"],
+            "average_move_time": stats["time"] / stats["moves"] if stats["moves"] else None,
+            "average_nodes": stats["nodes"] / stats["searches"] if stats["searches"] else None
+        }
+        for name, stats in sorted(totals.items())
+    }
+
+##### Interactive games. #####
+
+# How long a bot gets to pick its move in a `%chess` game, not including time spent waiting for a worker.
+# rawr_v3 always searches to its minimum depth, which can take close to a minute in busy middlegames.
+ENGINE_MOVE_TIME_LIMIT = 60
+
+def _engine_turn(
+        bot_name: str,
+        data: dict
+    ) -> dict:
+    """Runs a bot's turn for a `%chess` game in a worker process, and returns the move as UCI along with the bot's saved data."""
+    try:
+        board = get_board_from_dict(data)
+
+        bot = get_bot(bot_name)(data.get("bot_data", {}))
+        move = bot.turn(board=board.copy())
+
+        return {
+            "move": move.uci(),
+            "bot_data": bot.save()
+        }
+    except:
+        return {"error": traceback.format_exc()}
+
+def fallback_move(board: chess.Board) -> chess.Move:
+    """Returns the move a bot plays when it doesn't pick one in time, which is a random legal move."""
+    return random.choice(list(board.legal_moves))
+
+async def engine_move(
+        data: dict,
+        queue_key: int | None = None,
+        time_limit: int | float = ENGINE_MOVE_TIME_LIMIT
+    ) -> tuple[dict, bool]:
+    """Plays the bot's move in a `%chess` game, if it's the bot's turn. The bot is run in the engine service's worker processes, so this doesn't block.
+
+    Args:
+        data (dict): The game data, from `get_game` or `make_game`. This is modified in place.
+        queue_key (int | None, optional): What to queue the move under, such as the channel id. Moves with different keys take turns getting a worker. Defaults to None.
+        time_limit (int | float, optional): How long the bot has to pick its move. Defaults to ENGINE_MOVE_TIME_LIMIT.
+
+    Returns:
+        tuple[dict, bool]: The game data, and whether the fallback move was played because the bot ran out of time or raised an error.
+    """
+    board = get_board_from_dict(data)
+
+    if board.outcome() is not None:
+        return data, False
+    
+    player = data["player_side"] == "white"
+
+    # If it's currently the player's turn, just skip it.
+    if player == board.turn:
+        return data, False
+    
+    result = await engine_service.solve(
+        kwargs = {
+            "bot_name": data["bot_name"],
+            "data": data
+        },
+        user_id = queue_key,
+        timeout_time = time_limit
+    )
+
+    move = None
+
+    if result is not None and "move" in result:
+        move = chess.Move.from_uci(result["move"])
+
+        if isinstance(result["bot_data"], dict):
+            data["bot_data"] = result["bot_data"]
+    elif result is not None:
+        print(result.get("error", result.get("exception")))
+    
+    used_fallback = move is None or move not in board.legal_moves
+
+    if used_fallback:
+        move = fallback_move(board)
+
+    data["moves"].append(board.san(move))
+
+    return data, used_fallback
+
+try:
+    # If this module is being reloaded the old service is still here, so let it finish what it has queued and then stop its workers.
+    engine_service.shutdown()
+except NameError:
+    pass
+
+engine_service = u_solvers.SolverService(
+    workers = 2,
+    task = _engine_turn,
+    warm_up = random.seed # Forked workers would otherwise all share the same random state.
+)
+
 class ChessBotConverter(commands.Converter):
     """Converter that can be used in a command to automatically convert an argument to a Chess bot."""
     async def convert(self, ctx, arg: str) -> type[ChessBot]:
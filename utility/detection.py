@@ -49,20 +49,35 @@ eleven_plus_messages = {
 ##### DECORATOR ######################################################################################################################################
 ######################################################################################################################################################
 
+# The kinds of message that `classify_message` can return. A message can be more than one kind.
+# - "chat": Sent by anyone other than Machine-Mind.
+# - "mm": Sent by Machine-Mind.
+# - "mm_reply": Sent by Machine-Mind as a reply.
+# - "bread_roll": A bread roll, these are always also "mm" and "mm_reply".
+# - "gamble": A gamble, these are always also "mm" and "mm_reply".
+MESSAGE_KINDS = ["chat", "mm", "mm_reply", "bread_roll", "gamble"]
+
 class AutoDetection():
     def __init__(
             self: typing.Self,
             *,
-            objectives: dict[int, str]
+            objectives: dict[int, str],
+            kinds: list[str] = None
         ) -> None:
         """Decorates a function to be used for auto-detection.
 
         Args:
             objectives (dict[int, str]): Dict with the id as the key and the value as the name of the objective.
+            kinds (list[str], optional): The kinds of message, from MESSAGE_KINDS, that the function can return True for. It will not be run for other messages. Defaults to None, which runs it for every message.
         """
         self.objectives = objectives
         self.detection_type = "main"
 
+        if kinds is None:
+            self.kinds = None
+        else:
+            self.kinds = frozenset(kinds)
+
     def __call__(
             self: typing.Self,
             f: typing.Callable
@@ -74,6 +89,7 @@ class AutoDetection():
             database: u_files.DatabaseInterface,
             objective_id: int,
             bingo_data: dict,
+            analysis: u_interface.MessageAnalysis = None,
             **kwargs
         ) -> bool:
             """Wrapped autodetection function.
@@ -84,21 +100,27 @@ class AutoDetection():
                 database (u_files.DatabaseInterface): The database.
                 objective_id (int): The id of the objective that is being checked, in case a function can detect two different objectives.
                 bingo_data (dict): The current live bingo data.
+                analysis (u_interface.MessageAnalysis, optional): The shared analysis of the message. If this isn't provided a new one will be made. Defaults to None.
 
             Returns:
                 bool: Whether the auto detection was triggered.
             """
+            if analysis is None:
+                analysis = u_interface.MessageAnalysis(message)
+
             return await f(
                 bot = bot,
                 message = message,
                 database = database,
                 bingo_data = bingo_data,
                 objective_id = objective_id,
+                analysis = analysis,
                 **kwargs
             )
         
         wrapped.objectives = self.objectives
         wrapped.detection_type = self.detection_type
+        wrapped.kinds = self.kinds
         wrapped.func = f
         
         return wrapped
@@ -176,15 +198,17 @@ class StonkDetection():
 
         "d173": "A roll of 5+ is all the same special",
         "w75": "A roll of 5+ is all the same special"
-    }
+    },
+    kinds = ["bread_roll"]
 )
 async def item_in_roll(
         message: discord.Message,
         objective_id: int,
         database: u_files.DatabaseInterface,
+        analysis: u_interface.MessageAnalysis,
         **kwargs
     ) -> bool:
-    if not u_interface.is_bread_roll(message):
+    if not analysis.is_bread_roll:
         return False
     
     # These objectives don't require the roll to be parsed.
@@ -200,7 +224,7 @@ async def item_in_roll(
         return items[objective_id].internal_emoji in message.content
     
     # The following objectives require the roll to be parsed.
-    parsed = u_bread.parse_roll(message)
+    parsed = analysis.parsed_roll
 
     if not parsed:
         return False
@@ -438,21 +462,23 @@ async def item_in_roll(
 
         "d96": "Someone rolls an 11+ outside of #bread-rolls",
         "w33": "Someone rolls an 11+ outside of #bread-rolls"
-    }
+    },
+    kinds = ["mm_reply"]
 )
 async def roll_result(
         message: discord.Message,
         objective_id: int,
+        analysis: u_interface.MessageAnalysis,
         **kwargs
     ) -> bool:
-    if not u_interface.mm_checks(message, check_reply=True):
+    if not analysis.mm_reply:
         return False
     
     if objective_id in ["d19", "w5"]:
         if "You won the lottery" not in message.content:
             return False
         
-        if u_interface.is_reply(message, allow_ping=False):
+        if analysis.is_reply_no_ping:
             return message.reference.resolved.author.id == 713053430075097119
         
         # Here, the message is a reply, but done with a ping.
@@ -524,14 +550,16 @@ async def roll_result(
         "w79": "Someone gets two lotteries in a single day",
         
         "d189": "Someone makes 750k or more dough from just rolling"
-    }
+    },
+    kinds = ["mm_reply"]
 )
 async def roll_summary(
         message: discord.Message,
         objective_id: int,
+        analysis: u_interface.MessageAnalysis,
         **kwargs
     ) -> bool:
-    if not u_interface.mm_checks(message, check_reply=True):
+    if not analysis.mm_reply:
         return False
     
     if "Summary of results:" not in message.content:
@@ -552,7 +580,7 @@ async def roll_summary(
             return amount >= 2
         
         if objective_id in ["d19", "w5"]:
-            if u_interface.is_reply(message, allow_ping=False):
+            if analysis.is_reply_no_ping:
                 return message.reference.resolved.author.id == 713053430075097119
             
             # Here, the message is a reply, but done with a ping.
@@ -624,14 +652,16 @@ async def roll_summary(
 
         "d206": "Someone invests 25k+ in stonks and their portfolio does not change on a tick",
         "w93": "Someone invests 250k+ in stonks and their portfolio does not change on a tick"
-    }
+    },
+    kinds = ["mm_reply"]
 )
 async def portfolio(
         message: discord.Message,
         objective_id: int,
+        analysis: u_interface.MessageAnalysis,
         **kwargs
     ) -> bool:
-    if not u_interface.mm_checks(message, check_reply=True):
+    if not analysis.mm_reply:
         return False
     
     if not message.content.startswith("Investment portfolio for "):
@@ -678,14 +708,16 @@ async def portfolio(
 @AutoDetection(
     objectives = {
         "d188": "Someone lands on 3 or 4 dough after investing in stonks"
-    }
+    },
+    kinds = ["mm_reply"]
 )
 async def invest_confirmation(
         message: discord.Message,
         objective_id: int,
+        analysis: u_interface.MessageAnalysis,
         **kwargs
     ) -> bool:
-    if not u_interface.mm_checks(message, check_reply=True):
+    if not analysis.mm_reply:
         return False
     
     if not message.content.startswith("You invested in"):
@@ -706,14 +738,16 @@ async def invest_confirmation(
 @AutoDetection(
     objectives = {
         "d159": "Someone reaches a new hundred milestone on $brick stats"
-    }
+    },
+    kinds = ["mm"]
 )
 async def brick_stats(
         message: discord.Message,
         objective_id: int,
+        analysis: u_interface.MessageAnalysis,
         **kwargs
     ) -> bool:
-    if not u_interface.mm_checks(message, check_reply=False):
+    if not analysis.is_mm:
         return False
     
     if not(message.content.startswith("Brick stats for") and message.content[-1] in ".?!"):
@@ -744,14 +778,16 @@ async def brick_stats(
         
         "d90": "Someone alchemizes 3 red gems from 3 blue gems",
         "d92": "Someone alchemizes 1,000+ specials at once"
-    }
+    },
+    kinds = ["mm_reply"]
 )
 async def alchemy_completion(
         message: discord.Message,
         objective_id: int,
+        analysis: u_interface.MessageAnalysis,
         **kwargs
     ) -> bool:
-    if not u_interface.mm_checks(message, check_reply=True):
+    if not analysis.mm_reply:
         return False
     
     if "Well done. You have created" not in message.content:
@@ -798,7 +834,8 @@ async def alchemy_completion(
 @AutoDetection(
     objectives = {
         "d3": "Kapola :despair: spam"
-    }
+    },
+    kinds = ["chat"]
 )
 async def despair_spam(
         message: discord.Message,
@@ -842,6 +879,7 @@ async def general_messages(
         message: discord.Message,
         objective_id: int,
         bot: u_custom.CustomBot,
+        analysis: u_interface.MessageAnalysis,
         **kwargs
     ) -> bool:
     if objective_id == "d31":
@@ -867,7 +905,7 @@ async def general_messages(
         if message.author.id != bot.user.id:
             return False
         
-        if not u_interface.is_reply(message):
+        if not analysis.is_reply:
             return False
         
         return re.search("(\d+ )?(weekly )?bingo objectives? completed!", message.content.lower()) is not None
@@ -991,19 +1029,21 @@ async def message_prefix(
         "w54": "Someone ascends",
         
         "d167": "Someone resigns in a discord chess game"
-    }
+    },
+    kinds = ["mm"]
 )
 async def mm_messages(
         message: discord.Message,
         objective_id: int,
+        analysis: u_interface.MessageAnalysis,
         **kwargs
     ) -> bool:
-    if not u_interface.mm_checks(message, check_reply=False):
+    if not analysis.is_mm:
         return False
     
     # These objectives require MM's message being a reply.
     if objective_id in ["d50", "d60", "d118", "d127", "d167"]:
-        if not u_interface.is_reply(message):
+        if not analysis.is_reply:
             return False
         
         if objective_id == "d50":
@@ -1284,14 +1324,16 @@ async def stonk_change(
 
         "d190": "four unique chess pieces are found on a gambling board",
         "w85": "four unique chess pieces are found on a gambling board"
-    }
+    },
+    kinds = ["gamble"]
 )
 async def initial_gamble_board(
         message: discord.Message,
         objective_id: int,
+        analysis: u_interface.MessageAnalysis,
         **kwargs
     ) -> bool:
-    gamble_data = u_bread.parse_gamble(message)
+    gamble_data = analysis.parsed_gamble
 
     if gamble_data is None:
         return False
@@ -1687,15 +1729,17 @@ async def initial_gamble_board(
         "w50": "A gold brick is won while gambling",
         
         "d187": "Someone gambles at least 50 and gets a brick"
-    }
+    },
+    kinds = ["mm_reply"]
 )
 async def gamble_result(
         message: discord.Message,
         objective_id: int,
         database: u_files.DatabaseInterface,
+        analysis: u_interface.MessageAnalysis,
         **kwargs
     ) -> bool:
-    if not u_interface.mm_checks(message, check_reply=True):
+    if not analysis.mm_reply:
         return False
 
     if "You found a brick" in message.content:
@@ -1734,11 +1778,11 @@ async def gamble_result(
         if item_won in u_values.gamble_positives:
             return False
         
-        if not u_interface.is_reply(message, allow_ping=False):
+        if not analysis.is_reply_no_ping:
             return False
         
         search_id = message.reference.resolved.id
-        gamble_data = database.load("bread", "gamble_messages", default={})
+        gamble_data = database.load_view("bread", "gamble_messages", default={})
 
         gamble_content = None
 
@@ -1766,7 +1810,7 @@ async def gamble_result(
     
     if objective_id == "d187":
         # We can't detect this one if we don't have the gamble command message, so this checks if the message has a ping at the start or not.
-        if not u_interface.is_reply(message, allow_ping=False):
+        if not analysis.is_reply_no_ping:
             return False
         
         wager = u_text.extract_number("\$bread gamble ([\d,]+)", message.reference.resolved.content, default=4)
@@ -1788,7 +1832,8 @@ async def gamble_result(
         "w22": "Nixon buys extra gambles",
 
         "d121": "Duck Duck Go r/place buys extra gambles"
-    }
+    },
+    kinds = ["chat"]
 )
 async def buy_message(
         message: discord.Message,
@@ -1819,14 +1864,16 @@ async def buy_message(
 @AutoDetection(
     objectives = {
         "d185": "Someone purchases 10+ special bread packs at once"
-    }
+    },
+    kinds = ["mm_reply"]
 )
 async def purchase_confirmation(
         message: discord.Message,
         objective_id: int,
+        analysis: u_interface.MessageAnalysis,
         **kwargs
     ) -> bool:
-    if not u_interface.mm_checks(message, check_reply=True):
+    if not analysis.mm_reply:
         return False
     
     if len(list(re.finditer(" : \+[\d,]+, -> [\d,]+", message.content))) >= 8:
@@ -2197,11 +2244,83 @@ async def chains_detection(
             bingo_data = bingo_data
         )
 
+def classify_message(message: discord.Message) -> frozenset[str]:
+    """Works out which kinds of message, from MESSAGE_KINDS, a message is.
+    If there's already a MessageAnalysis for the message, its `kinds` attribute should be used instead.
+
+    Args:
+        message (discord.Message): The message to classify.
+
+    Returns:
+        frozenset[str]: The kinds of message it is.
+    """
+    return u_interface.MessageAnalysis(message).kinds
+
+class DispatchPlan():
+    def __init__(
+            self: typing.Self,
+            bingo_data: dict
+        ) -> None:
+        """The objectives on the current boards that haven't been completed and have auto-detection, along with the detection functions to run for each kind of message.
+        This should be rebuilt whenever the bingo cache is updated.
+
+        Args:
+            bingo_data (dict): The current bingo data, in the same format `on_message_detection` uses.
+        """
+        self.generation = prep_generation
+
+        self.objectives = []
+
+        for board, prefix in [("daily", "d"), ("weekly", "w")]:
+            for index, objective in enumerate(bingo_data.get(f"{board}_tile_string", list())):
+                if bingo_data.get(f"{board}_enabled", list())[index]:
+                    continue
+
+                key = f"{prefix}{int(objective)}"
+
+                if key in main_detection_dict:
+                    self.objectives.append(key)
+        
+        # Built when a combination of kinds is first seen.
+        self._detectors = {}
+    
+    def detectors(
+            self: typing.Self,
+            kinds: frozenset[str]
+        ) -> list[tuple[str, list[typing.Callable]]]:
+        """Returns the objectives that can be completed by a message of the given kinds, along with the detection functions to run for each of them, in board order.
+
+        Args:
+            kinds (frozenset[str]): The kinds of message, from `classify_message`.
+
+        Returns:
+            list[tuple[str, list[typing.Callable]]]: Tuples of the objective id and the detection functions.
+        """
+        if kinds in self._detectors:
+            return self._detectors[kinds]
+        
+        plan = []
+
+        for objective_id in self.objectives:
+            detectors = [
+                func
+                for func in main_detection_dict[objective_id]
+                if func.kinds is None or not func.kinds.isdisjoint(kinds)
+            ]
+
+            if len(detectors) != 0:
+                plan.append((objective_id, detectors))
+        
+        self._detectors[kinds] = plan
+        return plan
+
 async def on_message_detection(
         bot: u_custom.CustomBot,
         message: discord.Message,
         database: u_files.DatabaseInterface,
-        bingo_data: dict
+        bingo_data: dict,
+        plan: DispatchPlan = None,
+        analysis: u_interface.MessageAnalysis = None
     ) -> None:
     """Runs the on message part of the auto detection for both the daily and weekly boards.
 
@@ -2214,51 +2333,33 @@ async def on_message_detection(
         - daily_enabled (list[bool]): List of booleans for whether each tile is completed on the daily board.
         - weekly_tile_string (list[str]): The weekly board tile string, as a list of strings.
         - weekly_enabled (list[bool]): List of booleans for whether each tile is completed on the weekly board.
+        plan (DispatchPlan, optional): The dispatch plan for the current bingo data. If this isn't provided, or this module has been reloaded since it was made, a new one will be made. Defaults to None.
+        analysis (u_interface.MessageAnalysis, optional): The shared analysis of the message. If this isn't provided a new one will be made. Defaults to None.
     """
-    triggered = []
-
-    for index, objective in enumerate(bingo_data.get("daily_tile_string", list())):
-        if bingo_data.get("daily_enabled", list())[index]:
-            continue
-        key = f"d{int(objective)}"
-
-
-        if key not in main_detection_dict:
-            continue
-        
-        try:
-            if await run_detection(
-                    objective_id = key,
-                    bot = bot,
-                    message = message,
-                    database = database,
-                    bingo_data = bingo_data
-                ):
-                triggered.append(key)
-        except:
-            print(traceback.format_exc())
-            continue
-
-    for index, objective in enumerate(bingo_data.get("weekly_tile_string", list())):
-        if bingo_data.get("weekly_enabled", list())[index]:
-            continue
-        key = f"w{int(objective)}"
+    if plan is None or plan.generation is not prep_generation:
+        plan = DispatchPlan(bingo_data)
+    
+    if analysis is None:
+        analysis = u_interface.MessageAnalysis(message)
 
-        if key not in main_detection_dict:
-            continue
+    triggered = []
 
-        try:
-            if await run_detection(
-                    objective_id = key,
-                    bot = bot,
-                    message = message,
-                    database = database,
-                    bingo_data = bingo_data
-                ):
-                triggered.append(key)
-        except:
-            print(traceback.format_exc())
-            continue
+    for objective_id, detectors in plan.detectors(analysis.kinds):
+        for func in detectors:
+            try:
+                if await func(
+                        bot = bot,
+                        message = message,
+                        database = database,
+                        objective_id = objective_id,
+                        bingo_data = bingo_data,
+                        analysis = analysis
+                    ):
+                    triggered.append(objective_id)
+                    break
+            except:
+                print(traceback.format_exc())
+                break
     
     if len(triggered) >= 1:
         await handle_completed(
@@ -2278,8 +2379,11 @@ main_detection_dict = {}
 stonk_detection_dict = {}
 all_detection = {}
 
+# Replaced every time prep() is run, so dispatch plans made before a reload can be rebuilt.
+prep_generation = None
+
 def prep() -> None:
-    global autodetection_dict, stonk_detection_dict, all_detection
+    global autodetection_dict, stonk_detection_dict, all_detection, prep_generation
 
     global_copy = globals().copy()
     for func in global_copy:
@@ -2308,6 +2412,8 @@ def prep() -> None:
     all_detection = main_detection_dict.copy()
     all_detection.update(stonk_detection_dict)
 
+    prep_generation = object()
+
 def on_reload() -> None:
     importlib.reload(u_values)
 
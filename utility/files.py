@@ -7,90 +7,500 @@ import json
 import typing
 import traceback
 import copy
+import shutil
+import sqlite3
+import asyncio
+import tempfile
+import time
+import collections.abc
+
+import utility.backups as u_backups
+
+# pip install python-dotenv
+from dotenv import load_dotenv
+from os import getenv
+
+load_dotenv()
+DATABASE_DRIVER = getenv('DATABASE_DRIVER') or "json" # Either "json" or "sqlite".
+
+# Returned by `_traverse` when there's nothing saved at the keys, since None can be saved.
+_MISSING = object()
+
+class FrozenDict(collections.abc.Mapping):
+    """Read-only view of a dict in the database. Nested dicts and lists are wrapped when accessed.
+    
+    This does not copy anything, so changes made through `DatabaseInterface.save` will show up in existing views."""
+
+    __slots__ = ("_data",)
+
+    def __init__(
+            self: typing.Self,
+            data: dict
+        ) -> None:
+        self._data = data
+    
+    def __getitem__(
+            self: typing.Self,
+            key: typing.Hashable
+        ) -> typing.Any:
+        return freeze(self._data[key])
+    
+    def __iter__(self: typing.Self) -> typing.Iterator:
+        return iter(self._data)
+    
+    def __len__(self: typing.Self) -> int:
+        return len(self._data)
+    
+    def __contains__(
+            self: typing.Self,
+            key: typing.Hashable
+        ) -> bool:
+        return key in self._data
+    
+    def __eq__(
+            self: typing.Self,
+            other: typing.Any
+        ) -> bool:
+        if isinstance(other, FrozenDict):
+            other = other._data
+        
+        return self._data == other
+    
+    def __repr__(self: typing.Self) -> str:
+        return f"FrozenDict({self._data!r})"
+    
+    def copy(self: typing.Self) -> dict:
+        """Returns a mutable deep copy of the viewed dict."""
+        return copy.deepcopy(self._data)
+
+class FrozenList(collections.abc.Sequence):
+    """Read-only view of a list in the database. Nested dicts and lists are wrapped when accessed.
+    
+    This does not copy anything, so changes made through `DatabaseInterface.save` will show up in existing views."""
+
+    __slots__ = ("_data",)
+
+    def __init__(
+            self: typing.Self,
+            data: list
+        ) -> None:
+        self._data = data
+    
+    def __getitem__(
+            self: typing.Self,
+            index: int | slice
+        ) -> typing.Any:
+        if isinstance(index, slice):
+            return FrozenList(self._data[index])
+        
+        return freeze(self._data[index])
+    
+    def __len__(self: typing.Self) -> int:
+        return len(self._data)
+    
+    def __contains__(
+            self: typing.Self,
+            value: typing.Any
+        ) -> bool:
+        return value in self._data
+    
+    def __eq__(
+            self: typing.Self,
+            other: typing.Any
+        ) -> bool:
+        if isinstance(other, FrozenList):
+            other = other._data
+        
+        return self._data == other
+    
+    def __repr__(self: typing.Self) -> str:
+        return f"FrozenList({self._data!r})"
+    
+    def copy(self: typing.Self) -> list:
+        """Returns a mutable deep copy of the viewed list."""
+        return copy.deepcopy(self._data)
+
+def freeze(value: typing.Any) -> typing.Any:
+    """Wraps a dict or list in a read-only view. Anything else is returned as-is.
+
+    Args:
+        value (typing.Any): The value to wrap.
+
+    Returns:
+        typing.Any: The read-only view, or the original value if it isn't a dict or list.
+    """
+    if isinstance(value, dict):
+        return FrozenDict(value)
+    
+    if isinstance(value, list):
+        return FrozenList(value)
+    
+    return value
 
 class DatabaseInterface:
     """Interface that deals with the database.
     
-    An instance of this class should be set to an attribute of the bot so the cogs can use it."""
+    An instance of this class should be set to an attribute of the bot so the cogs can use it.
+    
+    Every call to `save` appends what it changed to a write-ahead log, as the operations from `u_backups.make_diff`, and `save_database` writes a full snapshot to database.json and then clears the log.
+    When loading, the snapshot is loaded and then every entry in the log is replayed on top of it.
+    
+    `save` never modifies a dict that is already in the database, it replaces the dicts along the path instead.
+    This means a snapshot is just a reference to the top-level dict, which `save_database_async` serialises in another thread."""
 
     database = {}
 
+    snapshot_path = "database.json"
+    wal_path = "database.wal"
+    rotated_wal_path = "database.wal.1"
+
+    _wal_file = None # type: typing.TextIO
+
+    save_stats = None # type: dict[str, int | float]
+
+    _save_task = None # type: asyncio.Task
+    _save_pending = False
+    _backup_pending = False
+
     def __init__(self: typing.Self) -> None:
         """Interface that deals with the database.
     
         An instance of this class should be set to an attribute of the bot so the cogs can use it."""
+        # Number of snapshots written, number of saves that were merged into another, and the latency and size of the last snapshot.
+        self.save_stats = {"saves": 0, "coalesced": 0, "latency": 0.0, "bytes": 0}
+
+        self.backups = u_backups.BackupStore("backups")
+
         self.load_database()
     
     def save_database(
             self: typing.Self,
             make_backup: bool = False
         ) -> None:
-        """Saves the database to database.json.
+        """Saves a snapshot of the database to database.json and clears the write-ahead log.
+        This blocks until the database has been written, `save_database_async` should be used from async code.
 
         Args:
             make_backup (bool, optional): Whether to make a backup of the database. Defaults to False.
         """
         print("Saving database.")
-        self.save_json_file("database.json", data=self.database, join_file_path=False)
+        start = time.perf_counter()
+
+        snapshot = self._begin_snapshot()
+        written = self._write_snapshot(snapshot, make_backup)
+        self._finish_snapshot(written, time.perf_counter() - start)
+    
+    async def save_database_async(
+            self: typing.Self,
+            make_backup: bool = False
+        ) -> None:
+        """Saves a snapshot of the database to database.json in another thread, so the event loop isn't blocked while it's written.
+        If a save is already running another one will be done after it, and any other calls made while waiting will share that save.
+
+        Args:
+            make_backup (bool, optional): Whether to make a backup of the database. Defaults to False.
+        """
+        if self._save_pending:
+            self.save_stats["coalesced"] += 1
+
+        self._save_pending = True
+        self._backup_pending = self._backup_pending or make_backup
+
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.create_task(self._save_worker())
+        
+        await asyncio.shield(self._save_task)
+    
+    async def _save_worker(self: typing.Self) -> None:
+        """Writes snapshots until there are no more pending saves."""
+        while self._save_pending:
+            make_backup = self._backup_pending
+            self._save_pending = False
+            self._backup_pending = False
+
+            print("Saving database.")
+            start = time.perf_counter()
+
+            snapshot = self._begin_snapshot()
+            written = await asyncio.to_thread(self._write_snapshot, snapshot, make_backup)
+            self._finish_snapshot(written, time.perf_counter() - start)
+    
+    async def _wait_for_snapshot(self: typing.Self) -> None:
+        """Waits until there's no snapshot being written in another thread, so `save_database` can be run without both writing at once."""
+        while self._save_task is not None and not self._save_task.done():
+            await asyncio.wait([self._save_task])
+    
+    def _begin_snapshot(self: typing.Self) -> dict:
+        """Moves the write-ahead log aside so saves made while the snapshot is written go into a new log, then returns the database to write."""
+        if self._wal_file is not None:
+            self._wal_file.close()
+            self._wal_file = None
+        
+        if os.path.exists(self.wal_path):
+            if os.path.exists(self.rotated_wal_path):
+                # The last snapshot failed, so the old entries are still needed.
+                with open(self.rotated_wal_path, "a", encoding="utf8") as rotated, open(self.wal_path, "r", encoding="utf8") as current:
+                    shutil.copyfileobj(current, rotated)
+                os.remove(self.wal_path)
+            else:
+                os.replace(self.wal_path, self.rotated_wal_path)
+        
+        return self.database
+    
+    def _write_snapshot(
+            self: typing.Self,
+            snapshot: dict,
+            make_backup: bool
+        ) -> int | None:
+        """Writes a snapshot to database.json, and makes a backup if requested. This does not touch the database interface, so it can be run in another thread.
+
+        Returns:
+            int | None: The number of bytes written, or None if the snapshot could not be saved.
+        """
+        try:
+            if not self.save_json_file(self.snapshot_path, data=snapshot, join_file_path=False):
+                return None
+        except RuntimeError: # Something that was saved into the database was modified in place while it was being written.
+            print(traceback.format_exc())
+            return None
+        
+        written = os.path.getsize(self.snapshot_path)
 
         if make_backup:
             self.make_backup()
+
+        return written
+    
+    def _finish_snapshot(
+            self: typing.Self,
+            written: int | None,
+            latency: float
+        ) -> None:
+        """Removes the old write-ahead log once the snapshot has been written and updates the save stats."""
+        if written is None:
+            print("Database snapshot failed, keeping the write-ahead log.")
+            return
+        
+        # Everything in the rotated log is now in the snapshot.
+        if os.path.exists(self.rotated_wal_path):
+            os.remove(self.rotated_wal_path)
+        
+        self.save_stats = {
+            "saves": self.save_stats["saves"] + 1,
+            "coalesced": self.save_stats["coalesced"],
+            "latency": latency,
+            "bytes": written
+        }
+
+        print(f"Saved database, {written} bytes in {round(latency * 1000, 1)}ms.")
     
     def make_backup(self: typing.Self) -> None:
-        """Creates a backup of the database in the backup folder."""
+        """Adds a backup of the database to the backup store, which only stores what changed since the last backup.
+        
+        This reads the snapshot file, so it should be run right after `save_database`."""
         print("Making backup.")
-        folder_path = "backups/"
-        if not os.path.exists(folder_path):
-            os.makedirs(folder_path)
+        stamp = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S-%f")
+
+        written = self.backups.add(self.load_json_file(self.snapshot_path, default={}, join_file_path=False), stamp)
+        print(f"Saved backup {stamp}, {written} bytes.")
+
+        # Backups from before the backup store are removed as new ones are made, so there are still only 196 backups overall.
+        for file_name in self._legacy_backups()[max(self.backups.keep - len(self.backups.stamps()), 0):]:
+            print(f"Backup clearing. Removed {os.path.join('backups', file_name)}")
+            os.remove(os.path.join("backups", file_name))
+    
+    def _legacy_backups(self: typing.Self) -> list[str]:
+        """Returns the file names of the backups from before the backup store, newest first."""
+        if not os.path.exists("backups/"):
+            return []
         
-        file_name = (datetime.datetime.now().strftime('database_backup_%Y:%m:%d_%X.json')).replace(":", "-")
-        print("Saving backup to " + folder_path + file_name)
-        self.save_json_file(folder_path + file_name, data=self.database, join_file_path=False)
-        print("Saved backup.")
+        return sorted(
+            [name for name in os.listdir("backups/") if name.startswith("database_backup_") and name.endswith(".json")],
+            reverse = True
+        )
+    
+    def backup_stamps(self: typing.Self) -> list[str]:
+        """Returns the stamps of every backup that can be restored with `restore_backup`, oldest first."""
+        return self.backups.stamps()
+    
+    async def restore_backup(
+            self: typing.Self,
+            stamp: str = None
+        ) -> None:
+        """Replaces the database with one from the backup store. The current database is backed up first.
 
-        # Remove files beyond the last 196 backups.
-        files = os.listdir(folder_path)
-        files.sort(reverse=True)
-        for file_name in files[196:]:
-            print(f"Backup clearing. Removed {folder_path + file_name}")
-            os.remove(folder_path + file_name)
+        Args:
+            stamp (str, optional): The stamp of the backup to restore. Defaults to the most recent backup.
+
+        Raises:
+            KeyError: If there is no backup with the given stamp.
+        """
+        restored = self.backups.restore(stamp)
+
+        await self._wait_for_snapshot()
+
+        self.save_database(make_backup=True)
+        self.import_database(restored)
+    
+    def import_database(
+            self: typing.Self,
+            data: dict
+        ) -> None:
+        """Replaces the entire database and saves it.
+
+        Args:
+            data (dict): The new database.
+        """
+        self.database = data
+        self.save_database(make_backup=False)
+    
+    async def load_database_async(self: typing.Self) -> None:
+        """Waits for any snapshot that's being written in another thread, and then runs `load_database`.
+        This should be used instead of `load_database` from async code."""
+        await self._wait_for_snapshot()
+
+        self.load_database()
     
     def load_database(self: typing.Self) -> None:
-        """Loads the database from file.
+        """Loads the database from file, and then replays the write-ahead log on top of it.
+        This can write a new snapshot, so it must not be run while `save_database_async` is writing one, use `load_database_async` from async code.
         
         # This will overwrite the current stored database, so be careful."""
         print("Loading database.")
-        self.database = self.load_json_file("database.json", default=None, join_file_path=False)
+        self.database = self.load_json_file(self.snapshot_path, default=None, join_file_path=False)
+
+        write_snapshot = False
 
         if self.database is None:
             print("No database file found. Looking for a backup.")
-            if os.path.exists("backups/"):
-                backup_list = os.listdir("backups/")
+            write_snapshot = True
 
+            backup_list = self._legacy_backups()
+
+            if self.backups.exists():
+                print(f"Found backup. Loading {self.backups.stamps()[-1]}")
+                self.database = self.backups.restore()
+            elif len(backup_list) == 0:
                 # Make sure there are actually backup files.
-                if len(backup_list) == 0:
-                    print("No backups found, creating new database.")
-                    self.database = {}
+                print("No backups found, creating new database.")
+                self.database = {}
+            else:
+                # Old style backups, from before the backup store.
+                backup = backup_list[0]
 
-                    self.save_database(make_backup=False)
-                else:
-                    # Sort the backups, so the newest is first.
-                    backup_list.sort(reverse=True)
-                    
-                    backup = backup_list[0]
+                print(f"Found backup. Loading {backup}")
+                self.database = self.load_json_file("backups", backup, default={}, join_file_path=True)
+        
+        replayed = self._replay_wal()
 
-                    print(f"Found backup. Loading {backup}")
-                    self.database = self.load_json_file("backups", "backup", default=None, join_file_path=True)
+        if replayed:
+            print(f"Replayed {replayed} entries from the write-ahead log.")
 
-                    self.save_database(make_backup=False)
-            else:
-                print("No backups found, creating new database.")
-                self.database = {}
+        # Compact the log into a new snapshot, this also gets rid of any cut off entry at the end of the log.
+        if write_snapshot or replayed or os.path.exists(self.rotated_wal_path) or (os.path.exists(self.wal_path) and os.path.getsize(self.wal_path) != 0):
+            self.save_database(make_backup=False)
+    
+    ######################################################################################################################################################
+    ##### Write-ahead log ################################################################################################################################
+    ######################################################################################################################################################
+    
+    def _log_save(
+            self: typing.Self,
+            keys: tuple[str],
+            data: typing.Any,
+            previous: typing.Any
+        ) -> None:
+        """Appends the parts of a save that changed to the write-ahead log, so saving a large dict only logs what's different in it."""
+        if previous is _MISSING or previous is data:
+            # If the same object is saved again it may have been modified in place, so there's nothing to compare it to.
+            operations = [["set", list(keys), data]]
+        else:
+            operations = u_backups.make_diff(previous, data, keys)
+        
+        self._log_operations(operations)
+    
+    def _log_operations(
+            self: typing.Self,
+            operations: list[list]
+        ) -> None:
+        """Writes operations from `u_backups.make_diff` to the write-ahead log as a single entry."""
+        if len(operations) == 0:
+            return
+        
+        try:
+            entry = json.dumps(operations, separators=(",", ":"))
+        except TypeError: # Likely an object that can't be saved via the json library.
+            print(traceback.format_exc())
+            return
+        
+        if self._wal_file is None:
+            self._wal_file = open(self.wal_path, "a", encoding="utf8")
 
-                self.save_database(make_backup=False)
-                
+        self._wal_file.write(entry + "\n")
+        self._wal_file.flush()
+    
+    def _replay_wal(self: typing.Self) -> int:
+        """Applies every entry in the write-ahead log to the database.
 
+        Returns:
+            int: The number of entries that were replayed.
+        """
+        if self._wal_file is not None:
+            self._wal_file.close()
+            self._wal_file = None
+
+        replayed = 0
+
+        # The rotated log is from a snapshot that didn't finish, so it's older than the current log.
+        for path in [self.rotated_wal_path, self.wal_path]:
+            try:
+                with open(path, "r", encoding="utf8") as file_load:
+                    for line in file_load:
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:
+                            # The last line can be cut off if the bot stopped while it was being written.
+                            print(f"Stopped replaying {path} at a malformed entry after {replayed} entries.")
+                            break
+
+                        for operation in entry:
+                            self._apply_operation(operation)
+                        
+                        replayed += 1
+            except FileNotFoundError:
+                pass
+
+        return replayed
     
+    def _apply_operation(
+            self: typing.Self,
+            operation: list
+        ) -> None:
+        """Applies an operation from the write-ahead log to the database."""
+        # Keys that aren't strings are turned into strings in database.json, so they need to be here too.
+        keys = tuple(key if isinstance(key, str) else json.dumps(key) for key in operation[1])
+
+        if operation[0] == "set":
+            self._apply_save(keys, operation[2])
+        elif operation[0] == "extend":
+            current = self._traverse(keys, None) or []
+
+            if len(operation) < 4: # Logged before extends recorded where they started.
+                self._apply_save(keys, current + operation[2])
+                return
+            
+            start = operation[3]
+
+            # The entry can be replayed again if the bot stopped after writing a snapshot but before removing the rotated log, in which case the items are already there.
+            if current[start:start + len(operation[2])] == operation[2]:
+                return
+            
+            self._apply_save(keys, current[:start] + operation[2])
+        elif operation[0] == "delete":
+            root, parent = self._copy_path(keys)
+            parent.pop(keys[-1], None)
+            self.database = root
+
     ######################################################################################################################################################
     ##### Getting and saving data ########################################################################################################################
     ######################################################################################################################################################
@@ -109,6 +519,31 @@ class DatabaseInterface:
         Returns:
             dict | list: The value from the database.
         """
+        return copy.deepcopy(self._traverse(keys, default))
+    
+    def load_view(
+            self: typing.Self,
+            *keys: str,
+            default: typing.Any = None
+        ) -> FrozenDict | FrozenList | typing.Any:
+        """Returns a read-only view of a value in the database without copying it.
+        Use this instead of `load` for anything that only reads the data, `load` should be used when the returned value is going to be modified.
+
+        Args:
+            *keys (str): The key(s) to fetch. Provide multiple keys to get nested values. Example: `database.load_view('key', 'nested_key', 'double_nested_key')`
+            default (typing.Any, optional): What to return if any key does not exist. This argument must be provided as a keyword argument. Defaults to None.
+
+        Returns:
+            FrozenDict | FrozenList | typing.Any: A read-only view of the value from the database, dicts and lists are wrapped in FrozenDict and FrozenList.
+        """
+        return freeze(self._traverse(keys, default))
+    
+    def _traverse(
+            self: typing.Self,
+            keys: tuple[str],
+            default: typing.Any
+        ) -> typing.Any:
+        """Follows the given keys through the database and returns the stored object. This does not copy the value, so it should not be returned to cogs directly."""
         val = self.database.get(keys[0], default)
 
         try:
@@ -117,7 +552,7 @@ class DatabaseInterface:
         except AttributeError:
             return default
         
-        return copy.deepcopy(val)
+        return val
     
     def save(
             self: typing.Self,
@@ -125,22 +560,68 @@ class DatabaseInterface:
             data: dict | list
         ) -> None:
         """Saves a dict or list to the database.
+        Only what changed is written to the write-ahead log, so the data should not be modified after it's saved unless it's saved again.
 
         Args:
             *keys (str): The key(s) of the path to save to. Provide multiple keys to save nested values. Example: `database.save('key', 'nested_key', 'double_nested_key', data=['example'])`
             data (dict | list): The data to save. This argument must be provided as a keyword argument.
         """
-        if len(keys) == 1:
-            self.database[keys[0]] = data
-            return
+        previous = self._traverse(keys, _MISSING)
+
+        self._apply_save(keys, data)
+        self._log_save(keys, data, previous)
+    
+    def append(
+            self: typing.Self,
+            *keys: str,
+            data: typing.Any
+        ) -> None:
+        """Adds an item to the end of a list in the database, without loading a copy of the list first. Only the new item is written to the write-ahead log.
 
-        val = self.database.setdefault(keys[0], {})
+        Args:
+            *keys (str): The key(s) of the list. Provide multiple keys for nested values. Example: `database.append('key', 'nested_key', data={'example': 1})`
+            data (typing.Any): The item to add. This argument must be provided as a keyword argument.
+        """
+        previous = self._traverse(keys, _MISSING)
+
+        # The list is copied rather than appended to, so existing snapshots of the database are not changed. The items themselves are shared.
+        items = [] if previous is _MISSING else list(previous)
+        items.append(data)
+
+        self._apply_save(keys, items)
+
+        if previous is _MISSING or not isinstance(previous, list):
+            self._log_save(keys, items, previous)
+        else:
+            # The earlier items are known to be the same, so this doesn't have to compare them like `make_diff` would.
+            self._log_operations([["extend", list(keys), [data], len(previous)]])
+    
+    def _apply_save(
+            self: typing.Self,
+            keys: tuple[str],
+            data: typing.Any
+        ) -> None:
+        """Puts data into the database at the given keys without logging it.
+        The dicts along the path are copied rather than modified, so existing snapshots of the database are not changed."""
+        root, parent = self._copy_path(keys)
+        
+        parent[keys[-1]] = data
 
-        for key in keys[1:-1]:
-            # val = val[key]
-            val = val.setdefault(key, {})
+        self.database = root
+    
+    def _copy_path(
+            self: typing.Self,
+            keys: tuple[str]
+        ) -> tuple[dict, dict]:
+        """Copies the top-level dict and the dicts along the path to the last key, and returns the new top-level dict and the copy of the dict that holds the last key."""
+        root = dict(self.database)
+
+        val = root
+        for key in keys[:-1]:
+            val[key] = dict(val.get(key, {}))
+            val = val[key]
         
-        val[keys[-1]] = data
+        return root, val
 
     ######################################################################################################################################################
     ##### Dealing with files. ############################################################################################################################
@@ -179,14 +660,17 @@ class DatabaseInterface:
             *file_path: str,
             data: dict | list,
             join_file_path: bool = True
-        ) -> None:
+        ) -> bool:
         """Saves a dict or list to a file. Will create the file if it doesn't exist.
-        Will load the file before saving, and if there is an error while saving it will revert it.        
+        The file is written to a temporary file first and then renamed, so if there is an error while saving the original file is left as it was.
 
         Args:
             *file_path (str): The path to the file to save as multiple strings for parameters. If join_file_path is True it will join it, otherwise it will go with the first item here. Like `"folder1", "folder2", "file.json"`.
             data (dict | list): The data to save. This argument must be provided as a keyword argument.
             join_file_path (bool, optional): Whether to use os.path.join to join what's provided in file_path. This argument must be provided as a keyword argument. Defaults to True.
+
+        Returns:
+            bool: Whether the data was saved. If this is False the file was not changed.
         """
 
         if join_file_path:
@@ -199,20 +683,33 @@ class DatabaseInterface:
         if len(dirname) != 0:
             os.makedirs(dirname, exist_ok=True)
 
-        backup = self.load_json_file(file_path, default=type(data)(), join_file_path=False)
+        try:
+            encoded = json.dumps(data, indent=4)
+        except TypeError: # Likely an object that can't be saved via the json library.
+            print(traceback.format_exc())
+            return False
+        
+        # Write to a temporary file and then move it over the original, so the file is never left half-written.
+        file_descriptor, temp_path = tempfile.mkstemp(dir=dirname or ".", prefix=os.path.basename(file_path), suffix=".tmp")
 
-        with open(file_path, "w+") as file_write:
-            try:
-                json.dump(data, file_write, indent=4)
-            except TypeError: # Likely an object that can't be saved via the json library.
-                print(traceback.format_exc())
-                json.dump(backup, file_write, indent=4)
+        try:
+            with os.fdopen(file_descriptor, "w", encoding="utf8") as file_write:
+                file_write.write(encoded)
+                file_write.flush()
+                os.fsync(file_write.fileno())
+            
+            os.replace(temp_path, file_path)
+        except:
+            os.remove(temp_path)
+            raise
+        
+        return True
 
     ######################################################################################################################################################
     ##### Reply ping settings. ###########################################################################################################################
     ######################################################################################################################################################
 
-    def get_all_reply_ping_data(self: typing.Self) -> bool:
+    def get_all_reply_ping_data(self: typing.Self) -> dict[str, bool]:
         return self.load("reply_pings", default={})
         
     def get_reply_ping_setting(
@@ -225,7 +722,7 @@ class DatabaseInterface:
         except AttributeError:
             pass
 
-        return self.get_all_reply_ping_data().get(str(member), default)
+        return self.load_view("reply_pings", str(member), default=default)
         
     def set_reply_ping_setting(
             self: typing.Self,
@@ -261,7 +758,7 @@ class DatabaseInterface:
         Returns:
             int: The counter's current value.
         """
-        return self.load("daily_counters", default=dict()).get(counter_name, default)
+        return self.load_view("daily_counters", counter_name, default=default)
     
     def set_daily_counter(
             self: typing.Self,
@@ -336,12 +833,7 @@ class DatabaseInterface:
         Returns:
             list[typing.Optional[int]]: A list of user ids that are on the ping list, or an empty list if the ping list does not exist (or nobody is on it :( )
         """
-        ping_list_file = self.get_ping_list_file()
-
-        if ping_list_name in ping_list_file:
-            return ping_list_file[ping_list_name]
-        
-        return []
+        return self.load("ping_lists", ping_list_name, default=[])
 
     def user_on_ping_list(
             self: typing.Self,
@@ -357,7 +849,7 @@ class DatabaseInterface:
         Returns:
             bool: Whether the user is on the ping list.
         """
-        return user_id in self.get_ping_list_file().get(ping_list_name, [])
+        return user_id in self.load_view("ping_lists", ping_list_name, default=[])
 
     def update_ping_list(
             self: typing.Self,
@@ -414,9 +906,7 @@ class DatabaseInterface:
         Returns:
             dict[str, str | int | bool]: The found data.
         """
-        ouija_data = self.load("askouija", default={})
-
-        return ouija_data.get(str(channel_id), {"active": False, "letters": "", "message_id": None, "author_id": None})
+        return self.load("askouija", str(channel_id), default={"active": False, "letters": "", "message_id": None, "author_id": None})
     
     def set_ouija_data(
             self: typing.Self,
@@ -492,9 +982,7 @@ class DatabaseInterface:
         Returns:
             dict[str, str | int | bool]: The found data.
         """
-        counting_data = self.load("counting_data", default={})
-
-        return counting_data.get(str(channel_id), {"count": 0, "sender": 0})
+        return self.load("counting_data", str(channel_id), default={"count": 0, "sender": 0})
     
     def set_counting_data(
             self: typing.Self, 
@@ -537,6 +1025,398 @@ class DatabaseInterface:
         
 
 
+class SQLiteDatabaseInterface(DatabaseInterface):
+    """Version of the database interface that stores the database in SQLite via the sqlite3 module.
+
+    Each top-level key (`stonks`, `bread`, `chess`, etc.) gets its own table, with a row for every key inside it.
+    Top-level keys are only read from the database the first time they're used, and saves only change the parts of the row that were changed.
+    
+    To switch to this, run `python migrate_database.py` while the bot is stopped, and then set DATABASE_DRIVER to "sqlite" in the .env file.
+    If there's no SQLite database when the bot starts the contents of database.json are migrated then instead."""
+
+    sqlite_path = "database.sqlite"
+    backup_folder = "backups"
+
+    _connection = None # type: sqlite3.Connection
+    _loaded = set() # type: set[str]
+
+    def load_database(self: typing.Self) -> None:
+        """Opens the SQLite database, migrating database.json if it doesn't exist yet.
+        
+        # This will clear anything that has been loaded, so be careful."""
+        print("Loading database.")
+        if self._connection is not None:
+            self._connection.close()
+        
+        migrate = not os.path.exists(self.sqlite_path)
+
+        self._connection = self._connect(self.sqlite_path)
+        self.database = {}
+        self._loaded = set()
+
+        if migrate:
+            print("No SQLite database found, migrating database.json.")
+            self.import_database(DatabaseInterface().database)
+    
+    def save_database(
+            self: typing.Self,
+            make_backup: bool = False
+        ) -> None:
+        """Commits the database. Saves are written when they're made, so this is only needed for backups.
+
+        Args:
+            make_backup (bool, optional): Whether to make a backup of the database. Defaults to False.
+        """
+        print("Saving database.")
+        self._connection.commit()
+
+        if make_backup:
+            self.make_backup()
+    
+    async def save_database_async(
+            self: typing.Self,
+            make_backup: bool = False
+        ) -> None:
+        """Commits the database. SQLite connections can't be shared between threads, so this just runs `save_database`.
+
+        Args:
+            make_backup (bool, optional): Whether to make a backup of the database. Defaults to False.
+        """
+        self.save_database(make_backup=make_backup)
+    
+    def make_backup(self: typing.Self) -> None:
+        """Creates a backup of the SQLite database in the backup folder."""
+        print("Making backup.")
+        folder_path = self.backup_folder + "/"
+        if not os.path.exists(folder_path):
+            os.makedirs(folder_path)
+        
+        file_name = (datetime.datetime.now().strftime('database_backup_%Y:%m:%d_%X.sqlite')).replace(":", "-")
+        print("Saving backup to " + folder_path + file_name)
+        backup = sqlite3.connect(folder_path + file_name)
+        self._connection.backup(backup)
+        backup.close()
+        print("Saved backup.")
+
+        # Remove files beyond the last 196 backups.
+        files = [name for name in os.listdir(folder_path) if name.endswith(".sqlite")]
+        files.sort(reverse=True)
+        for file_name in files[196:]:
+            print(f"Backup clearing. Removed {folder_path + file_name}")
+            os.remove(folder_path + file_name)
+    
+    def backup_stamps(self: typing.Self) -> list[str]:
+        """Returns the stamps of every SQLite backup in the backup folder, oldest first."""
+        if not os.path.exists(self.backup_folder):
+            return []
+        
+        return sorted(
+            name.removeprefix("database_backup_").removesuffix(".sqlite")
+            for name in os.listdir(self.backup_folder)
+            if name.startswith("database_backup_") and name.endswith(".sqlite")
+        )
+    
+    async def restore_backup(
+            self: typing.Self,
+            stamp: str = None
+        ) -> None:
+        """Replaces the SQLite database with one of the SQLite backups. The current database is backed up first.
+
+        Args:
+            stamp (str, optional): The stamp of the backup to restore, from `backup_stamps`. Defaults to the most recent backup.
+
+        Raises:
+            KeyError: If there is no backup with the given stamp.
+        """
+        stamps = self.backup_stamps()
+
+        if stamp is None:
+            if len(stamps) == 0:
+                raise KeyError("There are no backups.")
+            
+            stamp = stamps[-1]
+        
+        if stamp not in stamps:
+            raise KeyError(f"There is no backup called {stamp}.")
+        
+        # The path has to be found before backing up the current database, since that backup will be the most recent one.
+        backup_path = os.path.join(self.backup_folder, f"database_backup_{stamp}.sqlite")
+
+        self.save_database(make_backup=True)
+
+        backup = sqlite3.connect(backup_path)
+        backup.backup(self._connection)
+        backup.close()
+
+        # Everything has to be read again from the restored database.
+        self.database = {}
+        self._loaded = set()
+    
+    def import_database(
+            self: typing.Self,
+            data: dict
+        ) -> None:
+        """Replaces the contents of the SQLite database with a full database dict, like the one in database.json.
+
+        Args:
+            data (dict): The database to import.
+        """
+        for name in list(self._subtree_kinds()):
+            self._drop_subtree(name)
+
+        self.database = data
+        self._loaded = set(data)
+
+        for name in data:
+            self._write_subtree(name)
+    
+    def load_all(self: typing.Self) -> dict:
+        """Loads every top-level key and returns the full database dict."""
+        for name in self._subtree_kinds():
+            self._ensure_loaded(name)
+        
+        return self.database
+    
+    ######################################################################################################################################################
+    ##### SQLite #########################################################################################################################################
+    ######################################################################################################################################################
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        """Opens an SQLite database and makes sure the table that keeps track of the top-level keys exists."""
+        connection = sqlite3.connect(path)
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute("CREATE TABLE IF NOT EXISTS subtrees (name TEXT PRIMARY KEY, kind TEXT NOT NULL)")
+        connection.commit()
+        return connection
+    
+    @staticmethod
+    def _table_name(name: str) -> str:
+        """Returns the quoted table name used for a top-level key."""
+        return '"subtree_{}"'.format(str(name).replace('"', '""'))
+    
+    def _subtree_kinds(self: typing.Self) -> dict[str, str]:
+        """Returns every top-level key in the SQLite database, along with whether it's stored as a "dict" or a single "value"."""
+        return dict(self._connection.execute("SELECT name, kind FROM subtrees"))
+    
+    def _ensure_loaded(
+            self: typing.Self,
+            name: str
+        ) -> None:
+        """Reads a top-level key from SQLite if it hasn't been read yet."""
+        if name in self._loaded:
+            return
+        
+        self._loaded.add(name)
+
+        row = self._connection.execute("SELECT kind FROM subtrees WHERE name = ?", (name,)).fetchone()
+
+        if row is None:
+            return
+        
+        rows = self._connection.execute(f"SELECT key, value FROM {self._table_name(name)} ORDER BY rowid")
+
+        if row[0] == "value":
+            self.database[name] = json.loads(rows.fetchone()[1])
+        else:
+            self.database[name] = {key: json.loads(value) for key, value in rows}
+    
+    def _drop_subtree(
+            self: typing.Self,
+            name: str
+        ) -> None:
+        """Removes a top-level key's table."""
+        with self._connection:
+            self._connection.execute(f"DROP TABLE IF EXISTS {self._table_name(name)}")
+            self._connection.execute("DELETE FROM subtrees WHERE name = ?", (name,))
+    
+    def _write_subtree(
+            self: typing.Self,
+            name: str,
+            key: str = None
+        ) -> None:
+        """Writes a top-level key to SQLite. If a key is given, only that key's row is written."""
+        value = self.database[name]
+        table = self._table_name(name)
+
+        try:
+            if not isinstance(value, dict):
+                rows = [("", json.dumps(value))]
+            elif key is None:
+                rows = [(str(row_key), json.dumps(row_value)) for row_key, row_value in value.items()]
+            else:
+                rows = [(str(key), json.dumps(value[key]))]
+        except TypeError: # Likely an object that can't be saved via the json library.
+            print(traceback.format_exc())
+            return
+
+        with self._connection:
+            self._connection.execute(f"CREATE TABLE IF NOT EXISTS {table} (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            self._connection.execute(
+                "INSERT INTO subtrees (name, kind) VALUES (?, ?) ON CONFLICT (name) DO UPDATE SET kind = excluded.kind",
+                (name, "dict" if isinstance(value, dict) else "value")
+            )
+
+            if key is None or not isinstance(value, dict):
+                self._connection.execute(f"DELETE FROM {table}")
+            
+            self._connection.executemany(
+                f"INSERT INTO {table} (key, value) VALUES (?, ?) ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                rows
+            )
+    
+    ######################################################################################################################################################
+    ##### Overrides ######################################################################################################################################
+    ######################################################################################################################################################
+    
+    def _traverse(
+            self: typing.Self,
+            keys: tuple[str],
+            default: typing.Any
+        ) -> typing.Any:
+        self._ensure_loaded(keys[0])
+        return super()._traverse(keys, default)
+    
+    def _apply_save(
+            self: typing.Self,
+            keys: tuple[str],
+            data: typing.Any
+        ) -> None:
+        self._ensure_loaded(keys[0])
+        super()._apply_save(keys, data)
+    
+    def _log_save(
+            self: typing.Self,
+            keys: tuple[str],
+            data: typing.Any,
+            previous: typing.Any
+        ) -> None:
+        if previous is _MISSING:
+            # The dicts on the way to it may not be in SQLite yet either, so the whole row is written.
+            self._write_subtree(keys[0], keys[1] if len(keys) > 1 else None)
+            return
+        
+        super()._log_save(keys, data, previous)
+    
+    def _log_operations(
+            self: typing.Self,
+            operations: list[list]
+        ) -> None:
+        """Writes operations from `u_backups.make_diff` to the rows they change.
+        Changes inside a row are made with SQLite's JSON functions, so adding a tick to the stonk history doesn't serialise the rest of the history again."""
+        try:
+            for operation in operations:
+                self._write_operation(operation)
+        except TypeError: # Likely an object that can't be saved via the json library.
+            print(traceback.format_exc())
+    
+    def _write_operation(
+            self: typing.Self,
+            operation: list
+        ) -> None:
+        """Writes a single operation from `u_backups.make_diff` to SQLite."""
+        kind, keys = operation[0], operation[1]
+        name = keys[0]
+        table = self._table_name(name)
+
+        # Top-level keys that aren't dicts are stored in a single row, so there's no smaller part to change.
+        if len(keys) == 1 or not isinstance(self.database.get(name), dict):
+            self._write_subtree(name)
+            return
+        
+        row_key = str(keys[1])
+        
+        if kind == "delete" and len(keys) == 2:
+            with self._connection:
+                self._connection.execute(f"DELETE FROM {table} WHERE key = ?", (row_key,))
+            return
+        
+        # Keys are turned into strings in the JSON, and quotes can't be used in a JSON path, so those rows are written in full instead.
+        path_keys = [key if isinstance(key, str) else json.dumps(key) for key in keys[2:]]
+
+        if (kind == "set" and len(keys) == 2) or any('"' in key for key in path_keys):
+            self._write_subtree(name, keys[1])
+            return
+        
+        path = "$" + "".join(f'."{key}"' for key in path_keys)
+
+        with self._connection:
+            if kind == "set":
+                self._connection.execute(
+                    f"UPDATE {table} SET value = json_set(value, ?, json(?)) WHERE key = ?",
+                    (path, json.dumps(operation[2]), row_key)
+                )
+            elif kind == "delete":
+                self._connection.execute(
+                    f"UPDATE {table} SET value = json_remove(value, ?) WHERE key = ?",
+                    (path, row_key)
+                )
+            elif kind == "extend":
+                items = operation[2]
+
+                # SQLite functions can only take so many arguments, so long extends are split up.
+                for start in range(0, len(items), 50):
+                    chunk = items[start:start + 50]
+
+                    self._connection.execute(
+                        f"UPDATE {table} SET value = json_insert(value{', ?, json(?)' * len(chunk)}) WHERE key = ?",
+                        (*[argument for item in chunk for argument in (path + "[#]", json.dumps(item))], row_key)
+                    )
+
+def migrate_to_sqlite(replace: bool = False) -> dict[str, int]:
+    """Copies database.json, with the write-ahead log replayed on top of it, into a new database.sqlite and checks that everything was copied.
+    This should only be run while the bot is stopped.
+
+    Args:
+        replace (bool, optional): Whether to replace database.sqlite if it already exists. Defaults to False.
+
+    Raises:
+        FileExistsError: If database.sqlite already exists and `replace` is False.
+        ValueError: If the SQLite database doesn't match database.json after the migration.
+
+    Returns:
+        dict[str, int]: The number of keys in each top-level key that was migrated, or 1 for top-level keys that aren't dicts.
+    """
+    sqlite_path = SQLiteDatabaseInterface.sqlite_path
+
+    if os.path.exists(sqlite_path):
+        if not replace:
+            raise FileExistsError(f"{sqlite_path} already exists.")
+        
+        for path in [sqlite_path, sqlite_path + "-wal", sqlite_path + "-shm"]:
+            if os.path.exists(path):
+                os.remove(path)
+    
+    data = DatabaseInterface().database
+
+    # With no SQLite database the driver migrates database.json when it's opened.
+    database = SQLiteDatabaseInterface()
+
+    try:
+        # Comparing against the JSON text means keys that aren't strings are compared the same way they're stored.
+        if database.load_all() != json.loads(json.dumps(data)):
+            raise ValueError(f"{sqlite_path} does not match database.json after migrating.")
+    finally:
+        database._connection.close()
+    
+    return {
+        name: len(value) if isinstance(value, dict) else 1
+        for name, value in data.items()
+    }
+
+def get_database_interface() -> DatabaseInterface:
+    """Creates the database interface for the driver set via DATABASE_DRIVER in the .env file.
+
+    Returns:
+        DatabaseInterface: The database interface.
+    """
+    if DATABASE_DRIVER == "sqlite":
+        return SQLiteDatabaseInterface()
+    
+    return DatabaseInterface()
+
+
 def load(
         *path: str,
         default: typing.Any = None,
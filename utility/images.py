@@ -8,10 +8,19 @@ import textwrap
 import io
 import chess
 import math
+import time
+import asyncio
+import threading
+import collections
+import concurrent.futures
+import contextlib
+import queue
 
 # pip install matplotlib
-import matplotlib.pyplot as plt
-import matplotlib.colors as mcolors
+# Matplotlib is imported when it's first needed, since it's slow to import. See `_matplotlib`.
+
+# pip install numpy
+import numpy as np
 
 # pip install pillow
 from PIL import Image as PIL_Image
@@ -26,6 +35,14 @@ import utility.values as u_values
 import utility.algorithms as u_algorithms
 import utility.chess_utils as u_chess
 
+BINGO_BOARD_PATH = f"images{SLASH}generated{SLASH}bingo_board.png"
+
+# The bingo board file doubles as the cache for `render_board`, so only one thread should read or write it at once.
+_bingo_board_lock = threading.Lock()
+
+# What the bingo board file is currently an image of. Renders run in other threads, so this is kept here rather than in the database.
+_last_generated = {} # type: dict[str, str | int | bool]
+
 ######################################################################################################################################
 ##### BINGO BOARDS ###################################################################################################################
 ######################################################################################################################################
@@ -89,33 +106,62 @@ def bingo_board_base(
     return img
 
 def render_board(
-        database: u_files.DatabaseInterface,
         tile_string: str,
         enabled: int,
         tile_list: list[dict],
         board_size: int,
         solo: bool = False,
-        force: bool = False
+        force: bool = False,
+        file_name: str | typing.BinaryIO = BINGO_BOARD_PATH
     ) -> PIL_Image:
     """Generates the image for a bingo board and saves it to 'images/generated/bingo_board.png'
 
     Args:
-        database (u_files.DatabaseInterface): The database object.
         tile_string (str): The tile string to render.
         enabled (int): The integer that defines what objectives have been completed.
         tile_list (list[dict]): The tile list to pull objective names from.
         board_size (int): The length of one side of the square board. So for the 5x5 board it would be 5.
         solo (bool, optional): Whether this is a solo board, in which case the background will be green. Defaults to False.
         force (bool, optional): Whether to force it to make the image, and to not use the last generated image if the data matches. Defaults to False.
+        file_name (str | typing.BinaryIO, optional): Where to write the image, which can be a buffer. The image is saved to the above path either way, since that's what the last generated image check uses. Defaults to "images/generated/bingo_board.png".
 
     Returns:
         PIL_Image: The generated image object. The image is also saved to the above path.
     """
+    with _bingo_board_lock:
+        img = _render_board(
+            tile_string = tile_string,
+            enabled = enabled,
+            tile_list = tile_list,
+            board_size = board_size,
+            solo = solo,
+            force = force
+        )
+
+        # Images from the last generated check are loaded lazily, so make sure it's read before the file can change.
+        img.load()
+
+    if file_name != BINGO_BOARD_PATH:
+        img.save(file_name, "png")
+    
+    return img
+
+def _render_board(
+        tile_string: str,
+        enabled: int,
+        tile_list: list[dict],
+        board_size: int,
+        solo: bool = False,
+        force: bool = False
+    ) -> PIL_Image:
+    """Does the work for `render_board`. This should only be called while holding `_bingo_board_lock`."""
+
+    global _last_generated
 
     # Get the current data, since if the last image generated is the same as the one we're making, then we don't need to make anything new.
     if not force:
         # If force is true, then we don't do this check.
-        current_data = database.load("bingo", "last_generated", default={})
+        current_data = _last_generated
         if all([
                 board_size == current_data.get("last_size"),
                 tile_string == current_data.get(f"board"),
@@ -124,7 +170,7 @@ def render_board(
             ]):
             # If it's here, then the board is the same.
             # Now we load the existing image, and return it.
-            return PIL_Image.open(f"images{SLASH}generated{SLASH}bingo_board.png")
+            return PIL_Image.open(BINGO_BOARD_PATH)
 
     # Split the tile string into groups of 3 characters.
     tile_string_split = u_text.split_chunks(tile_string, 3)
@@ -168,49 +214,49 @@ def render_board(
             )
     
     # Save the image to images/generated/bingo_board.png
-    img.save(f"images{SLASH}generated{SLASH}bingo_board.png")
+    img.save(BINGO_BOARD_PATH)
 
-    # Update the data in bingo/last_generated.
-    database.save("bingo", "last_generated", data={
+    # Update what the image is of.
+    _last_generated = {
         "board": tile_string,
         "enabled": enabled,
         "solo": solo,
         "last_size": board_size
-    })
+    }
 
     # Return the image.
     return img
 
 def render_board_5x5(
-        database: u_files.DatabaseInterface,
+        tile_list: list[dict],
         tile_string: str,
-        enabled: int
+        enabled: int,
+        file_name: str | typing.BinaryIO = BINGO_BOARD_PATH
     ) -> PIL_Image:
     """Renders a 5x5 bingo board and saves to images/generated/bingo_board.png
 
-    After saving the image it will return the image object."""
+    The tile list should be from `u_bingo.tile_list_5x5`, which is read on the event loop since this runs in a render thread.
 
-    tile_list = u_bingo.tile_list_5x5(database=database)
+    After saving the image it will return the image object."""
 
     return render_board(
-        database = database,
         tile_string = tile_string,
         enabled = enabled,
         tile_list = tile_list,
-        board_size = 5
+        board_size = 5,
+        file_name = file_name
     )
 
 def render_full_5x5(
-        database: u_files.DatabaseInterface,
+        tile_list: list[dict],
         tile_string: str,
-        enabled: int
+        enabled: int,
+        file_name: str | typing.BinaryIO = BINGO_BOARD_PATH
     ) -> PIL_Image:
-    """Renders the 5x5 board in the announcement version."""
-
-    tile_list = u_bingo.tile_list_5x5(database=database)
+    """Renders the 5x5 board in the announcement version. The tile list should be from `u_bingo.tile_list_5x5`."""
+    global _last_generated
 
     main_board = render_board(
-        database = database,
         tile_string = tile_string,
         enabled = enabled,
         tile_list = tile_list,
@@ -221,91 +267,181 @@ def render_full_5x5(
 
     base.paste(main_board, (0, 270))
 
-    current_data = database.load("bingo", "last_generated", default={})
-
-    current_data["last_size"] = "5x5_full"
+    if file_name != BINGO_BOARD_PATH:
+        # The plain board is still in the normal location, so the last generated data is still right.
+        base.save(file_name, "png")
+        return base
 
-    database.save("bingo", "last_generated", data=current_data)
+    with _bingo_board_lock:
+        _last_generated = {**_last_generated, "last_size": "5x5_full"}
 
-    base.save(f"images{SLASH}generated{SLASH}bingo_board.png")
+        base.save(BINGO_BOARD_PATH)
 
     return base
 
 def render_board_9x9(
-        database: u_files.DatabaseInterface,
+        tile_list: list[dict],
         tile_string: str,
-        enabled: int
+        enabled: int,
+        file_name: str | typing.BinaryIO = BINGO_BOARD_PATH
     ) -> PIL_Image:
     """Renders a 9x9 bingo board and saves to images/generated/bingo_board.png
 
-    After saving the image it will return the image object."""
+    The tile list should be from `u_bingo.tile_list_9x9`, which is read on the event loop since this runs in a render thread.
 
-    tile_list = u_bingo.tile_list_9x9(database=database)
+    After saving the image it will return the image object."""
 
     return render_board(
-        database = database,
         tile_string = tile_string,
         enabled = enabled,
         tile_list = tile_list,
-        board_size = 9
+        board_size = 9,
+        file_name = file_name
     )
 
 ######################################################################################################################################
 ##### GRAPHS #########################################################################################################################
 ######################################################################################################################################
 
+# Lines with more points than this are downsampled before being plotted.
+MAX_GRAPH_POINTS = 2000
+
+def _matplotlib() -> dict[str, typing.Any]:
+    """Imports the parts of matplotlib that are used here. Matplotlib is slow to import, so this is only done the first time a graph or report is made."""
+    import matplotlib.colors
+    import matplotlib.figure
+    import matplotlib.backends.backend_agg
+
+    return {
+        "colors": matplotlib.colors,
+        "Figure": matplotlib.figure.Figure,
+        "FigureCanvasAgg": matplotlib.backends.backend_agg.FigureCanvasAgg
+    }
+
+class FigurePool():
+    def __init__(
+            self: typing.Self,
+            keep: int = 4
+        ) -> None:
+        """A pool of Agg-backed matplotlib figures.
+
+        Figures are used directly rather than through pyplot, so graphs can be drawn from multiple threads at once, and they're cleared and reused rather than being made for every graph.
+
+        Args:
+            keep (int, optional): The maximum number of unused figures to keep. Defaults to 4.
+        """
+        self._figures = queue.LifoQueue(maxsize=keep)
+    
+    @contextlib.contextmanager
+    def figure(self: typing.Self) -> typing.Iterator:
+        """Context manager that provides a blank figure and returns it to the pool afterwards."""
+        try:
+            figure = self._figures.get_nowait()
+        except queue.Empty:
+            matplotlib = _matplotlib()
+            figure = matplotlib["Figure"]()
+            matplotlib["FigureCanvasAgg"](figure)
+        
+        try:
+            yield figure
+        finally:
+            figure.clear()
+
+            try:
+                self._figures.put_nowait(figure)
+            except queue.Full:
+                pass
+
+figure_pool = FigurePool()
+
+def downsample(
+        x_values: typing.Sequence[int | float],
+        y_values: typing.Sequence[int | float],
+        max_points: int = MAX_GRAPH_POINTS
+    ) -> tuple[np.ndarray, np.ndarray]:
+    """Reduces a line to at most `max_points` points with min/max decimation.
+
+    The points are split into buckets, and the lowest and highest point in each bucket are kept, along with the first and last points of the line, so spikes don't disappear.
+
+    Args:
+        x_values (typing.Sequence[int | float]): The x values, in the order they should be drawn.
+        y_values (typing.Sequence[int | float]): The y values.
+        max_points (int, optional): The maximum number of points to return. Defaults to MAX_GRAPH_POINTS.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: The downsampled x and y values.
+    """
+    x_values = np.asarray(x_values)
+    y_values = np.asarray(y_values)
+
+    if len(x_values) <= max_points:
+        return x_values, y_values
+    
+    # Two points are kept per bucket, and two more for the ends.
+    bucket_count = max((max_points - 2) // 2, 1)
+    buckets = np.arange(len(y_values)) * bucket_count // len(y_values)
+
+    # Sorting by bucket and then by value puts the lowest value of each bucket at its start and the highest at its end.
+    order = np.lexsort((y_values, buckets))
+    starts = np.flatnonzero(np.diff(buckets[order], prepend=-1))
+    ends = np.append(starts[1:], len(order)) - 1
+
+    keep = np.unique(np.concatenate([[0, len(y_values) - 1], order[starts], order[ends]]))
+
+    return x_values[keep], y_values[keep]
+
+def _line_color(color: str | tuple[int, int, int] | None) -> typing.Any:
+    """Converts a hex code or RGB tuple into a color matplotlib understands."""
+    if isinstance(color, tuple):
+        return tuple([item / 255 for item in color])
+    
+    if isinstance(color, str):
+        color = color.replace("#", "")
+        return [int(item, 16) / 255 for item in u_text.split_chunks(color, 2)]
+    
+    return color
+
 def generate_graph(
         lines: list[dict[str, str | tuple[int, int, int] | list[tuple[int, int]]]], # color, label, values
         *,
         x_label: str = "",
         y_label: str = "",
         log_scale: bool = False,
-        file_name: str = f"images{SLASH}generated{SLASH}generated_graph.png"
-    ) -> str:
-    """Generates a graph.
+        file_name: str | typing.BinaryIO = f"images{SLASH}generated{SLASH}generated_graph.png"
+    ) -> str | typing.BinaryIO:
+    """Generates a graph. Lines with more than `MAX_GRAPH_POINTS` points are downsampled first.
 
     Args:
         lines (list[dict[str, str | tuple[int, int, int] | list[tuple[int, int]]]]): The data to graph, should be a list of dicts, each dict with "color", "label" and "values" keys, the values one should be a list of tuples with x and y coordinates, "color" can be a string hex code or RGB, "label" should just be a string.
         x_label (str, optional): The label of the x axis. Defaults to "".
         y_label (str, optional): The label of the y axis. Defaults to "".
         log_scale (bool, optional): Whether the y axis should be on a log scale. Defaults to False.
-        file_name (bool, optional): Custom file location. Defaults to "images/generated/generated_graph.png".
+        file_name (str | typing.BinaryIO, optional): Custom file location, which can be a buffer. Defaults to "images/generated/generated_graph.png".
 
     Returns:
-        str: The file name of the generated image, this is going to be the same as the file_name argument.
+        str | typing.BinaryIO: The file name of the generated image, this is going to be the same as the file_name argument.
     """
-    plt.clf()
-
-    for line_data in lines:
-        line_color = line_data.get("color")
-
-        if isinstance(line_color, tuple):
-            line_color = tuple([color / 255 for color in line_color])
-        elif isinstance(line_color, str):
-            line_color = line_color.replace("#", "")
-            line_color = [int(item, 16) / 255 for item in u_text.split_chunks(line_color, 2)]
-
-        line_label = line_data.get("label")
-
-        x_values = []
-        y_values = []
-
-        for x_val, y_val in line_data["values"]:
-            x_values.append(x_val)
-            y_values.append(y_val)
+    with figure_pool.figure() as figure:
+        axes = figure.add_subplot()
+
+        for line_data in lines:
+            if len(line_data["values"]) == 0:
+                x_values, y_values = [], []
+            else:
+                x_values, y_values = downsample(*zip(*line_data["values"]))
+            
+            axes.plot(x_values, y_values, label=line_data.get("label"), color=_line_color(line_data.get("color")))
         
-        plt.plot(x_values, y_values, label=line_label, color=line_color)
-    
-    plt.xlabel(x_label)
-    plt.ylabel(y_label)
+        axes.set_xlabel(x_label)
+        axes.set_ylabel(y_label)
 
-    if log_scale:
-        plt.yscale('log')
+        if log_scale:
+            axes.set_yscale('log')
 
-    plt.legend(bbox_to_anchor=(1.04, 0.5), loc="center left", borderaxespad=0)
-    plt.grid()
-    
-    plt.savefig(file_name, bbox_inches='tight')
+        axes.legend(bbox_to_anchor=(1.04, 0.5), loc="center left", borderaxespad=0)
+        axes.grid()
+        
+        figure.savefig(file_name, bbox_inches='tight', format="png")
 
     return file_name
 
@@ -314,30 +450,31 @@ def generate_bar_graph(
         *,
         x_label: str = "",
         y_label: str = "",
-        file_name: str = f"images{SLASH}generated{SLASH}generated_graph.png"
-    ) -> str:
+        file_name: str | typing.BinaryIO = f"images{SLASH}generated{SLASH}generated_graph.png"
+    ) -> str | typing.BinaryIO:
     """Generates a bar graph.
 
     Args:
         bars (list[tuple[str, int]]): A list of tuples, each tuple should have a string and an int, the string is the label and the int is the value.
         x_label (str, optional): The x axis label. Defaults to "".
         y_label (str, optional): The y axis label. Defaults to "".
-        file_name (str, optional): The file path. Defaults to "images/generated/generated_graph.png".
+        file_name (str | typing.BinaryIO, optional): The file path, which can be a buffer. Defaults to "images/generated/generated_graph.png".
 
     Returns:
-        str: The file name of the generated image, this is going to be the same as the file_name argument.
+        str | typing.BinaryIO: The file name of the generated image, this is going to be the same as the file_name argument.
     """
-    plt.clf()
-
     x_labels, y_values = list(zip(*bars))
 
-    plt.bar(x_labels, y_values)
+    with figure_pool.figure() as figure:
+        axes = figure.add_subplot()
+
+        axes.bar(x_labels, y_values)
 
-    plt.xlabel(x_label)
-    plt.ylabel(y_label)
-    plt.grid()
+        axes.set_xlabel(x_label)
+        axes.set_ylabel(y_label)
+        axes.grid()
 
-    plt.savefig(file_name, bbox_inches='tight')
+        figure.savefig(file_name, bbox_inches='tight', format="png")
 
     return file_name
 
@@ -345,18 +482,23 @@ def generate_bar_graph(
 ##### STONK REPORT ###################################################################################################################
 ######################################################################################################################################
 
-def stonk_report(database: u_files.DatabaseInterface) -> None:
-    """Generates the image for the stonk report and saves it to 'images/generated/stonk_report.png'
+def stonk_report_data(database: u_files.DatabaseInterface) -> dict[str, typing.Any]:
+    """Gets everything `stonk_report` needs from the database and the stonk history.
+    This reads the stonk history caches that `u_stonks.append_tick` updates, so it should be run on the event loop rather than in the render thread.
 
     Args:
         database (u_files.DatabaseInterface): The database object.
+
+    Returns:
+        dict[str, typing.Any]: The data for `stonk_report`. The lists of changes are NumPy arrays, so the render service matches them by identity rather than hashing them.
     """
     START_TICK = 2000 # The starting tick for the average value calculation.
 
-    stonk_history = u_stonks.stonk_history(database)
+    columns = u_stonks.history_columns(database)
+    returns = u_stonks.history_returns(database)
 
-    current_tick = u_stonks.convert_tick(stonk_history[-1])
-    previous_tick = u_stonks.convert_tick(stonk_history[-2])
+    current_tick = u_stonks.convert_tick(columns.tick(-1))
+    previous_tick = u_stonks.convert_tick(columns.tick(-2))
 
     previous_tick = u_stonks.filter_splits(previous_tick, current_tick)["new"]
 
@@ -370,6 +512,36 @@ def stonk_report(database: u_files.DatabaseInterface) -> None:
 
     algorithm_data = u_algorithms.get_info(database, leaderboard[0][0])
     algorithm_portfolio = algorithm_data["func"](1_000_000)["portfolio"]
+
+    stonks = {}
+
+    for stonk in u_values.stonks:
+        # The split-adjusted change on every tick since the start tick, and the 4 and 12 tick averages of it.
+        stonks[stonk.internal_name] = {
+            "change": current_tick.get(stonk, stonk.base_value) - previous_tick.get(stonk, stonk.base_value),
+            "change_percent_list": returns.ratios(stonk.internal_name, start=START_TICK + 1),
+            "day_percent_list": returns.rolling_mean(stonk.internal_name, window=4, start=START_TICK + 5),
+            "three_days_percent_list": returns.rolling_mean(stonk.internal_name, window=12, start=START_TICK + 13),
+            "invested": algorithm_portfolio[stonk.internal_name] >= 1
+        }
+    
+    return {
+        "algorithm_name": algorithm_data["name"],
+        "stonks": stonks
+    }
+
+def stonk_report(
+        report_data: dict[str, typing.Any],
+        file_name: str | typing.BinaryIO = f"images{SLASH}generated{SLASH}stonk_report.png"
+    ) -> None:
+    """Generates the image for the stonk report and saves it to 'images/generated/stonk_report.png'
+
+    Args:
+        report_data (dict[str, typing.Any]): The data from `stonk_report_data`.
+        file_name (str | typing.BinaryIO, optional): Where to save the image, which can be a buffer. Defaults to "images/generated/stonk_report.png".
+    """
+    mcolors = _matplotlib()["colors"]
+
     algorithm_choices = [ # This can be called via list[bool] to get whether it was chosen by the algorithm or not.
         ((0.75, 0.4, 0.4, 1), PIL_Image.open(f"images{SLASH}bases{SLASH}x.png").resize((90, 90)).convert("RGBA")),
         ((0.4, 0.75, 0.4, 1), PIL_Image.open(f"images{SLASH}bases{SLASH}check.png").resize((90, 90)).convert("RGBA"))
@@ -392,44 +564,13 @@ def stonk_report(database: u_files.DatabaseInterface) -> None:
     imgDraw = PIL_ImageDraw.Draw(img)
 
     # Write the best algorithm's name.
-    imgDraw.text((100, 660), algorithm_data["name"].replace("_"," ").title(), (0, 0, 0), font=algorithm_font, align="center", stroke_width=1)
-
-    def get_data_list(
-            key: typing.Callable[[int, int], float],
-            stonk: u_values.StonkItem,
-            offset: int = 0,
-            default: int = 1
-        ) -> list[int | float]:
-        """Generates a list of values using the key function.
-
-        Args:
-            key (typing.Callable[[int, int], float]): A function that takes in two integers and returns a float. The two integers will be the start tick and the end tick.
-            stonk (u_values.StonkItem): The stonk that will be used.
-            offset (int, optional): Offset from the starting tick. Defaults to 0.
-            default (int, optional): The value that will be put in the list if there aren't enough ticks. Defaults to 1.
+    imgDraw.text((100, 660), report_data["algorithm_name"].replace("_"," ").title(), (0, 0, 0), font=algorithm_font, align="center", stroke_width=1)
 
-        Returns:
-            list[int | float]: The created list.
-        """
-        if START_TICK + offset >= len(stonk_history):
-            return [default]
-        
-        out = []
-        for tick_id in range(START_TICK + offset, len(stonk_history)):
-            data = [
-                u_stonks.convert_tick(tick)
-                for tick in stonk_history[tick_id - offset:tick_id + 1]
-            ]
-            
-            out.append(key(data))
-
-        return out
-    
     def convert_color(data: tuple):
         return tuple([int(item * 255) for item in data])
     
     def render_gradient(
-            gradient: mcolors.LinearSegmentedColormap,
+            gradient: typing.Callable[[float], tuple[float, float, float, float]],
             vertical_position: int,
             stonk_id: int,
             pixel_count: int = 47
@@ -469,29 +610,17 @@ def stonk_report(database: u_files.DatabaseInterface) -> None:
         imgDraw.text((734 + (435 * stonk_id) - (33 * len(str(text)) / 2), 320 + (101 * vertical_position)), str(text), font=font, fill=(0, 0, 0))    
 
     for stonk_id, stonk in enumerate(u_values.stonks):
-        def calc(x: list[dict]):
-            x[-2] = u_stonks.filter_splits(x[-2], x[-1])["new"]
-            return x[-1].get(stonk) / x[-2].get(stonk)
-
-        change_percent_list = get_data_list(
-            key = calc,
-            stonk = stonk,
-            offset = 1
-        )
+        stonk_data = report_data["stonks"][stonk.internal_name]
+
+        change_percent_list = stonk_data["change_percent_list"].tolist()
 
-        day_percent_list = [
-            sum(change_percent_list[tick_id - 3:tick_id + 1]) / 4
-            for tick_id in range(len(change_percent_list))
-            if tick_id >= 4
-        ]
+        if len(change_percent_list) == 0:
+            change_percent_list = [1]
 
-        three_days_percent_list = [
-            sum(change_percent_list[tick_id - 11:tick_id + 1]) / 12
-            for tick_id in range(len(change_percent_list))
-            if tick_id >= 12
-        ]
+        day_percent_list = stonk_data["day_percent_list"].tolist()
+        three_days_percent_list = stonk_data["three_days_percent_list"].tolist()
 
-        change = current_tick.get(stonk, stonk.base_value) - previous_tick.get(stonk, stonk.base_value)
+        change = stonk_data["change"]
         change_percent = change_percent_list[-1]
         day_percent = day_percent_list[-1]
         three_days_percent = three_days_percent_list[-1]
@@ -524,7 +653,7 @@ def stonk_report(database: u_files.DatabaseInterface) -> None:
         )
 
         # Fourth row, whether the best algorithm is investing in this stonk.
-        gradient_color, image_paste = algorithm_choices[algorithm_portfolio[stonk.internal_name] >= 1]
+        gradient_color, image_paste = algorithm_choices[stonk_data["invested"]]
         gradient = mcolors.LinearSegmentedColormap.from_list('gradient', [gradient_color, backgrounds[stonk_id % 2]], N=47)
 
         render_gradient(
@@ -536,7 +665,7 @@ def stonk_report(database: u_files.DatabaseInterface) -> None:
         img.paste(image_paste, (692 + (stonk_id * 435), 617), image_paste)
 
     # Save the final image.
-    img.save(f"images{SLASH}generated{SLASH}stonk_report.png", quality=90)
+    img.save(file_name, "png", quality=90)
 
 ######################################################################################################################################
 ##### CHESS MATCH ####################################################################################################################
@@ -545,21 +674,22 @@ def stonk_report(database: u_files.DatabaseInterface) -> None:
 def chess_match(
         bot_white: str,
         bot_black: str,
-        game_data: dict
+        game_data: dict,
+        file_name: str | typing.BinaryIO = f"images{SLASH}generated{SLASH}chess_match.png"
     ) -> None:
     """Generates the cover image for the daily Chess game and saves it to 'images/generated/chess_match.png'
 
     Args:
         bot_white (str): The name of the bot playing the white pieces.
         bot_black (str): The name of the bot playing the black pieces.
+        file_name (str | typing.BinaryIO, optional): Where to save the image, which can be a buffer. Defaults to "images/generated/chess_match.png".
     """
     img = PIL_Image.open(f"images{SLASH}bases{SLASH}chess_match_base.png").copy().convert("RGBA")
 
     ### Rendering the chess board.
 
     board = u_chess.get_board_from_pgn(game_data.get("pgn"))
-    board_path = u_chess.render_board(board)
-    board_image = PIL_Image.open(board_path).copy().convert("RGBA")
+    board_image = u_chess.render_board(board, return_image=True).convert("RGBA")
     board_image = board_image.resize((390, 390))
 
     img.paste(board_image, (406, 105))
@@ -663,7 +793,7 @@ def chess_match(
 
 
     # Save the final image.
-    img.save(f"images{SLASH}generated{SLASH}chess_match.png", quality=90)
+    img.save(file_name, "png", quality=90)
     
     # 242, 221
 
@@ -673,8 +803,16 @@ def chess_match(
 
 def chess_puzzle(
         puzzle_data: dict,
-        elo_data: dict
+        elo_data: dict,
+        file_name: str | typing.BinaryIO = f"images{SLASH}generated{SLASH}chess_puzzle.png"
     ) -> None:
+    """Generates the image for the daily chess puzzle results and saves it to 'images/generated/chess_puzzle.png'
+
+    Args:
+        puzzle_data (dict): The puzzle and each bot's attempt at it.
+        elo_data (dict): The elo of each bot and how much it changed.
+        file_name (str | typing.BinaryIO, optional): Where to save the image, which can be a buffer. Defaults to "images/generated/chess_puzzle.png".
+    """
     correct_image = PIL_Image.open(f"images{SLASH}bases{SLASH}check.png").resize((50, 50)).convert("RGBA")
     incorrect_image = PIL_Image.open(f"images{SLASH}bases{SLASH}x.png").resize((50, 50)).convert("RGBA")
     
@@ -812,7 +950,7 @@ def chess_puzzle(
         img.paste(to_paste.copy(), (base_x + WIDTH_PER_BOT - 51, base_y + HEIGHT_PER_BOT - 51), to_paste.copy())
     
     # Save the final image.
-    img.save(f"images{SLASH}generated{SLASH}chess_puzzle.png", quality=90)
+    img.save(file_name, "png", quality=90)
     
     
 
@@ -832,4 +970,146 @@ def solid_color(
     img.save(output, "png")
     output.seek(0)
 
-    return output
\ No newline at end of file
+    return output
+
+
+
+######################################################################################################################################
+##### RENDER SERVICE #################################################################################################################
+######################################################################################################################################
+
+def _render_key(value: typing.Any) -> typing.Hashable:
+    """Converts arguments into something hashable, so identical render requests can be matched up. Objects that can't be hashed are matched by identity."""
+    if isinstance(value, dict):
+        return ("dict", tuple((_render_key(key), _render_key(item)) for key, item in value.items()))
+    
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__, tuple(_render_key(item) for item in value))
+    
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return ("id", id(value))
+
+class RenderService():
+    def __init__(
+            self: typing.Self,
+            workers: int = 2
+        ) -> None:
+        """Runs renderers in a thread pool and returns the images as in-memory buffers, so renders don't block the event loop or overwrite each other's files.
+
+        Identical renders requested while one is already running share the result.
+
+        Args:
+            workers (int, optional): The number of renders that can run at once. Defaults to 2.
+        """
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="render")
+        self._pending = {} # type: dict[typing.Hashable, asyncio.Future]
+
+        self._lock = threading.Lock()
+        self._times = {} # type: dict[str, collections.deque[float]]
+        self._counters = {} # type: dict[str, dict[str, int]]
+    
+    async def render(
+            self: typing.Self,
+            renderer: typing.Callable,
+            *args,
+            output_argument: str = "file_name",
+            **kwargs
+        ) -> io.BytesIO:
+        """Runs a renderer in the thread pool and returns the image it made.
+
+        Args:
+            renderer (typing.Callable): The renderer to run, like `generate_graph`. It must take a path or buffer to save the image to.
+            *args: The positional arguments for the renderer.
+            output_argument (str, optional): The name of the renderer's argument for where to save the image. Defaults to "file_name".
+            **kwargs: The keyword arguments for the renderer.
+
+        Returns:
+            io.BytesIO: A new buffer containing the image, ready to be given to `discord.File`.
+        """
+        name = renderer.__name__
+        key = (renderer.__module__, renderer.__qualname__, _render_key(args), _render_key(kwargs))
+
+        future = self._pending.get(key)
+
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(self._executor, self._run, renderer, args, kwargs, output_argument)
+            self._pending[key] = future
+
+            def remove(_: asyncio.Future) -> None:
+                if self._pending.get(key) is future:
+                    del self._pending[key]
+
+            future.add_done_callback(remove)
+        else:
+            self._count(name, "deduplicated")
+        
+        # Shielded so one caller being cancelled doesn't cancel the render for everyone else waiting on it.
+        data = await asyncio.shield(future)
+
+        return io.BytesIO(data)
+    
+    def _run(
+            self: typing.Self,
+            renderer: typing.Callable,
+            args: tuple,
+            kwargs: dict,
+            output_argument: str
+        ) -> bytes:
+        """Runs the renderer in a worker thread and returns the bytes of the image."""
+        output = io.BytesIO()
+
+        start = time.perf_counter()
+        try:
+            renderer(*args, **{**kwargs, output_argument: output})
+        except:
+            self._count(renderer.__name__, "errors")
+            raise
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self._times.setdefault(renderer.__name__, collections.deque(maxlen=200)).append(elapsed)
+        
+        self._count(renderer.__name__, "renders")
+
+        return output.getvalue()
+    
+    def _count(
+            self: typing.Self,
+            name: str,
+            counter: str
+        ) -> None:
+        with self._lock:
+            counters = self._counters.setdefault(name, {"renders": 0, "deduplicated": 0, "errors": 0})
+            counters[counter] += 1
+    
+    def metrics(self: typing.Self) -> dict[str, dict[str, int | float | None]]:
+        """Returns the render counts and times, in seconds, for each renderer that has been used."""
+        with self._lock:
+            output = {}
+
+            for name, counters in self._counters.items():
+                times = sorted(self._times.get(name, []))
+
+                output[name] = {
+                    **counters,
+                    "average": sum(times) / len(times) if times else None,
+                    "p50": times[len(times) // 2] if times else None,
+                    "max": times[-1] if times else None
+                }
+            
+            return output
+    
+    def shutdown(self: typing.Self) -> None:
+        """Stops the worker threads once any running renders have finished."""
+        self._executor.shutdown(wait=False)
+
+try:
+    # If this module is being reloaded the old service is still here, so let it finish what it's doing and then stop its threads.
+    render_service.shutdown()
+except NameError:
+    pass
+
+render_service = RenderService()
@@ -9,6 +9,7 @@ import time
 import re
 import aiohttp
 import traceback
+import functools
 
 import utility.values as u_values
 import utility.text as u_text
@@ -277,7 +278,11 @@ def is_bread_roll(message: discord.Message) -> bool:
     if is_gamble(message):
         return False
     
-    content = remove_starting_ping(message.content)
+    return _is_bread_roll_content(message.content)
+
+def _is_bread_roll_content(content: str) -> bool:
+    """Does the content checks for `is_bread_roll`, for a message that has already passed the Machine-Mind and gamble checks."""
+    content = remove_starting_ping(content)
     
     first_line = content.split("---")[0].split("\n")[0]
     per_line_count = len(re.findall("(<a?)?:[\d\w_]+:(\d+>)?", first_line))
@@ -342,6 +347,90 @@ def remove_starting_ping(content: str) -> str:
         content = re.sub(r"^<@\d+> ?\n\n", "", content)
     return content
 
+class MessageAnalysis():
+    def __init__(
+            self: typing.Self,
+            message: discord.Message
+        ) -> None:
+        """Facts about a message that are worked out the first time they're used and then reused.
+        One of these should be made per message and shared between everything that looks at the message, so the checks and parsers only run once.
+
+        Args:
+            message (discord.Message): The message to analyse.
+        """
+        self.message = message
+    
+    @functools.cached_property
+    def is_mm(self: typing.Self) -> bool:
+        """Whether the message was sent by Machine-Mind or a known clone. Same as `is_mm()`."""
+        return is_mm(self.message)
+    
+    @functools.cached_property
+    def is_reply(self: typing.Self) -> bool:
+        """Whether the message is a reply, counting pings at the start of Machine-Mind messages. Same as `is_reply()`."""
+        return is_reply(self.message, allow_ping=True)
+    
+    @functools.cached_property
+    def is_reply_no_ping(self: typing.Self) -> bool:
+        """Whether the message is an actual reply. Same as `is_reply()` with `allow_ping` set to False."""
+        return is_reply(self.message, allow_ping=False)
+    
+    @functools.cached_property
+    def mm_reply(self: typing.Self) -> bool:
+        """Whether the message is a reply sent by Machine-Mind. Same as `mm_checks()` with `check_reply` set to True."""
+        return self.is_mm and self.is_reply
+    
+    @functools.cached_property
+    def is_gamble(self: typing.Self) -> bool:
+        """Whether the message is a gamble. Same as `is_gamble()`."""
+        # Passing the content skips the Machine-Mind checks, which have already been done.
+        return self.mm_reply and is_gamble(self.message.content)
+    
+    @functools.cached_property
+    def is_bread_roll(self: typing.Self) -> bool:
+        """Whether the message is a bread roll. Same as `is_bread_roll()`."""
+        return self.mm_reply and not self.is_gamble and _is_bread_roll_content(self.message.content)
+    
+    @functools.cached_property
+    def parsed_roll(self: typing.Self) -> list[dict[str, str | int | list[typing.Type[u_values.Item]]]] | None:
+        """The parsed bread roll from `utility.bread.parse_roll()`, or None if the message is not a bread roll.
+        This is shared, so it should not be modified."""
+        if not self.is_bread_roll:
+            return None
+        
+        return u_bread.parse_roll(self.message, verified=True)
+    
+    @functools.cached_property
+    def parsed_gamble(self: typing.Self) -> list[typing.Type[u_values.Item]] | None:
+        """The parsed gamble from `utility.bread.parse_gamble()`, or None if the message is not a gamble.
+        This is shared, so it should not be modified."""
+        if not self.is_gamble:
+            return None
+        
+        return u_bread.parse_gamble(self.message, verified=True)
+    
+    @functools.cached_property
+    def content_lower(self: typing.Self) -> str:
+        """The message content in lowercase."""
+        return self.message.content.lower()
+    
+    @functools.cached_property
+    def kinds(self: typing.Self) -> frozenset[str]:
+        """The kinds of message this is, used by the auto detection. See `utility.detection.MESSAGE_KINDS`."""
+        if not self.is_mm:
+            return frozenset(["chat"])
+        
+        if not self.is_reply:
+            return frozenset(["mm"])
+        
+        if self.is_gamble:
+            return frozenset(["mm", "mm_reply", "gamble"])
+        
+        if self.is_bread_roll:
+            return frozenset(["mm", "mm_reply", "bread_roll"])
+        
+        return frozenset(["mm", "mm_reply"])
+
 async def resolve_conflict(
         database: u_files.DatabaseInterface,
         ctx: commands.Context | u_custom.CustomContext,
@@ -1,6 +1,7 @@
 """Specific Bread Game solvers using z3, and other mathematical solvers."""
 from __future__ import annotations
 import multiprocessing.queues
+import multiprocessing.connection
 
 from discord.ext import commands
 import discord
@@ -11,6 +12,14 @@ import time
 import operator
 import multiprocessing
 import traceback
+import typing
+import asyncio
+import collections
+import hashlib
+import functools
+import json
+import os
+import tempfile
 
 # pip install z3-solver
 import z3
@@ -38,140 +47,207 @@ def universal_solver(
     Args:
         items (dict[u_values.Item, int]): A dict with the amount of each item is has to play around with.
         maximize (u_values.Item): The item to maximize.
+        output (multiprocessing.Queue, optional): A queue to put the result in, for when this is run in another process. Defaults to None.
 
     Returns:
         dict[str, int]: A dict version of the z3 model.
     """
+    result_json = _universal_solver(
+        items = items,
+        maximize = maximize,
+        disabled_recipes = disabled_recipes,
+        disabled_items = disabled_items,
+        minimum_items = minimum_items,
+        equal_items = equal_items
+    )
+
+    if output is not None:
+        output.put(result_json)
+
+    return result_json
+
+def _universal_solver(
+        items: dict[u_values.Item, int],
+        maximize: u_values.Item,
+        disabled_recipes: list[str] = None,
+        disabled_items: list[u_values.Item] = None,
+        minimum_items: dict[u_values.Item, int] = None,
+        equal_items: dict[u_values.Item, int] = None
+    ) -> dict[str, int]:
     try:
-        if disabled_recipes is None:
-            disabled_recipes = []
-        if disabled_items is None:
-            disabled_items = []
-        if minimum_items is None:
-            minimum_items = {}
-        if equal_items is None:
-            equal_items = {}
+        return get_solver_template().solve(
+            items = items,
+            maximize = maximize,
+            disabled_recipes = disabled_recipes,
+            disabled_items = disabled_items,
+            minimum_items = minimum_items,
+            equal_items = equal_items
+        )
+    except Exception as error:
+        print(traceback.format_exc())
+        return {"state": "error", "exception": error}
 
-        items[maximize] = 0
+class SolverTemplate():
+    def __init__(self: typing.Self) -> None:
+        """The part of the solver model that only depends on the recipes, built once and reused for every solve.
 
-        s = z3.Optimize()
+        Every recipe in `u_values.alchemy_recipes` and `u_values.misc_conversions` gets a variable, and every item used by them gets its amount, modifier and total.
+        Each solve then adds the inventory, the disabled recipes and the objectives in a push/pop scope, so nothing has to be rebuilt."""
+        self.version = recipe_table_version()
 
-        item_amounts = {}
-        item_modifiers = {}
-        item_totals = {}
-        item_recipes = {}
-        item_recipe_booleans = {}
+        self.optimize = z3.Optimize()
 
-        modifier_data = {item: [] for item in items}
+        self.amounts = {} # type: dict[str, z3.ArithRef]
+        self.modifiers = {} # type: dict[str, z3.ArithRef]
+        self.totals = {} # type: dict[str, z3.ArithRef]
 
-        recipes = u_values.alchemy_recipes.copy()
+        self.recipes = {} # type: dict[str, z3.ArithRef]
+        self.recipe_booleans = {} # type: dict[str, z3.ArithRef]
+
+        # The item each recipe makes, and every item it uses.
+        self.recipe_results = {} # type: dict[str, str]
+        self.recipe_costs = {} # type: dict[str, list[str]]
 
+        recipes = u_values.alchemy_recipes.copy()
         recipes.update(u_values.misc_conversions)
 
-        for item, amount in items.items():
-            item_amounts[item] = z3.Int(f"{item.internal_name}_amounts")
-            item_modifiers[item] = z3.Int(f"{item.internal_name}_modifier")
-            item_totals[item] = z3.Int(f"{item.internal_name}_total")
+        modifier_data = {} # type: dict[str, list[tuple[str, int]]]
 
-            s.add(item_totals[item] == (amount + item_modifiers[item]))
-            s.add(item_totals[item] >= 0, item_amounts[item] >= 0)
+        for item_name, item_recipes in recipes.items():
+            modifier_data.setdefault(item_name, [])
 
-            if item.internal_name not in recipes:
-                continue
+            for recipe_id, recipe in enumerate(item_recipes):
+                recipe_name = f"{item_name}_recipe_{recipe_id + 1}"
 
-            if item in disabled_items:
-                s.add(item_modifiers[item] == 0)
+                self.recipes[recipe_name] = z3.Int(recipe_name)
+                self.recipe_booleans[recipe_name] = z3.Int("bool_" + recipe_name)
 
-            for recipe_id, recipe in enumerate(recipes[item.internal_name]):
-                recipe_name = f"{item.internal_name}_recipe_{recipe_id + 1}"
-                if recipe_name in disabled_recipes:
-                    continue
+                self.optimize.add(self.recipes[recipe_name] >= 0)
+                self.optimize.add(self.recipe_booleans[recipe_name] == z3.If(self.recipes[recipe_name] > 0, 1, 0))
 
-                if any(filter(lambda i: i[0] in disabled_items, recipe["cost"])):
-                    continue
+                self.recipe_results[recipe_name] = item_name
+                self.recipe_costs[recipe_name] = [cost_item.internal_name for cost_item, _ in recipe["cost"]]
+
+                modifier_data[item_name].append((recipe_name, recipe.get("result", 1)))
 
                 for cost_item, cost_amount in recipe["cost"]:
-                    if cost_item not in modifier_data:
-                        break
+                    modifier_data.setdefault(cost_item.internal_name, []).append((recipe_name, cost_amount * -1))
+        
+        for item_name, data in modifier_data.items():
+            self.amounts[item_name] = z3.Int(f"{item_name}_amount")
+            self.modifiers[item_name] = z3.Int(f"{item_name}_modifier")
+            self.totals[item_name] = z3.Int(f"{item_name}_total")
 
-                    if cost_item in disabled_items:
-                        break
-                    
-                    modifier_data[cost_item].append((recipe_name, cost_amount * -1))
-                else:
-                    item_recipes[recipe_name] = z3.Int(recipe_name)
-                    item_recipe_booleans["bool_" + recipe_name] = z3.Int("bool_" + recipe_name)
+            self.optimize.add(self.modifiers[item_name] == z3.Sum([self.recipes[recipe_name] * multiplier for recipe_name, multiplier in data]))
+            self.optimize.add(self.totals[item_name] == self.amounts[item_name] + self.modifiers[item_name])
+    
+    def solve(
+            self: typing.Self,
+            items: dict[u_values.Item, int],
+            maximize: u_values.Item,
+            disabled_recipes: list[str] = None,
+            disabled_items: list[u_values.Item] = None,
+            minimum_items: dict[u_values.Item, int] = None,
+            equal_items: dict[u_values.Item, int] = None
+        ) -> dict[str, int]:
+        """Solves for the most of an item that can be made. The arguments are the same as `universal_solver`.
+
+        Returns:
+            dict[str, int]: A dict version of the z3 model, with the total of every given item and the amount of every usable recipe.
+        """
+        if disabled_recipes is None:
+            disabled_recipes = []
+        if minimum_items is None:
+            minimum_items = {}
+        if equal_items is None:
+            equal_items = {}
 
-                    s.add(item_recipes[recipe_name] >= 0)
-                    s.add(item_recipe_booleans["bool_" + recipe_name] == z3.If(item_recipes[recipe_name] > 0, 1, 0))
+        amounts = {item.internal_name: amount for item, amount in items.items()}
+        amounts[maximize.internal_name] = 0
 
-                    modifier_data[item].append((recipe_name, recipe.get("result", 1)))
+        disabled_names = set() if disabled_items is None else {item.internal_name for item in disabled_items}
+        disabled_recipes = set(disabled_recipes)
 
-        for item, data in modifier_data.items():
-            constraints = []
-            for recipe, multiplier in data:
-                constraints.append((item_recipes[recipe] * multiplier))
+        # Recipes can only be used if they make and use items that were given and aren't disabled.
+        usable = {
+            recipe_name
+            for recipe_name, result in self.recipe_results.items()
+            if recipe_name not in disabled_recipes
+                and result in amounts
+                and result not in disabled_names
+                and all(cost in amounts and cost not in disabled_names for cost in self.recipe_costs[recipe_name])
+        }
 
-            s.add(item_modifiers[item] == z3.Sum(constraints))
-        
-        for item, minimum in minimum_items.items():
-            s.add(item_totals[item] >= minimum)
+        s = self.optimize
+        s.push()
 
-        for item, goal in equal_items.items():
-            s.add(item_totals[item] == goal)
+        try:
+            totals = self.totals.copy()
 
-        s.maximize(item_totals[maximize])
+            for item_name, amount in self.amounts.items():
+                s.add(amount == amounts.get(item_name, 0))
+            
+            for item_name, amount in amounts.items():
+                # Items that aren't in any recipe only need a total.
+                if item_name not in totals:
+                    totals[item_name] = z3.Int(f"{item_name}_total")
+                    s.add(totals[item_name] == amount)
+                
+                s.add(totals[item_name] >= 0)
+            
+            for recipe_name, recipe in self.recipes.items():
+                if recipe_name not in usable:
+                    s.add(recipe == 0)
+            
+            for item, minimum in minimum_items.items():
+                s.add(totals[item.internal_name] >= minimum)
 
-        s.minimize(z3.Sum(list(item_recipe_booleans.values())))
+            for item, goal in equal_items.items():
+                s.add(totals[item.internal_name] == goal)
+            
+            s.maximize(totals[maximize.internal_name])
 
-        for minimize in item_recipes.values():
-            s.minimize(minimize)
+            # Use as few recipes as possible, and then as few distills as possible.
+            s.minimize(z3.Sum([self.recipe_booleans[recipe_name] for recipe_name in usable] or [z3.IntVal(0)]))
+            s.minimize(z3.Sum([self.recipes[recipe_name] for recipe_name in usable] or [z3.IntVal(0)]))
 
-        if s.check() != z3.sat:
-            output.put({"state": "unsat"})
-            return
-        
-        model = s.model()
+            if s.check() != z3.sat:
+                return {"state": "unsat"}
+            
+            model = s.model()
 
-        result_json = {"state":"valid"}
+            result_json = {"state": "valid"}
 
-        items_send = []
+            for item_name in amounts:
+                result_json[f"{item_name}_total"] = model.eval(totals[item_name], model_completion=True).as_long()
+            
+            for recipe_name in usable:
+                result_json[recipe_name] = model.eval(self.recipes[recipe_name], model_completion=True).as_long()
+                result_json["bool_" + recipe_name] = model.eval(self.recipe_booleans[recipe_name], model_completion=True).as_long()
 
-        for item in model:
-            items_send.append(item)
+            return result_json
+        finally:
+            s.pop()
 
-        for item in items_send:
-            try:
-                result_json[str(item)] = model[item].as_long()
-            except AttributeError: # If something doesn't have .as_long() we probably don't need it.
-                pass
+_solver_template = None # type: SolverTemplate
 
-        output.put(result_json)
-    except Exception as error:
-        print(traceback.format_exc())
-        output.put({"state": "error", "exception": error})
+def get_solver_template() -> SolverTemplate:
+    """Returns the solver template for the current recipes, building it if the recipes have changed since it was last built."""
+    global _solver_template
 
-def solver_wrapper(
+    if _solver_template is None or _solver_template.version != recipe_table_version():
+        _solver_template = SolverTemplate()
+    
+    return _solver_template
+
+def _clean_solver_inputs(
         items: dict[u_values.Item, int],
-        maximize: u_values.Item,
         disabled_recipes: list[str] = None,
         disabled_items: list[u_values.Item] = None,
         minimum_items: dict[u_values.Item, int] = None,
-        equal_items: dict[u_values.Item, int] = None,
-        timeout_time: int | float = 30.0
-    ) -> tuple[list[str], dict[u_values.Item, int], dict[str, int]] | None:
-    """Wrapper for the universal_solver that automatically generates the command list.
-
-    Args:
-        items (dict[u_values.Item, int]): A dict with the amount of each item is has to play around with.
-        maximize (u_values.Item): The item to maximize.
-        disabled_recipes (list[str], optional): List of recipes to disable in the format of `<item>_recipe_<recipe id>` where recipe id is 1 indexed. `None` is functionally the same as an empty list. Defaults to None.
-        disabled_items (list[u_values.Item], optional): List of items to disallow the solver from using. Defaults to None.
-        timeout_time (int | float, optional): Amount of time to give the solver before killing it. Defaults to 30.0.
-
-    Returns:
-        tuple[list[str], dict[u_values.Item, int], dict[str, int]] | None: The command list, post-alchemy version of the items, and the dict version of the solver. If `None` is returned then the timeout was encountered.
-    """
+        equal_items: dict[u_values.Item, int] = None
+    ) -> tuple[list[str], list[u_values.Item], dict[u_values.Item, int], dict[u_values.Item, int]]:
+    """Fills in the defaults for the optional solver inputs, and removes anything in `minimum_items` and `equal_items` that isn't in `items`."""
     if disabled_recipes is None:
         disabled_recipes = []
     if disabled_items is None:
@@ -190,32 +266,16 @@ def solver_wrapper(
     for key in equal_items.copy():
         if key not in items:
             equal_items.pop(key)
+    
+    return disabled_recipes, disabled_items, minimum_items, equal_items
 
-    # Run the solver in a new thread.
-    queue = multiprocessing.Queue()
-
-    process = multiprocessing.Process(
-        None,
-        universal_solver,
-        args=(
-            items.copy(),
-            maximize,
-            disabled_recipes,
-            disabled_items,
-            minimum_items,
-            equal_items,
-            queue
-        )
-    )
-    process.start()
-
-    process.join(timeout_time)
-
-    if process.is_alive():
-        process.terminate()
+def _process_solver_result(
+        items: dict[u_values.Item, int],
+        solver_result: dict[str, int] | None
+    ) -> tuple[list[str], dict[u_values.Item, int], dict[str, int]] | bool | None:
+    """Turns the result of `universal_solver` into the command list and post-alchemy items. The return value is the same as `solver_wrapper`."""
+    if solver_result is None:
         return None
-    
-    solver_result = queue.get()
 
     if solver_result.get("state") == "unsat":
         return False
@@ -268,6 +328,128 @@ def solver_wrapper(
     
     return (command_list, item_copy, solver_result)
 
+def solver_wrapper(
+        items: dict[u_values.Item, int],
+        maximize: u_values.Item,
+        disabled_recipes: list[str] = None,
+        disabled_items: list[u_values.Item] = None,
+        minimum_items: dict[u_values.Item, int] = None,
+        equal_items: dict[u_values.Item, int] = None,
+        timeout_time: int | float = 30.0
+    ) -> tuple[list[str], dict[u_values.Item, int], dict[str, int]] | None:
+    """Wrapper for the universal_solver that automatically generates the command list.
+    This blocks until the solver finishes, so async code should use `solver_wrapper_async` instead.
+
+    Args:
+        items (dict[u_values.Item, int]): A dict with the amount of each item is has to play around with.
+        maximize (u_values.Item): The item to maximize.
+        disabled_recipes (list[str], optional): List of recipes to disable in the format of `<item>_recipe_<recipe id>` where recipe id is 1 indexed. `None` is functionally the same as an empty list. Defaults to None.
+        disabled_items (list[u_values.Item], optional): List of items to disallow the solver from using. Defaults to None.
+        timeout_time (int | float, optional): Amount of time to give the solver before killing it. Defaults to 30.0.
+
+    Returns:
+        tuple[list[str], dict[u_values.Item, int], dict[str, int]] | None: The command list, post-alchemy version of the items, and the dict version of the solver. If `None` is returned then the timeout was encountered.
+    """
+    disabled_recipes, disabled_items, minimum_items, equal_items = _clean_solver_inputs(
+        items = items,
+        disabled_recipes = disabled_recipes,
+        disabled_items = disabled_items,
+        minimum_items = minimum_items,
+        equal_items = equal_items
+    )
+
+    cache_key = solver_cache_key(items, maximize, disabled_recipes, disabled_items, minimum_items, equal_items)
+
+    cached = solver_cache.get(cache_key)
+    if cached is not None:
+        return _process_solver_result(items, cached)
+
+    # Run the solver in a new thread.
+    queue = multiprocessing.Queue()
+
+    process = multiprocessing.Process(
+        None,
+        universal_solver,
+        args=(
+            items.copy(),
+            maximize,
+            disabled_recipes,
+            disabled_items,
+            minimum_items,
+            equal_items,
+            queue
+        )
+    )
+    process.start()
+
+    process.join(timeout_time)
+
+    if process.is_alive():
+        process.terminate()
+        return None
+    
+    solver_result = queue.get()
+
+    if solver_cache.put(cache_key, solver_result):
+        solver_cache.save()
+    
+    return _process_solver_result(items, solver_result)
+
+async def solver_wrapper_async(
+        items: dict[u_values.Item, int],
+        maximize: u_values.Item,
+        disabled_recipes: list[str] = None,
+        disabled_items: list[u_values.Item] = None,
+        minimum_items: dict[u_values.Item, int] = None,
+        equal_items: dict[u_values.Item, int] = None,
+        timeout_time: int | float = 30.0,
+        user_id: int = None
+    ) -> tuple[list[str], dict[u_values.Item, int], dict[str, int]] | None:
+    """Async version of `solver_wrapper` that runs the solver on the solver service, so the bot is not blocked while it runs.
+
+    Args:
+        items (dict[u_values.Item, int]): A dict with the amount of each item is has to play around with.
+        maximize (u_values.Item): The item to maximize.
+        disabled_recipes (list[str], optional): List of recipes to disable in the format of `<item>_recipe_<recipe id>` where recipe id is 1 indexed. `None` is functionally the same as an empty list. Defaults to None.
+        disabled_items (list[u_values.Item], optional): List of items to disallow the solver from using. Defaults to None.
+        timeout_time (int | float, optional): Amount of time to give the solver before killing it. This does not include time spent waiting in the queue. Defaults to 30.0.
+        user_id (int, optional): The id of the user the solve is for, which is used to share the workers fairly between users. Defaults to None.
+
+    Returns:
+        tuple[list[str], dict[u_values.Item, int], dict[str, int]] | None: The command list, post-alchemy version of the items, and the dict version of the solver. If `None` is returned then the timeout was encountered.
+    """
+    disabled_recipes, disabled_items, minimum_items, equal_items = _clean_solver_inputs(
+        items = items,
+        disabled_recipes = disabled_recipes,
+        disabled_items = disabled_items,
+        minimum_items = minimum_items,
+        equal_items = equal_items
+    )
+
+    cache_key = solver_cache_key(items, maximize, disabled_recipes, disabled_items, minimum_items, equal_items)
+
+    cached = solver_cache.get(cache_key)
+    if cached is not None:
+        return _process_solver_result(items, cached)
+
+    solver_result = await solver_service.solve(
+        user_id = user_id,
+        kwargs = {
+            "items": items.copy(),
+            "maximize": maximize,
+            "disabled_recipes": disabled_recipes,
+            "disabled_items": disabled_items,
+            "minimum_items": minimum_items,
+            "equal_items": equal_items
+        },
+        timeout_time = timeout_time
+    )
+
+    if solver_cache.put(cache_key, solver_result):
+        await solver_cache.save_async()
+    
+    return _process_solver_result(items, solver_result)
+
 async def solver_embed(
         ctx: commands.Context | u_custom.CustomContext,
         inventory: dict[u_values.Item, int],
@@ -284,13 +466,14 @@ async def solver_embed(
     except:
         pass
     
-    full_result = solver_wrapper(
+    full_result = await solver_wrapper_async(
         items = inventory,
         maximize = goal_item,
         disabled_recipes = disabled_recipes,
         disabled_items = disabled_items,
         minimum_items = minimum_items,
-        equal_items = equal_items
+        equal_items = equal_items,
+        user_id = ctx.author.id
     )
 
     if not full_result:
@@ -326,6 +509,534 @@ async def solver_embed(
         footer_text = "On mobile you can tap and hold on the commands section to copy it."
     )
 
+######################################################################################################################################################
+##### Solver cache ###################################################################################################################################
+######################################################################################################################################################
+
+def _canonical(value: typing.Any) -> typing.Any:
+    """Converts solver inputs into something json can encode the same way every time. Items become their internal names and dicts are sorted."""
+    if hasattr(value, "internal_name"):
+        return value.internal_name
+    
+    if isinstance(value, dict):
+        return sorted([_canonical(key), _canonical(item)] for key, item in value.items())
+    
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    
+    return value
+
+_recipe_version = (None, None) # type: tuple[tuple[int, int] | None, str | None]
+
+def recipe_table_version() -> str:
+    """Returns a hash of `u_values.alchemy_recipes` and `u_values.misc_conversions`, which changes whenever a recipe does."""
+    global _recipe_version
+
+    # The recipe tables are only replaced when utility.values is reloaded, so the hash only has to be remade when they're different objects.
+    identity = (id(u_values.alchemy_recipes), id(u_values.misc_conversions))
+
+    if _recipe_version[0] != identity:
+        encoded = json.dumps([_canonical(u_values.alchemy_recipes), _canonical(u_values.misc_conversions)])
+        _recipe_version = (identity, hashlib.sha256(encoded.encode()).hexdigest())
+    
+    return _recipe_version[1]
+
+def solver_cache_key(
+        items: dict[u_values.Item, int],
+        maximize: u_values.Item,
+        disabled_recipes: list[str],
+        disabled_items: list[u_values.Item],
+        minimum_items: dict[u_values.Item, int],
+        equal_items: dict[u_values.Item, int]
+    ) -> str:
+    """Returns a hash of the solver inputs and the recipe table version. Inputs that only differ in ordering or duplicates have the same key.
+
+    Args:
+        items (dict[u_values.Item, int]): The items the solver can use.
+        maximize (u_values.Item): The item to maximize.
+        disabled_recipes (list[str]): The disabled recipes.
+        disabled_items (list[u_values.Item]): The disabled items.
+        minimum_items (dict[u_values.Item, int]): The minimum amounts of items.
+        equal_items (dict[u_values.Item, int]): The exact amounts of items.
+
+    Returns:
+        str: The key.
+    """
+    # The solver ignores how much of the maximized item there is.
+    items = items.copy()
+    items[maximize] = 0
+
+    key_data = [
+        recipe_table_version(),
+        _canonical(items),
+        _canonical(maximize),
+        sorted(set(disabled_recipes)),
+        sorted(set(_canonical(disabled_items))),
+        _canonical(minimum_items),
+        _canonical(equal_items)
+    ]
+
+    return hashlib.sha256(json.dumps(key_data).encode()).hexdigest()
+
+class SolverCache():
+    def __init__(
+            self: typing.Self,
+            max_size: int = 512,
+            path: str = None
+        ) -> None:
+        """Least recently used cache of `universal_solver` results.
+
+        Only finished solves are stored, so timeouts and errors will always be run again.
+
+        Args:
+            max_size (int, optional): The maximum number of results to keep. Defaults to 512.
+            path (str, optional): A json file to keep the cache in between restarts. If this is None the cache is only kept in memory. Defaults to None.
+        """
+        self.max_size = max_size
+        self.path = path
+
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = None # type: collections.OrderedDict[str, dict[str, int]]
+    
+    def __len__(self: typing.Self) -> int:
+        return len(self._get_entries())
+    
+    def get(
+            self: typing.Self,
+            key: str
+        ) -> dict[str, int] | None:
+        """Returns the cached result for a key from `solver_cache_key`, or None if there isn't one."""
+        entries = self._get_entries()
+
+        if key not in entries:
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        entries.move_to_end(key)
+
+        return entries[key].copy()
+    
+    def put(
+            self: typing.Self,
+            key: str,
+            result: dict[str, int] | None
+        ) -> bool:
+        """Caches a result from `universal_solver`.
+
+        Args:
+            key (str): The key from `solver_cache_key`.
+            result (dict[str, int] | None): The result. Anything that isn't a finished solve is ignored.
+
+        Returns:
+            bool: Whether the result was cached.
+        """
+        if result is None or result.get("state") not in ("valid", "unsat"):
+            return False
+        
+        entries = self._get_entries()
+
+        entries[key] = result.copy()
+        entries.move_to_end(key)
+
+        while len(entries) > self.max_size:
+            entries.popitem(last=False)
+        
+        return True
+    
+    def clear(self: typing.Self) -> None:
+        """Removes everything from the cache."""
+        self._entries = collections.OrderedDict()
+    
+    def save(self: typing.Self) -> None:
+        """Saves the cache to its file, if it has one."""
+        if self.path is None:
+            return
+        
+        self._write(list(self._get_entries().items()))
+    
+    async def save_async(self: typing.Self) -> None:
+        """Saves the cache to its file in another thread, if it has one."""
+        if self.path is None:
+            return
+        
+        # The entries are copied here so the cache can keep being used while it's written.
+        await asyncio.to_thread(self._write, list(self._get_entries().items()))
+    
+    def _get_entries(self: typing.Self) -> collections.OrderedDict[str, dict[str, int]]:
+        """Returns the entries, loading them from the file the first time."""
+        if self._entries is not None:
+            return self._entries
+        
+        self._entries = collections.OrderedDict()
+
+        if self.path is None:
+            return self._entries
+
+        try:
+            with open(self.path, "r", encoding="utf8") as file_load:
+                for key, result in json.load(file_load):
+                    self._entries[key] = result
+        except FileNotFoundError:
+            pass
+        except:
+            print(traceback.format_exc())
+            self._entries.clear()
+        
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        
+        return self._entries
+    
+    def _write(
+            self: typing.Self,
+            entries: list[tuple[str, dict[str, int]]]
+        ) -> None:
+        try:
+            directory = os.path.dirname(self.path) or "."
+            file_descriptor, temp_path = tempfile.mkstemp(dir=directory, prefix="solver_cache", suffix=".tmp")
+
+            with os.fdopen(file_descriptor, "w", encoding="utf8") as file_write:
+                json.dump(entries, file_write, separators=(",", ":"))
+
+            os.replace(temp_path, self.path)
+        except:
+            print(traceback.format_exc())
+
+solver_cache = SolverCache(path="solver_cache.json")
+
+######################################################################################################################################################
+##### Solver service #################################################################################################################################
+######################################################################################################################################################
+
+def _solver_worker(
+        connection: multiprocessing.connection.Connection,
+        task: typing.Callable,
+        warm_up: typing.Callable | None
+    ) -> None:
+    """The loop run by each worker process. Receives the keyword arguments for `task` and sends back the result, until it's sent None."""
+    # Get everything set up before the first real request comes in.
+    if warm_up is not None:
+        warm_up()
+
+    while True:
+        try:
+            kwargs = connection.recv()
+        except (EOFError, OSError):
+            return
+        
+        if kwargs is None:
+            return
+        
+        result = task(**kwargs)
+
+        try:
+            connection.send(result)
+        except Exception as error:
+            # Most likely the exception in an error result can't be pickled.
+            connection.send({"state": "error", "exception": RuntimeError(repr(error))})
+
+def _percentile(
+        sorted_values: list[float],
+        fraction: float
+    ) -> float | None:
+    """Returns the value at a fraction of the way through a sorted list, or None if it's empty."""
+    if not sorted_values:
+        return None
+    
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+class _SolverWorker():
+    def __init__(
+            self: typing.Self,
+            task: typing.Callable,
+            warm_up: typing.Callable | None
+        ) -> None:
+        """A worker process and the connection used to talk to it."""
+        self.task = task
+        self.warm_up = warm_up
+
+        self.process = None # type: multiprocessing.Process
+        self.connection = None # type: multiprocessing.connection.Connection
+
+        self.start()
+    
+    def start(self: typing.Self) -> None:
+        """Starts the worker process."""
+        self.connection, child_connection = multiprocessing.Pipe()
+
+        self.process = multiprocessing.Process(
+            target = _solver_worker,
+            args = (child_connection, self.task, self.warm_up),
+            daemon = True
+        )
+        self.process.start()
+
+        child_connection.close()
+    
+    def stop(self: typing.Self) -> None:
+        """Stops the worker process, even if it's in the middle of a solve."""
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+    
+    def restart(self: typing.Self) -> None:
+        """Replaces the worker process with a new one."""
+        self.stop()
+        self.start()
+    
+    def receive(
+            self: typing.Self,
+            timeout_time: int | float
+        ) -> dict[str, int] | None:
+        """Waits for the result of the current solve. This blocks, so it should be run in a thread.
+
+        Args:
+            timeout_time (int | float): The amount of time to wait for the result.
+
+        Raises:
+            EOFError: If the worker process was stopped before it sent the result.
+
+        Returns:
+            dict[str, int] | None: The result from `universal_solver`, or None if the timeout was reached.
+        """
+        if not self.connection.poll(timeout_time):
+            return None
+        
+        return self.connection.recv()
+
+class _SolverJob():
+    def __init__(
+            self: typing.Self,
+            kwargs: dict,
+            timeout_time: int | float,
+            future: asyncio.Future
+        ) -> None:
+        """A solve waiting in the solver service's queue."""
+        self.kwargs = kwargs
+        self.timeout_time = timeout_time
+        self.future = future
+
+class SolverService():
+    def __init__(
+            self: typing.Self,
+            workers: int = 2,
+            task: typing.Callable = universal_solver,
+            warm_up: typing.Callable | None = get_solver_template
+        ) -> None:
+        """Runs `universal_solver`, or another task, in a pool of worker processes that are started once and reused, so solves can be awaited without blocking the bot.
+
+        Queued solves are handed out one user at a time in turn, so one person queueing a lot of solves doesn't hold up everyone else.
+        The worker processes are started the first time something is solved.
+
+        Args:
+            workers (int, optional): The number of worker processes, which is the number of solves that can run at once. Defaults to 2.
+            task (typing.Callable, optional): The function the workers run. It's called with the keyword arguments given to `solve`, and has to be picklable. Defaults to universal_solver.
+            warm_up (typing.Callable | None, optional): A function each worker runs when it starts, before taking any solves. Defaults to get_solver_template.
+        """
+        self.worker_count = workers
+        self.task = task
+        self.warm_up = warm_up
+
+        self._idle = [] # type: list[_SolverWorker]
+        self._busy = set() # type: set[_SolverWorker]
+        self._tasks = set() # type: set[asyncio.Task]
+
+        # The queued jobs for each user, and the order the users get a worker in.
+        self._queues = {} # type: dict[int | None, collections.deque[_SolverJob]]
+        self._turns = collections.deque() # type: collections.deque[int | None]
+
+        self._started = False
+        self._closing = False
+
+        # How long the most recent solves took, in seconds.
+        self._solve_times = collections.deque(maxlen=1000)
+
+        self.counters = {
+            "solves": 0,
+            "timeouts": 0,
+            "cancelled": 0,
+            "restarts": 0
+        }
+    
+    def start(self: typing.Self) -> None:
+        """Starts the worker processes. This is done automatically by `solve`."""
+        if self._started:
+            return
+        
+        self._started = True
+
+        for _ in range(self.worker_count):
+            self._idle.append(_SolverWorker(self.task, self.warm_up))
+    
+    def shutdown(self: typing.Self) -> None:
+        """Stops accepting new solves. Anything already queued will still be run, and each worker is stopped once there's nothing left for it to do."""
+        self._closing = True
+        self._dispatch()
+    
+    async def join(self: typing.Self) -> None:
+        """Waits until everything that was queued has finished running. If `shutdown` has been called, every worker process will have been stopped once this returns."""
+        while self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+    
+    def metrics(self: typing.Self) -> dict[str, int | float | None]:
+        """Returns the current queue depth along with counters and timings for the solves that have been run.
+
+        Returns:
+            dict[str, int | float | None]: The metrics. The times are in seconds, and are None if nothing has been solved yet.
+        """
+        solve_times = self._solve_times
+        sorted_times = sorted(solve_times)
+
+        return {
+            "queued": sum(len(queue) for queue in self._queues.values()),
+            "queued_users": len(self._queues),
+            "running": len(self._busy),
+            "workers": len(self._idle) + len(self._busy),
+            **self.counters,
+            "last_time": solve_times[-1] if solve_times else None,
+            "average_time": sum(solve_times) / len(solve_times) if solve_times else None,
+            "p50_time": _percentile(sorted_times, 0.5),
+            "p99_time": _percentile(sorted_times, 0.99),
+            "max_time": sorted_times[-1] if sorted_times else None
+        }
+    
+    async def solve(
+            self: typing.Self,
+            kwargs: dict,
+            user_id: int = None,
+            timeout_time: int | float = 30.0
+        ) -> dict[str, int] | None:
+        """Queues a solve and waits for the result. Cancelling the task awaiting this will remove the solve from the queue, or stop it if it's already running.
+
+        Args:
+            kwargs (dict): The keyword arguments to pass to `universal_solver`, not including `output`.
+            user_id (int, optional): The id of the user the solve is for. Defaults to None.
+            timeout_time (int | float, optional): The amount of time to let the solver run for, not including time spent in the queue. Defaults to 30.0.
+
+        Raises:
+            RuntimeError: If the service has been shut down.
+
+        Returns:
+            dict[str, int] | None: The result from `universal_solver`, or None if the timeout was reached.
+        """
+        if self._closing:
+            raise RuntimeError("The solver service has been shut down.")
+        
+        self.start()
+
+        job = _SolverJob(
+            kwargs = kwargs,
+            timeout_time = timeout_time,
+            future = asyncio.get_running_loop().create_future()
+        )
+
+        if user_id not in self._queues:
+            self._queues[user_id] = collections.deque()
+            self._turns.append(user_id)
+
+        self._queues[user_id].append(job)
+
+        self._dispatch()
+
+        return await job.future
+
+    def _dispatch(self: typing.Self) -> None:
+        """Hands queued jobs to idle workers, going through the users in turn."""
+        while self._idle and self._turns:
+            user_id = self._turns.popleft()
+            queue = self._queues[user_id]
+
+            job = queue.popleft()
+
+            # If the user has more queued, they go to the back of the line.
+            if queue:
+                self._turns.append(user_id)
+            else:
+                self._queues.pop(user_id)
+            
+            if job.future.done():
+                self.counters["cancelled"] += 1
+                continue
+
+            worker = self._idle.pop()
+            self._busy.add(worker)
+
+            task = asyncio.create_task(self._run(worker, job))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        
+        if self._closing and not self._turns:
+            for worker in self._idle:
+                worker.stop()
+            
+            self._idle.clear()
+    
+    async def _run(
+            self: typing.Self,
+            worker: _SolverWorker,
+            job: _SolverJob
+        ) -> None:
+        """Runs a job on a worker and sets the result of the job's future."""
+        def on_cancel(future: asyncio.Future) -> None:
+            # Stopping the process makes `worker.receive` raise EOFError, so the worker gets replaced below.
+            if future.cancelled():
+                worker.process.kill()
+
+        job.future.add_done_callback(on_cancel)
+
+        restart = False
+        start_time = time.perf_counter()
+
+        try:
+            worker.connection.send(job.kwargs)
+
+            result = await asyncio.to_thread(worker.receive, job.timeout_time)
+
+            if result is None:
+                # The timeout was reached, so the process has to be stopped to stop the solve.
+                restart = True
+                self.counters["timeouts"] += 1
+            else:
+                self.counters["solves"] += 1
+                self._solve_times.append(time.perf_counter() - start_time)
+
+            if not job.future.done():
+                job.future.set_result(result)
+        except (EOFError, OSError):
+            restart = True
+
+            if job.future.cancelled():
+                self.counters["cancelled"] += 1
+            else:
+                print(traceback.format_exc())
+                job.future.set_result({"state": "error", "exception": RuntimeError("The solver process stopped unexpectedly.")})
+        except Exception as error:
+            print(traceback.format_exc())
+
+            if not job.future.done():
+                job.future.set_exception(error)
+        finally:
+            job.future.remove_done_callback(on_cancel)
+
+            if restart:
+                await asyncio.to_thread(worker.restart)
+                self.counters["restarts"] += 1
+
+            self._busy.discard(worker)
+            self._idle.append(worker)
+            self._dispatch()
+
+try:
+    # If this module is being reloaded the old service is still here, so let it finish what it has queued and then stop its workers.
+    solver_service.shutdown()
+except NameError:
+    pass
+
+solver_service = SolverService()
+
 
 
 
@@ -480,7 +1191,7 @@ def _evaluate_problem(
         RuntimeError: The timeout has been triggered.
 
     Returns:
-        decimal.Decimal: The calculated result.
+        decimal.Decimal: The calculated result. If something went wrong this is instead a dict with the exception under `error`.
     """
     try:
         def parse_float(i: str) -> decimal.Decimal:
@@ -624,15 +1335,26 @@ def _evaluate_problem(
         out = parse_float(result)
 
         decimal.getcontext().prec -= 2
-        output.put(+out)
+        result = +out
     except Exception as e:
-        output.put({"error": e})
+        result = {"error": e}
+    
+    if output is not None:
+        output.put(result)
+    
+    return result
 
 def evaluate_wrapper(
         equation: str,
         timeout_time: int | float = 2.5
     ) -> decimal.Decimal:
-    # Run the solver in a thread to implement a forced timeout.
+    # Most equations are small enough to evaluate right here.
+    try:
+        return evaluate_fast(equation)
+    except EvaluationBudgetError:
+        pass
+
+    # Run the solver in another process to implement a forced timeout.
     queue = multiprocessing.Queue()
 
     process = multiprocessing.Process(
@@ -657,6 +1379,443 @@ def evaluate_wrapper(
 
 ##############################################################################################################################################################
 
+# Limits for `evaluate_fast`. Anything over these is sent to a separate process by `evaluate_wrapper` instead.
+FAST_EVALUATION_MAX_LENGTH = 1000
+FAST_EVALUATION_MAX_DEPTH = 40
+FAST_EVALUATION_OPERATION_BUDGET = 500
+FAST_EVALUATION_MAGNITUDE_LIMIT = decimal.Decimal("9e+4096")
+
+# The largest exponent allowed for `**`, and the largest argument allowed for each function.
+FAST_EVALUATION_EXPONENT_LIMIT = 1_000_000
+FAST_EVALUATION_ARGUMENT_LIMITS = {
+    "factorial": 100_000,
+    "nCr": 100_000,
+    "nPr": 100_000,
+    "sin": 1_000_000,
+    "cos": 1_000_000,
+    "tan": 1_000_000,
+    "exp": 100_000,
+}
+
+# Operators from loosest to tightest, following the order of operations used by `_evaluate_problem`.
+BINARY_LEVELS = [("|",), ("^",), ("&",), (">>",), ("<<",), ("+", "-"), ("*", "/", "%", "//"), ("**",)]
+TOKEN_OPERATORS = ["**", "//", "<<", ">>", "*", "/", "%", "+", "-", "&", "|", "^"]
+
+class EvaluationBudgetError(Exception):
+    """Raised by `evaluate_fast` when an equation goes over the limits for being evaluated in-process."""
+    pass
+
+def _tokenize_equation(equation: str) -> list[tuple[str, typing.Any]]:
+    """Splits an equation into tokens in a single pass.
+    Each token is a tuple of its kind and value, where the kind is one of `number`, `name`, `operator`, `(`, `)` or `,`.
+
+    Commas inside a function call separate the arguments, and anywhere else they're treated as part of a number, like `1,000`."""
+    tokens = []
+    open_parentheses = [] # Whether each open parenthesis is for a function call.
+
+    length = len(equation)
+    index = 0
+
+    while index < length:
+        char = equation[index]
+
+        if char == " ":
+            index += 1
+            continue
+
+        if char.isdigit() or char == "." or (char == "," and not any(open_parentheses)):
+            start = index
+            allow_comma = not any(open_parentheses)
+
+            while index < length and (equation[index].isdigit() or equation[index] == "." or (allow_comma and equation[index] == ",")):
+                index += 1
+            
+            # Scientific notation, like 1.5e+10.
+            if index < length and equation[index] == "e":
+                exponent = re.match(r"e[\+\-]?\d+", equation[index:])
+
+                if exponent is not None:
+                    index += len(exponent.group(0))
+
+            text = equation[start:index]
+
+            try:
+                tokens.append(("number", decimal.Decimal(text.replace(",", ""))))
+            except decimal.InvalidOperation:
+                raise u_custom.BingoError(f"Could not parse the number `{text}`.")
+            continue
+
+        if char.isalpha():
+            start = index
+
+            while index < length and equation[index].isalpha():
+                index += 1
+            
+            # π, τ and φ are single characters, so they can be right next to other letters.
+            name = equation[start:index]
+            if name not in OTHER_CONSTANTS and name not in OTHER_OPERATIONS and name[0] in "πτφ":
+                index = start + 1
+                name = name[0]
+
+            if name not in OTHER_CONSTANTS and name not in OTHER_OPERATIONS:
+                raise u_custom.BingoError(f"Unrecognized function or constant `{name}`.")
+            
+            tokens.append(("name", name))
+            continue
+
+        if char == "(":
+            open_parentheses.append(len(tokens) > 0 and tokens[-1][0] == "name" and tokens[-1][1] in OTHER_OPERATIONS)
+            tokens.append(("(", None))
+            index += 1
+            continue
+
+        if char == ")":
+            if not open_parentheses:
+                raise u_custom.BingoError(f"Unmatched closing parenthesis at character {index + 1}.")
+            
+            open_parentheses.pop()
+            tokens.append((")", None))
+            index += 1
+            continue
+
+        if char == ",":
+            tokens.append((",", None))
+            index += 1
+            continue
+
+        for operator_text in TOKEN_OPERATORS:
+            if equation.startswith(operator_text, index):
+                tokens.append(("operator", operator_text))
+                index += len(operator_text)
+                break
+        else:
+            raise u_custom.BingoError(f"Unexpected character `{char}` at character {index + 1}.")
+    
+    if open_parentheses:
+        raise u_custom.BingoError("Unmatched opening parenthesis.")
+
+    return tokens
+
+class _EquationParser():
+    def __init__(
+            self: typing.Self,
+            tokens: list[tuple[str, typing.Any]]
+        ) -> None:
+        """Recursive descent parser that turns the tokens from `_tokenize_equation` into a tree.
+
+        Nodes are tuples:
+        - `("number", value)`
+        - `("negate", node)`
+        - `("binary", operator, left, right)`
+        - `("call", function, [arguments])`
+        """
+        self.tokens = tokens
+        self.position = 0
+        self.depth = 0
+    
+    def parse(self: typing.Self) -> tuple:
+        """Parses the whole equation and returns the root node."""
+        if not self.tokens:
+            raise u_custom.BingoError("The equation is empty.")
+
+        node = self._binary(0)
+
+        if self.position != len(self.tokens):
+            raise u_custom.BingoError(f"Unexpected `{self._describe(self.tokens[self.position])}`.")
+        
+        return node
+    
+    def _peek(self: typing.Self) -> tuple[str, typing.Any] | None:
+        if self.position >= len(self.tokens):
+            return None
+        
+        return self.tokens[self.position]
+    
+    def _take(self: typing.Self) -> tuple[str, typing.Any]:
+        token = self._peek()
+
+        if token is None:
+            raise u_custom.BingoError("Unexpected end of equation.")
+        
+        self.position += 1
+        return token
+    
+    def _expect(
+            self: typing.Self,
+            kind: str
+        ) -> None:
+        token = self._take()
+
+        if token[0] != kind:
+            raise u_custom.BingoError(f"Expected `{kind}` but found `{self._describe(token)}`.")
+    
+    def _describe(
+            self: typing.Self,
+            token: tuple[str, typing.Any]
+        ) -> str:
+        if token[1] is None:
+            return token[0]
+        
+        return str(token[1])
+
+    def _binary(
+            self: typing.Self,
+            level: int
+        ) -> tuple:
+        if level == len(BINARY_LEVELS):
+            return self._unary()
+        
+        operators = BINARY_LEVELS[level]
+        left = self._binary(level + 1)
+
+        # Everything is left associative, including `**`.
+        while True:
+            token = self._peek()
+
+            if token is None or token[0] != "operator" or token[1] not in operators:
+                return left
+            
+            self.position += 1
+            left = ("binary", token[1], left, self._binary(level + 1))
+    
+    def _unary(self: typing.Self) -> tuple:
+        # Negatives apply to what's directly after them, so `-2 ** 2` is 4, like it is for `_evaluate_problem`.
+        # They're counted rather than parsed recursively, so a long run of them can't hit the recursion limit.
+        negatives = 0
+
+        while self._peek() == ("operator", "-"):
+            self.position += 1
+            negatives += 1
+        
+        operand = self._primary()
+
+        if negatives % 2 == 0:
+            return operand
+        
+        if operand[0] == "number":
+            return ("number", operand[1].copy_negate())
+        
+        return ("negate", operand)
+    
+    def _primary(self: typing.Self) -> tuple:
+        token = self._take()
+
+        if token[0] == "number":
+            return token
+        
+        if token[0] == "name":
+            if token[1] in OTHER_CONSTANTS and self._peek() != ("(", None):
+                return ("number", OTHER_CONSTANTS[token[1]])
+            
+            self._expect("(")
+            self._enter()
+
+            arguments = [self._binary(0)]
+            while self._peek() == (",", None):
+                self.position += 1
+                arguments.append(self._binary(0))
+            
+            self._expect(")")
+            self.depth -= 1
+
+            return ("call", token[1], arguments)
+        
+        if token[0] == "(":
+            self._enter()
+            node = self._binary(0)
+            self._expect(")")
+            self.depth -= 1
+
+            return node
+        
+        raise u_custom.BingoError(f"Unexpected `{self._describe(token)}`.")
+    
+    def _enter(self: typing.Self) -> None:
+        self.depth += 1
+
+        if self.depth > FAST_EVALUATION_MAX_DEPTH:
+            raise EvaluationBudgetError("The equation is nested too deeply.")
+
+@functools.lru_cache(maxsize=256)
+def compile_equation(equation: str) -> tuple:
+    """Tokenizes and parses an equation into a tree that can be given to `evaluate_fast`. The trees for recent equations are cached.
+
+    Args:
+        equation (str): The equation to compile.
+
+    Raises:
+        u_custom.BingoError: If the equation is not valid.
+        EvaluationBudgetError: If the equation is too long or nested too deeply.
+
+    Returns:
+        tuple: The root node of the tree.
+    """
+    if len(equation) > FAST_EVALUATION_MAX_LENGTH:
+        raise EvaluationBudgetError("The equation is too long.")
+    
+    return _EquationParser(_tokenize_equation(equation)).parse()
+
+def _check_result(value: decimal.Decimal) -> decimal.Decimal:
+    """Applies the same checks as `_evaluate_problem` does after every operation, along with the magnitude limit."""
+    if value.is_nan():
+        raise u_custom.BingoError("Encountered NaN. >:(")
+    if value.is_infinite():
+        raise u_custom.BingoError("Encountered infinity. >:(")
+    
+    # Huge numbers make everything after them slow, so they're left to the separate process.
+    if abs(value) > FAST_EVALUATION_MAGNITUDE_LIMIT:
+        raise EvaluationBudgetError("The result is too large.")
+    
+    return value
+
+def _evaluate_node(
+        node: tuple,
+        budget: list[int]
+    ) -> decimal.Decimal:
+    """Evaluates a node from `compile_equation`. `budget` is a one item list with the number of operations left, which is shared by the whole tree."""
+    kind = node[0]
+
+    if kind == "number":
+        return node[1]
+    
+    budget[0] -= 1
+    if budget[0] < 0:
+        raise EvaluationBudgetError("The equation has too many operations.")
+
+    if kind == "negate":
+        return _evaluate_node(node[1], budget).copy_negate()
+    
+    if kind == "binary":
+        operation = node[1]
+        left = _evaluate_node(node[2], budget)
+        right = _evaluate_node(node[3], budget)
+
+        if operation == "**" and abs(right) > FAST_EVALUATION_EXPONENT_LIMIT and abs(left) not in (0, 1):
+            raise EvaluationBudgetError("The exponent is too large.")
+
+        return _check_result(OPERATIONS[operation](left, right))
+    
+    # Function calls.
+    function = node[1]
+    arguments = [_evaluate_node(argument, budget) for argument in node[2]]
+
+    limit = FAST_EVALUATION_ARGUMENT_LIMITS.get(function)
+    if limit is not None and any(abs(argument) > limit for argument in arguments):
+        raise EvaluationBudgetError(f"The argument for `{function}` is too large.")
+    
+    try:
+        return _check_result(OTHER_OPERATIONS[function](*arguments))
+    except ValueError:
+        raise u_custom.BingoError(f"Invalid domain for function `{function}`.")
+    except TypeError:
+        raise u_custom.BingoError(f"Incorrect argument amount for function `{function}`")
+
+def evaluate_fast(equation: str) -> decimal.Decimal:
+    """Evaluates an equation in this process, without the overhead of starting a new one.
+    This follows the same order of operations as `_evaluate_problem`, but it's a proper parser, so it also accepts some equations `_evaluate_problem` can't parse, like `-pi`.
+
+    Instead of a timeout, there are limits on the size of the equation, the number of operations and the size of exponents and function arguments.
+
+    Args:
+        equation (str): The equation to solve.
+
+    Raises:
+        u_custom.BingoError: If the equation is not valid.
+        EvaluationBudgetError: If the equation is over the limits, in which case it should be evaluated with `_evaluate_problem` in another process.
+
+    Returns:
+        decimal.Decimal: The calculated result.
+    """
+    tree = compile_equation(equation)
+
+    with decimal.localcontext() as context:
+        context.prec = SOLVER_PRECISION + 2
+        context.capitals = 0
+
+        result = _evaluate_node(tree, [FAST_EVALUATION_OPERATION_BUDGET])
+
+        context.prec = SOLVER_PRECISION
+        return +result
+
+def _warm_up_evaluator() -> None:
+    """Run by each evaluation worker when it starts, so mpmath is ready before the first real equation."""
+    _evaluate_problem("sin(pi) + factorial(5) + sqrt(2)")
+
+# Timings for `evaluate_async`, from both in-process and worker evaluations.
+evaluation_times = collections.deque(maxlen=1000) # type: collections.deque[float]
+evaluation_counters = {
+    "in_process": 0,
+    "isolated": 0
+}
+
+async def evaluate_async(
+        equation: str,
+        timeout_time: int | float = 2.5,
+        user_id: int = None
+    ) -> decimal.Decimal:
+    """Evaluates an equation without blocking the bot. Small equations are evaluated right away with `evaluate_fast`, and anything over its limits is sent to the evaluation worker pool.
+
+    Args:
+        equation (str): The equation to solve.
+        timeout_time (int | float, optional): How long a worker gets to evaluate the equation before it's stopped. Defaults to 2.5.
+        user_id (int, optional): The id of the user the equation is for, which is used to share the workers fairly. Defaults to None.
+
+    Raises:
+        u_custom.BingoError: If the equation is not valid, or the timeout was reached.
+
+    Returns:
+        decimal.Decimal: The calculated result.
+    """
+    start_time = time.perf_counter()
+    isolated = False
+
+    try:
+        try:
+            return evaluate_fast(equation)
+        except EvaluationBudgetError:
+            isolated = True
+
+        result = await evaluation_service.solve(
+            kwargs = {"equation": equation},
+            user_id = user_id,
+            timeout_time = timeout_time
+        )
+
+        if result is None:
+            raise u_custom.BingoError(f"Timeout of {timeout_time} reached.")
+        
+        if isinstance(result, dict):
+            raise result.get("error", result.get("exception"))
+        
+        return result
+    finally:
+        evaluation_counters["isolated" if isolated else "in_process"] += 1
+        evaluation_times.append(time.perf_counter() - start_time)
+
+def evaluation_metrics() -> dict[str, int | float | None]:
+    """Returns how many equations `evaluate_async` has evaluated in-process and in workers, and the p50 and p99 latency in seconds over all of them."""
+    sorted_times = sorted(evaluation_times)
+
+    return {
+        **evaluation_counters,
+        "p50_time": _percentile(sorted_times, 0.5),
+        "p99_time": _percentile(sorted_times, 0.99)
+    }
+
+try:
+    # If this module is being reloaded the old service is still here, so let it finish what it has queued and then stop its workers.
+    evaluation_service.shutdown()
+except NameError:
+    pass
+
+evaluation_service = SolverService(
+    workers = 2,
+    task = _evaluate_problem,
+    warm_up = _warm_up_evaluator
+)
+
+##############################################################################################################################################################
+
 def is_math_equation(input_string: str) -> bool:
     """Attempts to determine whether the given input string is a math equation. There are certain situations where this may be incorrect, you can use `evaluate_problem()` to get a more accurate answer, but that requires more computation.
 
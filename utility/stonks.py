@@ -3,11 +3,29 @@
 import typing
 import discord
 import re
+import os
+import tempfile
+import traceback
+import bisect
+import asyncio
+import secrets
+
+# pip install numpy
+import numpy as np
 
 import utility.files as u_files
 import utility.values as u_values
 import utility.text as u_text
 
+# Where the columnar copy of the stonk history is kept between restarts.
+HISTORY_COLUMNS_PATH = "stonk_history.npz"
+
+# The value used in the columns for ticks where a stonk did not exist yet.
+MISSING = -1
+
+# How many of the ticks a stonk had its highest or lowest value on are kept. The rest are only counted.
+RECORD_TICK_LIMIT = 20
+
 def stonk_history(database: u_files.DatabaseInterface) -> list[dict[str, int]]:
     """Returns the entire stonk history."""
     get = database.load("stonks", "stonk_history", default=None)
@@ -21,9 +39,910 @@ def stonk_history(database: u_files.DatabaseInterface) -> list[dict[str, int]]:
         ]
 
         database.save("stonks", "stonk_history", data=get)
+        history_changed(database)
     
     return get
 
+class StonkHistory():
+    def __init__(
+            self: typing.Self,
+            names: list[str],
+            values: np.ndarray = None,
+            version: str = None
+        ) -> None:
+        """Columnar copy of the stonk history, with one int64 array per stonk where the index is the tick number.
+        Ticks where a stonk did not exist are set to `MISSING`.
+
+        The arrays are over-allocated so `append` can add ticks in place.
+
+        Args:
+            names (list[str]): The internal names of the stonks, in the order of the rows in `values`.
+            values (np.ndarray, optional): The values, with a row per stonk and a column per tick. Defaults to None, for an empty history.
+            version (str, optional): The history version from the database these columns were built from, see `history_changed`. Defaults to None.
+        """
+        self.names = list(names)
+        self.version = version
+        self.rows = {name: index for index, name in enumerate(self.names)}
+
+        if values is None:
+            values = np.full((len(self.names), 0), MISSING, dtype=np.int64)
+
+        self.length = values.shape[1]
+        self._values = np.full((len(self.names), max(self.length * 2, 1024)), MISSING, dtype=np.int64)
+        self._values[:, :self.length] = values
+    
+    @classmethod
+    def from_ticks(
+            cls: type[typing.Self],
+            ticks: typing.Sequence[typing.Mapping[str, int]]
+        ) -> typing.Self:
+        """Builds the columns from the list of tick dicts stored in the database."""
+        names = [stonk.internal_name for stonk in u_values.stonks]
+
+        for tick in ticks:
+            for name in tick:
+                if name not in names:
+                    names.append(name)
+        
+        rows = {name: index for index, name in enumerate(names)}
+        values = np.full((len(names), len(ticks)), MISSING, dtype=np.int64)
+
+        for tick_number, tick in enumerate(ticks):
+            for name, value in tick.items():
+                values[rows[name], tick_number] = value
+        
+        return cls(names, values)
+    
+    @classmethod
+    def load(
+            cls: type[typing.Self],
+            path: str = HISTORY_COLUMNS_PATH
+        ) -> typing.Self | None:
+        """Loads the columns saved by `save`, or returns None if they couldn't be loaded."""
+        try:
+            with np.load(path) as loaded:
+                # Files saved before the history had a version won't match the database, so they get rebuilt.
+                version = str(loaded["version"]) if "version" in loaded.files else ""
+                
+                return cls(loaded["names"].tolist(), loaded["values"], version or None)
+        except FileNotFoundError:
+            return None
+        except:
+            print(traceback.format_exc())
+            return None
+    
+    def save(
+            self: typing.Self,
+            path: str = HISTORY_COLUMNS_PATH
+        ) -> None:
+        """Saves the columns to an .npz file, via a temporary file so a failed save doesn't leave it half-written.
+        This writes the entire history, so `save_async` should be used from async code."""
+        _write_columns(path, *self._save_arrays())
+    
+    async def save_async(
+            self: typing.Self,
+            path: str = HISTORY_COLUMNS_PATH
+        ) -> None:
+        """Saves the columns to an .npz file in another thread, so the event loop isn't blocked while the history is written."""
+        async with _save_lock:
+            await asyncio.to_thread(_write_columns, path, *self._save_arrays())
+    
+    def _save_arrays(self: typing.Self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Returns the names, values and version to save.
+        `append` only writes past the end of the history or replaces the array, so the values can be written in another thread while ticks are added."""
+        return np.array(self.names), self._values[:, :self.length], np.array("" if self.version is None else self.version)
+    
+    def __len__(self: typing.Self) -> int:
+        return self.length
+    
+    def append(
+            self: typing.Self,
+            tick: typing.Mapping[str, int]
+        ) -> None:
+        """Adds a tick to the end of the history, in place.
+
+        Args:
+            tick (typing.Mapping[str, int]): The stonk values on the tick.
+        """
+        for name in tick:
+            if name not in self.rows:
+                self.rows[name] = len(self.names)
+                self.names.append(name)
+                self._values = np.vstack([self._values, np.full((1, self._values.shape[1]), MISSING, dtype=np.int64)])
+        
+        if self.length == self._values.shape[1]:
+            grown = np.full((len(self.names), self._values.shape[1] * 2), MISSING, dtype=np.int64)
+            grown[:, :self.length] = self._values
+            self._values = grown
+        
+        for name, value in tick.items():
+            self._values[self.rows[name], self.length] = value
+        
+        self.length += 1
+    
+    def column(
+            self: typing.Self,
+            name: str
+        ) -> np.ndarray:
+        """Returns a read-only view of the values of a stonk on every tick.
+
+        Args:
+            name (str): The internal name of the stonk.
+
+        Returns:
+            np.ndarray: The values, with `MISSING` for ticks where the stonk did not exist.
+        """
+        if name not in self.rows:
+            return np.full(self.length, MISSING, dtype=np.int64)
+        
+        view = self._values[self.rows[name], :self.length]
+        view.flags.writeable = False
+        return view
+    
+    def tick(
+            self: typing.Self,
+            tick_number: int
+        ) -> dict[str, int]:
+        """Returns the values on a tick in the same format as the database. Negative numbers count back from the end.
+
+        Raises:
+            IndexError: If the tick doesn't exist.
+        """
+        if not(-self.length <= tick_number < self.length):
+            raise IndexError(f"There is no stonk tick {tick_number}.")
+        
+        column = self._values[:, tick_number % self.length].tolist()
+
+        return {
+            name: value
+            for name, value in zip(self.names, column)
+            if value != MISSING
+        }
+    
+    def records(
+            self: typing.Self,
+            name: str,
+            base_value: int
+        ) -> dict[str, int | list[int]]:
+        """Returns the highest and lowest values a stonk has had, the first `RECORD_TICK_LIMIT` ticks it had them on, and how many ticks it had them on.
+
+        A tick that equals the base value before the stonk has ever gone above it counts towards the highest value rather than the lowest.
+
+        Args:
+            name (str): The internal name of the stonk.
+            base_value (int): The base value of the stonk, which the records start at.
+
+        Returns:
+            dict[str, int | list[int]]: The records, with `highest`, `lowest`, `highest_tick`, `lowest_tick`, `highest_count` and `lowest_count`.
+        """
+        column = self.column(name)
+        present = column != MISSING
+
+        tick_numbers = np.flatnonzero(present)
+        values = column[present]
+
+        if len(values) == 0:
+            return {"highest": base_value, "lowest": base_value, "highest_tick": [], "lowest_tick": [], "highest_count": 0, "lowest_count": 0}
+        
+        highest = max(base_value, int(values.max()))
+        lowest = min(base_value, int(values.min()))
+
+        # The highest value before each tick.
+        previous_highest = np.maximum.accumulate(np.concatenate([[base_value], values[:-1]]))
+
+        highest_ticks = tick_numbers[values == highest]
+        lowest_ticks = tick_numbers[(values == lowest) & (values < previous_highest)]
+
+        return {
+            "highest": highest,
+            "lowest": lowest,
+            "highest_tick": highest_ticks[:RECORD_TICK_LIMIT].tolist(),
+            "lowest_tick": lowest_ticks[:RECORD_TICK_LIMIT].tolist(),
+            "highest_count": len(highest_ticks),
+            "lowest_count": len(lowest_ticks)
+        }
+    
+    def split_ticks(
+            self: typing.Self,
+            name: str,
+            start: int = 0,
+            end: int = None
+        ) -> dict[int, int]:
+        """Finds the ticks a stonk was split on, in the same way as `filter_splits`.
+
+        Args:
+            name (str): The internal name of the stonk.
+            start (int, optional): The first tick to compare against. Defaults to 0.
+            end (int, optional): The last tick to check. Defaults to the most recent tick.
+
+        Returns:
+            dict[int, int]: The tick numbers with a split, and how many times the stonk was split on that tick.
+        """
+        if end is None:
+            end = self.length - 1
+        
+        column = self.column(name)[start:end + 1]
+
+        previous = column[:-1]
+        current = column[1:]
+
+        # Only ticks that dropped by at least 15% can be splits, so only those need to be looked at individually.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            candidates = np.flatnonzero((previous != MISSING) & (current != MISSING) & (current / previous <= 0.85))
+        
+        splits = {}
+
+        for index in candidates.tolist():
+            amount = _split_count(int(previous[index]), int(current[index]))
+
+            if amount:
+                splits[start + index + 1] = amount
+        
+        return splits
+
+def _write_columns(
+        path: str,
+        names: np.ndarray,
+        values: np.ndarray,
+        version: np.ndarray
+    ) -> None:
+    """Writes the arrays from `StonkHistory._save_arrays` to an .npz file, via a temporary file so a failed save doesn't leave it half-written."""
+    try:
+        file_descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix="stonk_history", suffix=".tmp")
+
+        with os.fdopen(file_descriptor, "wb") as file_write:
+            np.savez(file_write, names=names, values=values, version=version)
+        
+        os.replace(temp_path, path)
+    except:
+        print(traceback.format_exc())
+
+def _split_count(
+        previous: int | float,
+        current: int | float
+    ) -> int:
+    """Returns how many times a stonk was split between two values. This is the same check as in `filter_splits`."""
+    amount = 0
+
+    if not (current / previous <= 0.85):
+        return amount
+
+    for i in range(50):
+        previous /= 2
+        amount += 1
+        if not (current / previous <= 0.85):
+            break
+    
+    return amount
+
+class StonkReturns():
+    def __init__(
+            self: typing.Self,
+            history: StonkHistory
+        ) -> None:
+        """Split-adjusted tick-over-tick ratios for every stonk, along with their running sums so rolling means can be found without re-summing.
+
+        The ratio for a tick is the value on that tick divided by the value on the previous tick, after the previous value has been adjusted for any splits in the same way as `filter_splits`.
+        Ticks where the stonk or its previous value is missing have a ratio of NaN.
+
+        Args:
+            history (StonkHistory): The history to build the ratios from. `append` should be called after every tick added to it.
+        """
+        self.history = history
+        self.length = 0
+
+        self._ratios = {} # type: dict[str, np.ndarray]
+        self._sums = {} # type: dict[str, np.ndarray]
+        self._gaps = {} # type: dict[str, np.ndarray]
+
+        for name in history.names:
+            self._ratios[name] = self._build_ratios(history.column(name))
+
+        self.length = len(history)
+        self._resize(max(self.length * 2, 1024))
+    
+    def _build_ratios(
+            self: typing.Self,
+            column: np.ndarray
+        ) -> np.ndarray:
+        """Calculates the ratios for a single column of the history."""
+        ratios = np.full(len(column), np.nan)
+
+        if len(column) < 2:
+            return ratios
+        
+        previous = column[:-1].astype(np.float64)
+        current = column[1:]
+
+        present = (column[:-1] != MISSING) & (current != MISSING)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            changes = np.where(present, current / previous, np.nan)
+        
+        # Only ticks that dropped by at least 15% can be splits, so only those need to be looked at individually.
+        for index in np.flatnonzero(changes <= 0.85).tolist():
+            amount = _split_count(previous[index], int(current[index]))
+            changes[index] = current[index] / (previous[index] / 2 ** amount)
+        
+        ratios[1:] = changes
+        return ratios
+    
+    def _resize(
+            self: typing.Self,
+            capacity: int
+        ) -> None:
+        """Grows the arrays to the given capacity and recalculates the running sums."""
+        self._capacity = capacity
+
+        for name in self.history.names:
+            ratios = self._ratios.get(name, np.full(self.length, np.nan))[:self.length]
+
+            self._ratios[name] = np.full(capacity, np.nan)
+            self._ratios[name][:self.length] = ratios
+
+            self._sums[name] = np.zeros(capacity)
+            self._sums[name][:self.length] = np.cumsum(np.nan_to_num(ratios, nan=0.0))
+
+            self._gaps[name] = np.zeros(capacity, dtype=np.int64)
+            self._gaps[name][:self.length] = np.cumsum(np.isnan(ratios))
+    
+    def __len__(self: typing.Self) -> int:
+        return self.length
+    
+    def append(self: typing.Self) -> None:
+        """Adds the ratios for the most recent tick in the history. This is O(1) per stonk."""
+        if len(self.history) != self.length + 1:
+            raise ValueError("The returns can only be updated one tick at a time.")
+        
+        if self.length == self._capacity or any(name not in self._sums for name in self.history.names):
+            self._resize(max(self.length * 2, 1024))
+        
+        tick_number = self.length
+
+        for name in self.history.names:
+            column = self.history.column(name)
+            previous = int(column[tick_number - 1]) if tick_number > 0 else MISSING
+            current = int(column[tick_number])
+
+            if MISSING in (previous, current):
+                ratio = np.nan
+            else:
+                ratio = current / (previous / 2 ** _split_count(previous, current))
+            
+            self._ratios[name][tick_number] = ratio
+
+            previous_sum = self._sums[name][tick_number - 1] if tick_number > 0 else 0.0
+            previous_gaps = self._gaps[name][tick_number - 1] if tick_number > 0 else 0
+
+            self._sums[name][tick_number] = previous_sum + (0.0 if np.isnan(ratio) else ratio)
+            self._gaps[name][tick_number] = previous_gaps + np.isnan(ratio)
+        
+        self.length += 1
+    
+    def ratios(
+            self: typing.Self,
+            name: str,
+            start: int = 1,
+            end: int = None
+        ) -> np.ndarray:
+        """Returns the split-adjusted ratios for a stonk on each tick from `start` to `end`, inclusive.
+
+        Args:
+            name (str): The internal name of the stonk.
+            start (int, optional): The first tick. Defaults to 1.
+            end (int, optional): The last tick. Defaults to the most recent tick.
+
+        Returns:
+            np.ndarray: The ratios.
+        """
+        if end is None:
+            end = self.length - 1
+        
+        if name not in self._ratios:
+            return np.full(max(end - start + 1, 0), np.nan)
+        
+        return self._ratios[name][start:end + 1].copy()
+    
+    def rolling_mean(
+            self: typing.Self,
+            name: str,
+            window: int,
+            start: int = None,
+            end: int = None
+        ) -> np.ndarray:
+        """Returns the mean of the last `window` ratios for a stonk on each tick from `start` to `end`, inclusive.
+        Means that include a missing ratio are NaN.
+
+        Args:
+            name (str): The internal name of the stonk.
+            window (int): How many ticks to average over.
+            start (int, optional): The first tick. Defaults to `window`, the first tick with a full window.
+            end (int, optional): The last tick. Defaults to the most recent tick.
+
+        Returns:
+            np.ndarray: The means.
+        """
+        if start is None:
+            start = window
+        
+        if end is None:
+            end = self.length - 1
+        
+        start = max(start, window)
+        
+        if name not in self._sums or end < start:
+            return np.full(max(end - start + 1, 0), np.nan)
+        
+        sums = self._sums[name]
+        gaps = self._gaps[name]
+
+        window_sums = sums[start:end + 1] - sums[start - window:end + 1 - window]
+        window_gaps = gaps[start:end + 1] - gaps[start - window:end + 1 - window]
+
+        return np.where(window_gaps == 0, window_sums / window, np.nan)
+
+class StonkStatistics():
+    def __init__(
+            self: typing.Self,
+            data: typing.Mapping = None
+        ) -> None:
+        """Running statistics for every stonk, stored in the database under `stonks.statistics` and updated by `update` on every tick.
+
+        For each stonk this keeps the highest and lowest values along with the first `RECORD_TICK_LIMIT` ticks it had them on and how many ticks it had them on, the ticks it was split on along with the total splits up to that tick, and the sum of its values.
+        The history version they're up to date with is kept in `version`, see `history_changed`.
+
+        Args:
+            data (typing.Mapping, optional): The data from the database. Defaults to None, for statistics that haven't seen any ticks.
+        """
+        if data is None:
+            data = {
+                "ticks": 0,
+                "stonks": {
+                    stonk.internal_name: {
+                        "highest": stonk.base_value,
+                        "lowest": stonk.base_value,
+                        "highest_tick": [],
+                        "lowest_tick": [],
+                        "highest_count": 0,
+                        "lowest_count": 0,
+                        "split_ticks": [],
+                        "split_totals": [],
+                        "value_sum": 0,
+                        "value_count": 0,
+                        "last": None
+                    }
+                    for stonk in u_values.stonks
+                }
+            }
+        
+        self.data = data
+    
+    @classmethod
+    def from_ticks(
+            cls: type[typing.Self],
+            ticks: typing.Iterable[typing.Mapping[str, int]]
+        ) -> typing.Self:
+        """Builds the statistics by running `update` on every tick in the history."""
+        statistics = cls()
+
+        for tick in ticks:
+            statistics.update(tick)
+        
+        return statistics
+    
+    def __len__(self: typing.Self) -> int:
+        return self.data["ticks"]
+    
+    def covers(
+            self: typing.Self,
+            columns: StonkHistory
+        ) -> bool:
+        """Returns whether these statistics are up to date with the history and contain every stonk."""
+        if self.data.get("version") != columns.version or len(self) != len(columns):
+            return False
+        
+        if set(self.data["stonks"]) != {stonk.internal_name for stonk in u_values.stonks}:
+            return False
+        
+        # Statistics from before the record counts were added kept every record tick, so they need to be rebuilt.
+        return all("highest_count" in stats for stats in self.data["stonks"].values())
+    
+    def update(
+            self: typing.Self,
+            tick: typing.Mapping[str, int]
+        ) -> None:
+        """Adds a new tick to the statistics. This is O(1) per stonk.
+
+        Args:
+            tick (typing.Mapping[str, int]): The stonk values on the new tick.
+        """
+        tick_number = self.data["ticks"]
+
+        for name, stats in self.data["stonks"].items():
+            if name not in tick:
+                stats["last"] = None
+                continue
+
+            value = tick[name]
+
+            if value > stats["highest"]:
+                stats["highest"] = value
+                stats["highest_tick"] = [tick_number]
+                stats["highest_count"] = 1
+
+            elif value == stats["highest"]:
+                stats["highest_count"] += 1
+
+                if len(stats["highest_tick"]) < RECORD_TICK_LIMIT:
+                    stats["highest_tick"].append(tick_number)
+
+            elif value < stats["lowest"]:
+                stats["lowest"] = value
+                stats["lowest_tick"] = [tick_number]
+                stats["lowest_count"] = 1
+
+            elif value == stats["lowest"]:
+                stats["lowest_count"] += 1
+
+                if len(stats["lowest_tick"]) < RECORD_TICK_LIMIT:
+                    stats["lowest_tick"].append(tick_number)
+            
+            if stats["last"] is not None:
+                amount = _split_count(stats["last"], value)
+
+                if amount:
+                    stats["split_ticks"].append(tick_number)
+                    stats["split_totals"].append((stats["split_totals"][-1] if stats["split_totals"] else 0) + amount)
+            
+            stats["value_sum"] += value
+            stats["value_count"] += 1
+            stats["last"] = value
+        
+        self.data["ticks"] = tick_number + 1
+    
+    def records(
+            self: typing.Self,
+            name: str
+        ) -> dict[str, int | list[int]]:
+        """Returns the highest and lowest values of a stonk and the ticks it had them on, in the same format as `StonkHistory.records`."""
+        stats = self.data["stonks"][name]
+
+        return {
+            "highest": stats["highest"],
+            "lowest": stats["lowest"],
+            "highest_tick": list(stats["highest_tick"]),
+            "lowest_tick": list(stats["lowest_tick"]),
+            "highest_count": stats["highest_count"],
+            "lowest_count": stats["lowest_count"]
+        }
+    
+    def split_count(
+            self: typing.Self,
+            name: str,
+            start: int,
+            end: int
+        ) -> int:
+        """Returns the number of times a stonk was split after tick `start`, up to and including tick `end`."""
+        stats = self.data["stonks"][name]
+
+        def total_at(tick_number: int) -> int:
+            index = bisect.bisect_right(stats["split_ticks"], tick_number)
+            return stats["split_totals"][index - 1] if index else 0
+        
+        return total_at(end) - total_at(start)
+    
+    def average(
+            self: typing.Self,
+            name: str
+        ) -> float | None:
+        """Returns the average value of a stonk over every tick it has existed for, or None if it hasn't existed yet."""
+        stats = self.data["stonks"][name]
+
+        if stats["value_count"] == 0:
+            return None
+        
+        return stats["value_sum"] / stats["value_count"]
+    
+    def verify(
+            self: typing.Self,
+            columns: StonkHistory
+        ) -> list[str]:
+        """Checks the statistics against a full scan of the history columns.
+
+        Args:
+            columns (StonkHistory): The history to check against.
+
+        Returns:
+            list[str]: A description of every mismatch found, empty if everything matches.
+        """
+        mismatches = []
+
+        if len(self) != len(columns):
+            mismatches.append(f"The statistics cover {len(self)} ticks, but the history has {len(columns)}.")
+        
+        for stonk in u_values.stonks:
+            name = stonk.internal_name
+
+            if name not in self.data["stonks"]:
+                mismatches.append(f"{name} is missing.")
+                continue
+
+            expected = columns.records(name, stonk.base_value)
+            found = self.records(name)
+
+            for key in expected:
+                if expected[key] != found[key]:
+                    mismatches.append(f"{name} {key} is {found[key]} but should be {expected[key]}.")
+            
+            split_ticks = columns.split_ticks(name)
+
+            if list(split_ticks) != list(self.data["stonks"][name]["split_ticks"]) or sum(split_ticks.values()) != self.split_count(name, 0, len(columns) - 1):
+                mismatches.append(f"{name} splits do not match.")
+            
+            values = columns.column(name)
+            values = values[values != MISSING]
+
+            if int(values.sum()) != self.data["stonks"][name]["value_sum"] or len(values) != self.data["stonks"][name]["value_count"]:
+                mismatches.append(f"{name} value sum does not match.")
+        
+        return mismatches
+
+class StonkValueIndex():
+    def __init__(
+            self: typing.Self,
+            history: StonkHistory
+        ) -> None:
+        """Inverted index from each stonk's values to the ticks it had them on, so searches don't need to scan the history.
+
+        For every stonk this keeps a sorted list of the values it has had, and for each value a sorted list of the ticks it had that value.
+
+        Args:
+            history (StonkHistory): The history to build the index from. `append` should be called after every tick added to it.
+        """
+        self.history = history
+        self.length = len(history)
+
+        self._values = {} # type: dict[str, list[int]]
+        self._ticks = {} # type: dict[str, dict[int, list[int]]]
+
+        for name in history.names:
+            column = history.column(name)
+            tick_numbers = np.flatnonzero(column != MISSING)
+            values = column[tick_numbers]
+
+            # A stable sort keeps the ticks for each value in order.
+            order = np.argsort(values, kind="stable")
+            unique, starts = np.unique(values[order], return_index=True)
+
+            self._values[name] = unique.tolist()
+            self._ticks[name] = {
+                value: ticks.tolist()
+                for value, ticks in zip(self._values[name], np.split(tick_numbers[order], starts[1:]))
+            }
+    
+    def __len__(self: typing.Self) -> int:
+        return self.length
+    
+    def append(self: typing.Self) -> None:
+        """Adds the most recent tick in the history to the index."""
+        if len(self.history) != self.length + 1:
+            raise ValueError("The value index can only be updated one tick at a time.")
+        
+        for name, value in self.history.tick(-1).items():
+            values = self._values.setdefault(name, [])
+            ticks = self._ticks.setdefault(name, {})
+
+            if value not in ticks:
+                bisect.insort(values, value)
+                ticks[value] = []
+            
+            ticks[value].append(self.length)
+        
+        self.length += 1
+    
+    def ticks_between(
+            self: typing.Self,
+            name: str,
+            low: int,
+            high: int
+        ) -> np.ndarray:
+        """Returns every tick where a stonk's value was between `low` and `high`, inclusive, in order.
+
+        Args:
+            name (str): The internal name of the stonk.
+            low (int): The lowest value to include.
+            high (int): The highest value to include.
+
+        Returns:
+            np.ndarray: The sorted tick numbers.
+        """
+        values = self._values.get(name, [])
+
+        lists = [
+            self._ticks[name][value]
+            for value in values[bisect.bisect_left(values, low):bisect.bisect_right(values, high)]
+        ]
+
+        if len(lists) == 0:
+            return np.array([], dtype=np.int64)
+        
+        if len(lists) == 1:
+            return np.array(lists[0], dtype=np.int64)
+        
+        return np.sort(np.concatenate(lists))
+    
+    def search(
+            self: typing.Self,
+            conditions: dict[str, tuple[int, int]]
+        ) -> list[int]:
+        """Returns every tick where each stonk was within the given range.
+
+        Args:
+            conditions (dict[str, tuple[int, int]]): The internal name of each stonk and the lowest and highest values it can be, inclusive.
+
+        Returns:
+            list[int]: The matching tick numbers, in order.
+        """
+        matched = None
+
+        # Starting with the fewest ticks keeps every intersection small.
+        for ticks in sorted((self.ticks_between(name, low, high) for name, (low, high) in conditions.items()), key=len):
+            if matched is None:
+                matched = ticks
+            else:
+                matched = np.intersect1d(matched, ticks, assume_unique=True)
+            
+            if len(matched) == 0:
+                break
+        
+        if matched is None:
+            return []
+        
+        return matched.tolist()
+
+_history_columns = None # type: StonkHistory
+_history_returns = None # type: StonkReturns
+_value_index = None # type: StonkValueIndex
+
+# Makes sure two saves of the columns don't write the file at once.
+_save_lock = asyncio.Lock()
+
+def history_changed(database: u_files.DatabaseInterface) -> str:
+    """Gives the stonk history a new version, so the columnar copy gets rebuilt the next time it's used.
+    Anything other than `append_tick` that changes the history in the database should call this.
+
+    Returns:
+        str: The new version.
+    """
+    version = secrets.token_hex(8)
+
+    database.save("stonks", "history_version", data=version)
+
+    return version
+
+def history_columns(database: u_files.DatabaseInterface) -> StonkHistory:
+    """Returns the columnar copy of the stonk history.
+
+    It's loaded from `HISTORY_COLUMNS_PATH` if that matches the database, and otherwise rebuilt from the database and saved.
+    The columns are matched to the database by the history version saved next to the history, which changes whenever the history does, including when a backup is restored."""
+    global _history_columns
+
+    ticks = database.load_view("stonks", "stonk_history", default=None)
+
+    if ticks is None:
+        ticks = stonk_history(database)
+    
+    version = database.load_view("stonks", "history_version", default=None)
+
+    def matches(columns: StonkHistory | None) -> bool:
+        if columns is None or version is None or columns.version != version:
+            return False
+        
+        # The version is checked first, this only catches the history being changed without calling `history_changed`.
+        if len(columns) != len(ticks):
+            return False
+        
+        return len(ticks) == 0 or columns.tick(-1) == dict(ticks[-1])
+
+    if matches(_history_columns):
+        return _history_columns
+    
+    loaded = StonkHistory.load()
+
+    if not matches(loaded):
+        loaded = StonkHistory.from_ticks(ticks)
+        loaded.version = history_changed(database)
+        loaded.save()
+    
+    _history_columns = loaded
+    return loaded
+
+async def save_history_columns(database: u_files.DatabaseInterface) -> None:
+    """Saves the columnar copy of the stonk history to `HISTORY_COLUMNS_PATH` in another thread.
+    `append_tick` doesn't save the columns, so this should be run after it. If it isn't, the columns are rebuilt from the database the next time the bot starts."""
+    await history_columns(database).save_async()
+
+def append_tick(
+        database: u_files.DatabaseInterface,
+        tick: dict[str, int]
+    ) -> int:
+    """Adds a tick to the stonk history in the database and to the columnar copy.
+
+    Args:
+        database (u_files.DatabaseInterface): The database.
+        tick (dict[str, int]): The stonk values on the new tick.
+
+    Returns:
+        int: The tick number of the new tick.
+    """
+    # Make sure the columns and statistics are up to date before the database changes.
+    columns = history_columns(database)
+    stonk_statistics(database)
+
+    # `history_columns` has made sure the history exists, and appending to it doesn't copy the earlier ticks.
+    database.append("stonks", "stonk_history", data=tick)
+
+    # The columns are saved to file by `save_history_columns`, so the entire history isn't written here for every tick.
+    columns.append(tick)
+    columns.version = history_changed(database)
+
+    # Only the values that changed are written to the database's log, so saving the whole dict is fine.
+    statistics = StonkStatistics(database.load("stonks", "statistics"))
+    statistics.update(tick)
+    statistics.data["version"] = columns.version
+    database.save("stonks", "statistics", data=statistics.data)
+
+    if _history_returns is not None and _history_returns.history is columns:
+        _history_returns.append()
+
+    if _value_index is not None and _value_index.history is columns:
+        _value_index.append()
+
+    return len(columns) - 1
+
+def stonk_statistics(database: u_files.DatabaseInterface) -> StonkStatistics:
+    """Returns a read-only copy of the stonk statistics, rebuilding them from the history if they're missing or out of date."""
+    columns = history_columns(database)
+    data = database.load_view("stonks", "statistics", default=None)
+
+    if data is not None and StonkStatistics(data).covers(columns):
+        return StonkStatistics(data)
+    
+    return rebuild_statistics(database)
+
+def rebuild_statistics(database: u_files.DatabaseInterface) -> StonkStatistics:
+    """Rebuilds the stonk statistics from the entire history and saves them to the database."""
+    statistics = StonkStatistics.from_ticks(database.load_view("stonks", "stonk_history", default=[]))
+    statistics.data["version"] = history_columns(database).version
+
+    database.save("stonks", "statistics", data=statistics.data)
+
+    return statistics
+
+def value_index(database: u_files.DatabaseInterface) -> StonkValueIndex:
+    """Returns the inverted index of stonk values.
+    It's built from `history_columns` the first time this is called, and updated by `append_tick` after that."""
+    global _value_index
+
+    columns = history_columns(database)
+
+    if _value_index is None or _value_index.history is not columns or len(_value_index) != len(columns):
+        _value_index = StonkValueIndex(columns)
+    
+    return _value_index
+
+def history_returns(database: u_files.DatabaseInterface) -> StonkReturns:
+    """Returns the split-adjusted ratios for the stonk history.
+    They're built from `history_columns` the first time this is called, and updated by `append_tick` after that."""
+    global _history_returns
+
+    columns = history_columns(database)
+
+    if _history_returns is None or _history_returns.history is not columns or len(_history_returns) != len(columns):
+        _history_returns = StonkReturns(columns)
+    
+    return _history_returns
+
 def full_current_values(database: u_files.DatabaseInterface) -> dict[str, dict[str, int] | int]:
     """Returns the full current data from stonks/current_values in the database."""
     get = database.load("stonks", "current_values", default=None)
@@ -125,7 +125,11 @@ class StonkItem(Item):
 
     def value(self: typing.Self, database: u_files.DatabaseInterface) -> int:
         """Returns this stonk's current value."""
-        current_values = u_stonks.current_values(database=database)
+        current_values = database.load_view("stonks", "current_values", "values", default=None)
+
+        if current_values is None:
+            current_values = u_stonks.current_values(database=database)
+
         return current_values.get(self.internal_name, self.base_value)
 
 class ChessItem(Item):
@@ -956,6 +960,32 @@ def attribute_item_list(attributes: str | list[str]) -> list[type[Item]]:
     
     return found_items
 
+# Lookup tables for `get_item`, built by `build_item_index`.
+# They map every lowercase identifier of an item to the position in `all_items` and the item, keeping the first item if multiple share an identifier.
+item_index = {} # type: dict[str, tuple[int, Item]]
+attribute_item_index = {} # type: dict[str, dict[str, tuple[int, Item]]]
+
+def build_item_index() -> None:
+    """Builds the lookup tables used by `get_item` from `all_items`. This needs to be rerun if the items change."""
+    global item_index, attribute_item_index
+
+    new_index = {}
+    new_attribute_index = {}
+
+    for position, item in enumerate(all_items):
+        identifiers = [item.internal_name, item.internal_emoji, item.name, item.emoji] + list(item.aliases)
+
+        for identifier in identifiers:
+            identifier = identifier.lower()
+
+            new_index.setdefault(identifier, (position, item))
+
+            for attribute in item.attributes:
+                new_attribute_index.setdefault(attribute, {}).setdefault(identifier, (position, item))
+
+    item_index = new_index
+    attribute_item_index = new_attribute_index
+
 def get_item(
         item_identifier: str,
         attributes: str | list[str] = None
@@ -976,19 +1006,32 @@ def get_item(
         plural_identifier = item_identifier[:-1]
     else:
         plural_identifier = f"{item_identifier}s"
+    
+    if attributes is None or len(attributes) == 0:
+        indexes = [item_index]
+    else:
+        if isinstance(attributes, str):
+            attributes = [attributes]
+        
+        indexes = [attribute_item_index[attribute] for attribute in attributes if attribute in attribute_item_index]
 
     for identifier in [item_identifier, plural_identifier]:
-        for item in attribute_item_list(attributes):
-            if identifier == item.internal_name.lower() \
-                or identifier == item.internal_emoji.lower()\
-                or identifier == item.name.lower() \
-                or identifier == item.emoji.lower() \
-                or identifier in [i.lower() for i in item.aliases]:
-
-                return item
+        if len(indexes) == 1:
+            if identifier in indexes[0]:
+                return indexes[0][identifier][1]
+            
+            continue
+
+        found = [index[identifier] for index in indexes if identifier in index]
+
+        # If multiple attributes match, use whichever item comes first in `all_items`, which is the one a search through it would find.
+        if found:
+            return min(found, key=lambda pair: pair[0])[1]
     
     return None
 
+build_item_index()
+
 def convert_dict(item_dict: dict[str, int]) -> dict[typing.Type[Item] | str, int]:
     """Converts the keys in a dict to Item objects (or subclasses) while ignoring the values that aren't items.
 
@@ -2125,6 +2168,9 @@ import importlib
 importlib.reload(u_stonks)
 importlib.reload(u_files)
 
+def on_reload() -> None:
+    build_item_index()
+
 ########################################################################################
 ########################################################################################
 ########################################################################################